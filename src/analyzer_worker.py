@@ -0,0 +1,142 @@
+"""
+AnalyzerWorker: Standalone process that analyzes news items from the
+``WorkQueue`` and commits the insights back.
+
+Usage:
+    python -m src.analyzer_worker [--queue data/work_queue.db] [--id worker-1]
+
+Start as many as needed; each leases one item at a time, so LLM throughput
+scales with the number of processes. The engine (``src.main`` with
+``pipeline.external_workers: true``) enqueues news and applies the results.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from src.bootstrap import get_app
+from src.circuit_breaker import Backoff, CircuitBreaker, CircuitOpen
+from src.work_queue import WorkQueue
+
+
+class AnalyzerWorker:
+    def __init__(
+        self,
+        queue: WorkQueue,
+        analyzer,
+        worker_id: str,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        budget=None,
+        breaker: Optional[CircuitBreaker] = None,
+        backoff: Optional[Backoff] = None,
+    ):
+        """
+        Args:
+            queue: Shared work queue
+            analyzer: Object with ``async analyze(news, events)``
+            worker_id: Lease owner name (for debugging stuck items)
+            lease_seconds: Visibility timeout; must exceed one analysis
+            max_attempts: Failures before an item is given up on
+            poll_interval: Sleep when the queue is empty (or analysis is paused)
+            budget: ``Budget``; no items are leased while it pauses analysis
+            breaker: The LLM upstream's breaker; no items are leased while open
+            backoff: Delay before a failed item becomes available again
+        """
+        self.queue = queue
+        self.analyzer = analyzer
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.budget = budget
+        self.breaker = breaker
+        self.backoff = backoff or Backoff()
+        self._stop = threading.Event()
+
+    async def process_one(self) -> bool:
+        """Lease, analyze and commit one item; False if the queue was empty."""
+        if self.budget is not None and self.budget.paused:
+            return False  # leave the items queued until the budget resets
+        if self.breaker is not None and self.breaker.retry_in() > 0:
+            return False  # upstream down: do not spend the items' attempts
+        leases = await asyncio.to_thread(
+            self.queue.lease,
+            self.worker_id,
+            1,
+            self.lease_seconds,
+            self.max_attempts,
+        )
+        if not leases:
+            return False
+        lease = leases[0]
+        try:
+            events = await asyncio.to_thread(self.queue.events)
+            results = await self.analyzer.analyze(lease.news, events)
+        except Exception as e:
+            logger.exception(f"AnalyzerWorker: analysis of {lease.news.id} failed")
+            await asyncio.to_thread(
+                self.queue.fail,
+                lease,
+                str(e),
+                self.max_attempts,
+                self._retry_after(e, lease.attempts),
+            )
+            return True
+        if not await asyncio.to_thread(self.queue.complete, lease, results):
+            logger.warning(
+                f"AnalyzerWorker: lease on {lease.news.id} expired; result dropped"
+            )
+        return True
+
+    def _retry_after(self, error: Exception, attempts: int) -> float:
+        if isinstance(error, CircuitOpen):
+            return error.retry_in + self.backoff.delay(1)
+        return self.backoff.delay(attempts)
+
+    async def run(self):
+        logger.info(f"AnalyzerWorker {self.worker_id} started on {self.queue.path}")
+        while not self._stop.is_set():
+            if not await self.process_one():
+                await asyncio.sleep(self.poll_interval)
+        logger.info(f"AnalyzerWorker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze queued news items")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--queue", help="Work queue database (default: config)")
+    parser.add_argument("--id", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args(argv)
+
+    app = get_app(args.config)
+    config = app.config
+    worker = AnalyzerWorker(
+        WorkQueue(args.queue or config.pipeline.queue_path),
+        app.news_analyzer,
+        args.id,
+        lease_seconds=config.pipeline.lease_seconds,
+        max_attempts=config.pipeline.max_attempts,
+        budget=app.budget,
+        breaker=app.breakers.get("anthropic"),
+        backoff=Backoff(
+            config.breakers.retry_base_seconds, config.breakers.retry_max_seconds
+        ),
+    )
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
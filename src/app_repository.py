@@ -1,22 +1,105 @@
-from typing import List
-from src.models import TrackedEvent, NewsItem, VirtualPortfolio  # Use direct imports
+from collections.abc import Sequence, Set
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+from types import MappingProxyType
+from typing import Iterable, Iterator, List, Mapping, Optional
+from src import metrics, tracing
+from src.history_log import HistoryLog
+from src.insight_archive import InsightArchive
+from src.models import Insight, InsightStats, TrackedEvent, NewsItem, VirtualPortfolio
+from src.query_index import IndexView, KeysetIndex, to_ts
+from src.search_index import SearchIndex
+import bisect
 import json
 import os
+import threading
+import time
+from datetime import datetime
 from loguru import logger
 
+SAVE_SECONDS = metrics.histogram(
+    "state_save_seconds", "Duration of AppRepository.save (publish + write)"
+)
+SAVE_BYTES = metrics.gauge("state_save_bytes", "Size of the last saved state file")
+
 
 class EventRepository:
+    """
+    Events keyed by ID, validated once at insert time.
+
+    Secondary indexes are kept in step with every add/update/remove: a sorted
+    ``(event_time, id)`` list for deadline queries (expiry, locking) and a
+    ticker -> IDs map for ``stock`` lookups. Lookups never rescan or convert
+    stored events.
+
+    Stored events may be changed in place by the thread being ``watch``ed
+    (the one inside ``AppRepository.writer()``), so every event handed out to
+    it, added or updated is recorded in ``take_changed`` for re-serialization.
+    """
+
     def __init__(self, max_events: int = 10):
         self._events: dict[str, TrackedEvent] = {}  # Use TrackedEvent
+        self._by_time: List[tuple[float, str]] = []
+        self._by_stock: dict[str, set[str]] = {}
+        self._indexed: dict[str, tuple] = {}
+        self._changed: set[str] = set()
+        self._watching: Optional[int] = None  # thread ident
         self.max_events = max_events
 
-    def add(self, event: TrackedEvent):  # Use TrackedEvent
-        logger.info(f"EventRepository.add: Adding event of type {type(event)}")
-        assert isinstance(
-            event, TrackedEvent
-        ), f"Attempted to add non-TrackedEvent: {event}"
+    def watch(self, thread_id: Optional[int]):
+        """Record events handed out to ``thread_id`` as changed (None: stop)."""
+        self._watching = thread_id
+
+    def take_changed(self) -> set[str]:
+        """IDs of events that may have changed since the last call."""
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def _handed_out(self, events: Iterable[TrackedEvent]):
+        if self._watching is not None and self._watching == threading.get_ident():
+            self._changed.update(e.id for e in events)
+
+    @staticmethod
+    def _validate(event) -> TrackedEvent:
         if isinstance(event, dict):
             event = TrackedEvent(**event)  # Use TrackedEvent
+        if not isinstance(event, TrackedEvent):
+            raise TypeError(f"Attempted to store non-TrackedEvent: {type(event)}")
+        return event
+
+    @staticmethod
+    def _time_key(event: TrackedEvent) -> tuple[float, str]:
+        return (to_ts(event.event_time), event.id)
+
+    @staticmethod
+    def _ticker(stock: Optional[str]) -> Optional[str]:
+        return stock.strip().lstrip("$").upper() if stock else None
+
+    def _index(self, event: TrackedEvent):
+        time_key = self._time_key(event)
+        ticker = self._ticker(event.stock)
+        # Remember the indexed keys: stored events may be mutated in place, so
+        # their current fields cannot be trusted to find the old entries.
+        self._indexed[event.id] = (time_key, ticker)
+        bisect.insort(self._by_time, time_key)
+        if ticker:
+            self._by_stock.setdefault(ticker, set()).add(event.id)
+
+    def _unindex(self, event_id: str):
+        time_key, ticker = self._indexed.pop(event_id, (None, None))
+        if time_key is not None:
+            pos = bisect.bisect_left(self._by_time, time_key)
+            if pos < len(self._by_time) and self._by_time[pos] == time_key:
+                del self._by_time[pos]
+        ids = self._by_stock.get(ticker)
+        if ids is not None:
+            ids.discard(event_id)
+            if not ids:
+                del self._by_stock[ticker]
+
+    def add(self, event: TrackedEvent):  # Use TrackedEvent
+        event = self._validate(event)
         if event.id in self._events:
             raise ValueError(f"Event with ID {event.id} already exists")
         if len(self._events) >= self.max_events:
@@ -25,58 +108,109 @@ class EventRepository:
             )
             return False
         self._events[event.id] = event
+        self._index(event)
+        self._changed.add(event.id)
         return True
 
     def update(self, event_id: str, new_event: TrackedEvent):  # Use TrackedEvent
-        if isinstance(new_event, dict):
-            new_event = TrackedEvent(**new_event)  # Use TrackedEvent
+        """
+        Store ``new_event`` under ``event_id``. Call this after changing
+        ``event_time`` or ``stock`` of a stored event so the indexes follow.
+        """
+        new_event = self._validate(new_event)
+        self._unindex(event_id)
         self._events[event_id] = new_event
+        self._index(new_event)
+        self._changed.add(event_id)
         return new_event
 
     def get_all(self) -> List[TrackedEvent]:  # Use TrackedEvent
-        fixed = False
-        for k, v in list(self._events.items()):
-            pass  # No-op, previously logged event types
-        for k, v in list(self._events.items()):
-            if isinstance(v, dict):
-                logger.warning(f"EventRepo: Found dict for event {k}, converting.")
-                self._events[k] = TrackedEvent(**v)  # Use TrackedEvent
-                fixed = True
-            elif not isinstance(v, TrackedEvent):  # Use TrackedEvent
-                logger.error(
-                    f"EventRepository: Found non-TrackedEvent for event {k}: {type(v)}"
-                )
-                assert False, f"Non-TrackedEvent in repository: {v}"
-        if fixed:
-            logger.warning("EventRepo: Dicts converted to TrackedEvent at runtime.")
+        events = list(self._events.values())
+        self._handed_out(events)
+        return events
+
+    def stored(self) -> List[TrackedEvent]:
+        """All events, not recorded as handed out (for serializing them)."""
         return list(self._events.values())
 
-    def get(self, event_id: str):
-        return self._events.get(event_id)
+    def get(self, event_id: str) -> Optional[TrackedEvent]:
+        event = self._events.get(event_id)
+        if event is not None:
+            self._handed_out((event,))
+        return event
 
     def remove(self, event_id: str) -> bool:
-        return self._events.pop(event_id, None) is not None
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return False
+        self._unindex(event_id)
+        return True
+
+    def clear(self):
+        self._events = {}
+        self._by_time = []
+        self._by_stock = {}
+        self._indexed = {}
+
+    def due_before(self, when: datetime) -> List[TrackedEvent]:
+        """Events whose ``event_time`` is at or before ``when``, earliest first."""
+        pos = bisect.bisect_right(self._by_time, (to_ts(when), "\U0010ffff"))
+        events = [self._events[eid] for _, eid in self._by_time[:pos]]
+        self._handed_out(events)
+        return events
+
+    def by_stock(self, stock: str) -> List[TrackedEvent]:
+        """Events associated with a ticker (case-insensitive, ``$`` optional)."""
+        ids = self._by_stock.get(self._ticker(stock), ())
+        events = [self._events[eid] for eid in ids]
+        self._handed_out(events)
+        return events
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._events
+
+    def __len__(self) -> int:
+        return len(self._events)
 
 
 class NewsRepository:
     def __init__(self, max_news: int = 50):
-        self.news_items: List[NewsItem] = []  # Use NewsItem
+        self.news_items: List[NewsItem] = []  # Use NewsItem, newest first
         self.news_ids = set()
         self.max_news = max_news
+        self._keys: List[float] = []  # -timestamp, parallel to news_items
+        self.version = 0  # bumped on every change, for snapshot reuse
 
     def add(self, news: NewsItem):  # Use NewsItem
         if news.id in self.news_ids:
             return False  # No change
-        self.news_items.append(news)
-        self.news_ids.add(news.id)
         # Keep only the most recent N news, sorted by timestamp
-        self.news_items = sorted(
-            self.news_items, key=lambda n: n.timestamp, reverse=True
-        )[: self.max_news]
-        self.news_ids = set(n.id for n in self.news_items)
-        logger.info(f"NewsRepository: Added news ID={news.id}, title='{news.title}'")
+        key = -to_ts(news.timestamp)
+        pos = bisect.bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self.news_items.insert(pos, news)
+        self.news_ids.add(news.id)
+        if len(self.news_items) > self.max_news:
+            self._keys.pop()
+            self.news_ids.discard(self.news_items.pop().id)
+        self.version += 1
+        logger.debug(f"NewsRepository: Added news ID={news.id}, title='{news.title}'")
         return True  # News was added
 
+    def extend(self, items: List[NewsItem]) -> List[NewsItem]:
+        """Add many items with a single sort. Returns the ones that were kept."""
+        fresh = {n.id: n for n in items if n.id not in self.news_ids}
+        merged = sorted(
+            self.news_items + list(fresh.values()),
+            key=lambda n: to_ts(n.timestamp),
+            reverse=True,
+        )[: self.max_news]
+        self.news_items = merged
+        self._keys = [-to_ts(n.timestamp) for n in merged]
+        self.news_ids = {n.id for n in merged}
+        self.version += 1
+        return [n for n in fresh.values() if n.id in self.news_ids]
+
     def get_all(self) -> List[NewsItem]:  # Use NewsItem
         return self.news_items
 
@@ -92,20 +226,416 @@ class PortfolioRepository:
         return self.portfolio
 
 
+class ProcessedIds(Set):
+    """
+    Set of processed news IDs that also keeps them in insertion order. IDs
+    are only ever added, so a snapshot shares the list and records its
+    length (``view``) instead of copying every ID on each publish.
+    """
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ids: set[str] = set()
+        self._order: List[str] = []
+        for news_id in ids:
+            self.add(news_id)
+
+    def add(self, news_id: str):
+        if news_id not in self._ids:
+            self._ids.add(news_id)
+            self._order.append(news_id)
+
+    def __contains__(self, news_id) -> bool:
+        return news_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def view(self) -> "IdsView":
+        return IdsView(self._order, len(self._order))
+
+
+class IdsView(Sequence):
+    """Immutable prefix of an append-only ID list."""
+
+    __slots__ = ("_ids", "_n")
+
+    def __init__(self, ids: List[str], n: int):
+        self._ids = ids
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._ids[: self._n][i]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return self._ids[i]
+
+    def __iter__(self) -> Iterator[str]:
+        return islice(self._ids, self._n)
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """
+    Immutable, point-in-time view of the application state.
+
+    Snapshots are built by the writer and published with a single reference
+    assignment, so readers (web handlers) can use them without locking and
+    never observe a half-applied update. The contained dicts are owned by
+    snapshots (unchanged ones are shared with the previous snapshot) and must
+    be treated as read-only.
+    """
+
+    version: int
+    events: tuple = ()
+    portfolio: Optional[dict] = None
+    news_items: tuple = ()
+    llm_log: tuple = ()
+    processed_news_ids: Sequence = ()
+    indexes: Mapping[str, IndexView] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+
+    def index(self, name: str) -> Optional[IndexView]:
+        """
+        Secondary index view by name: ``news``, ``news:source:<subreddit>``,
+        ``llm_log``, ``llm_log:event:<id>`` or ``insights:event:<id>``.
+        """
+        return self.indexes.get(name)
+
+    def to_dict(self, news_limit: Optional[int] = None) -> dict:
+        news_items = self.news_items
+        if news_limit is not None:
+            news_items = news_items[:news_limit]
+        return {
+            "events": list(self.events),
+            "portfolio": self.portfolio or {},
+            "news_items": list(news_items),
+            "llm_log": list(self.llm_log),
+            "processed_news_ids": list(self.processed_news_ids),
+        }
+
+
 class AppRepository:
-    def __init__(self, max_events: int = 10):
+    """
+    In-memory application state with a copy-on-write read path.
+
+    All mutations happen inside ``writer()``, which serializes writers and
+    publishes a new ``StateSnapshot`` when the outermost block exits. Readers
+    call ``snapshot()`` and get the latest published state lock-free.
+
+    News, insights and LLM log entries are also kept in time-ordered
+    ``KeysetIndex``es (overall, per subreddit and per event) holding up to
+    ``max_history`` entries each, so paginated queries cost O(page size).
+
+    Each event keeps at most ``max_inline_insights`` insights inline plus
+    O(1)-updated running aggregates in ``event.stats``; older insights are
+    moved to ``archive`` so event payloads stay a constant size.
+
+    With a ``search`` index, every news item and insight added is also
+    indexed for full-text search, including those outliving the windows.
+
+    With a ``history`` log, every index entry is also appended to disk, and
+    ``load`` rebuilds the indexes from it rather than from the windows saved
+    in the state file (see ``HistoryLog``).
+    """
+
+    def __init__(
+        self,
+        max_events: int = 10,
+        max_history: int = 10000,
+        max_inline_insights: int = 20,
+        ewma_alpha: float = 0.3,
+        archive: Optional[InsightArchive] = None,
+        search: Optional[SearchIndex] = None,
+        history: Optional[HistoryLog] = None,
+    ):
         self.events = EventRepository(max_events=max_events)
+        self.max_inline_insights = max_inline_insights
+        self.ewma_alpha = ewma_alpha
+        self.archive = archive
+        self.search = search
+        self.history = history
+        self._replaying = False  # indexing entries that are already in history
         self.news = NewsRepository()
         self.portfolio = PortfolioRepository()
-        self.llm_log = []
-        self.processed_news_ids = set()
+        self.processed_news_ids = ProcessedIds()
+        self.max_history = max_history
+        self.news_index = KeysetIndex(max_history)
+        self.news_by_source: dict[str, KeysetIndex] = {}
+        self.llm_log_index = KeysetIndex(max_history)
+        self.llm_log_by_event: dict[str, KeysetIndex] = {}
+        self.insights_by_event: dict[str, KeysetIndex] = {}
+        self._seq = 0
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._snapshot = StateSnapshot(version=0)
+        # Serialized parts reused by ``publish`` while unchanged
+        self._event_dumps: dict[str, dict] = {}
+        self._news_dumps: tuple = (None, -1, ())  # (NewsRepository, version, dumps)
 
-    def get_app_data(self) -> dict:
-        sorted_llm_log = sorted(
-            self.llm_log,
-            key=lambda x: x.get("added_at") or x["timestamp"],
-            reverse=True,
+    @contextmanager
+    def writer(self) -> Iterator["AppRepository"]:
+        """
+        Exclusive write section. Publishes a fresh snapshot on successful exit.
+
+        Nested ``writer()`` blocks in the same thread publish only once, when
+        the outermost block exits. If the block raises, nothing is published.
+        """
+        with self._write_lock:
+            self._write_depth += 1
+            if self._write_depth == 1:
+                self.events.watch(threading.get_ident())
+            try:
+                yield self
+                if self._write_depth == 1:
+                    self.publish()
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self.events.watch(None)
+
+    def publish(self) -> StateSnapshot:
+        """
+        Build a snapshot of the current state and swap it in atomically.
+
+        Only what changed since the last snapshot is serialized again (events
+        handed out in a writer or added, a changed news window), so a small
+        write costs O(its changes) rather than O(total state).
+        """
+        with self._write_lock:
+            snapshot = StateSnapshot(
+                version=self._snapshot.version + 1,
+                events=self._events_data(),
+                portfolio=self.portfolio.get().model_dump(mode="json"),
+                news_items=self._news_data(),
+                llm_log=tuple(self.llm_log_index.view().page(10).items),
+                processed_news_ids=self.processed_news_ids.view(),
+                indexes=MappingProxyType(self._index_views()),
+            )
+            # A single reference assignment is atomic; readers see either the
+            # previous snapshot or this one, never a mix.
+            self._snapshot = snapshot
+            return snapshot
+
+    def snapshot(self) -> StateSnapshot:
+        """Return the latest published snapshot. Safe to call from any thread."""
+        return self._snapshot
+
+    def _events_data(self) -> tuple:
+        changed = self.events.take_changed()
+        dumps = {}
+        for event in self.events.stored():
+            dump = None if event.id in changed else self._event_dumps.get(event.id)
+            dumps[event.id] = dump or event.model_dump(mode="json")
+        self._event_dumps = dumps
+        return tuple(dumps.values())
+
+    def _news_data(self) -> tuple:
+        repo, version, dumps = self._news_dumps
+        if repo is not self.news or version != self.news.version:
+            sorted_news = sorted(
+                self.news.get_all(), key=lambda n: n.added_at, reverse=True
+            )
+            dumps = tuple(n.model_dump(mode="json") for n in sorted_news)
+            self._news_dumps = (self.news, self.news.version, dumps)
+        return dumps
+
+    def add_news(self, news: NewsItem) -> bool:
+        """Add a news item to the recent window and the news indexes."""
+        added = self.news.add(news)
+        if added:
+            self._index_news(news)
+        return added
+
+    def add_news_bulk(self, items: List[NewsItem]) -> int:
+        """Add many news items at once (e.g. on load). Returns how many were kept."""
+        added = self.news.extend(items)
+        # Oldest first, so the index only ever appends
+        for news in sorted(added, key=lambda n: to_ts(n.added_at)):
+            self._index_news(news)
+        return len(added)
+
+    def add_insight(self, event_id: str, insight: Insight) -> bool:
+        """Attach an insight to its event. Returns False for unknown events."""
+        event = self.events.get(event_id)
+        if event is None:
+            return False
+        event.insights.append(insight)
+        event.stats.update(insight, self.ewma_alpha)
+        self._trim_insights(event)
+        self._index_insight(event_id, insight)
+        return True
+
+    def remove_event(self, event_id: str) -> bool:
+        """
+        Stop tracking an event. Its inline insights go to the archive first,
+        so the archive holds the event's complete history (e.g. for backtests).
+        Its per-event insight and LLM log indexes are dropped.
+        """
+        event = self.events.get(event_id)
+        if event is None:
+            return False
+        if self.archive is not None and event.insights:
+            try:
+                self.archive.append(event_id, event.insights)
+            except OSError as e:
+                logger.error(f"AppRepo: Failed to archive insights for {event_id}: {e}")
+        if not self.events.remove(event_id):
+            return False
+        # Recorded in the history log too, so restarts and readers drop them
+        self._index_entry("event_removed", time.time(), event_id, {})
+        return True
+
+    def _trim_insights(self, event: TrackedEvent) -> None:
+        """Move insights beyond the inline window to the archive."""
+        overflow = len(event.insights) - self.max_inline_insights
+        if overflow <= 0:
+            return
+        evicted = event.insights[:overflow]
+        del event.insights[:overflow]
+        if self.archive is not None:
+            try:
+                self.archive.append(event.id, evicted)
+            except OSError as e:
+                logger.error(f"AppRepo: Failed to archive insights for {event.id}: {e}")
+
+    def add_llm_log(self, entry: dict) -> None:
+        """Record an LLM log entry (a JSON-ready dict) for the UI and queries."""
+        ts = to_ts(entry.get("added_at") or entry["timestamp"])
+        self._index_entry("llm_log", ts, self._next_key(), entry)
+
+    def _next_key(self) -> str:
+        self._seq += 1
+        return f"{self._seq:012d}"
+
+    def _sub_index(self, indexes: dict, name: str) -> KeysetIndex:
+        index = indexes.get(name)
+        if index is None:
+            index = indexes[name] = KeysetIndex(self.max_history)
+        return index
+
+    def _index_entry(self, kind: str, ts: float, key: str, item: dict) -> None:
+        """
+        Add one entry to the keyset indexes of its kind (and to history).
+        ``event_removed`` entries drop the per-event indexes of ``key``.
+        """
+        if kind == "news":
+            self.news_index.add(ts, key, item)
+            self._sub_index(self.news_by_source, item["source"]).add(ts, key, item)
+        elif kind == "llm_log":
+            self.llm_log_index.add(ts, key, item)
+            if item.get("event_id"):
+                index = self._sub_index(self.llm_log_by_event, item["event_id"])
+                index.add(ts, key, item)
+        elif kind == "insight":
+            index = self._sub_index(self.insights_by_event, item["event_id"])
+            index.add(ts, key, item)
+        elif kind == "event_removed":
+            self.llm_log_by_event.pop(key, None)
+            self.insights_by_event.pop(key, None)
+        if self.history is not None and not self._replaying:
+            try:
+                self.history.append(kind, ts, key, item)
+            except OSError as e:
+                logger.error(f"AppRepo: Failed to record history: {e}")
+
+    def _index_news(self, news: NewsItem) -> None:
+        item = news.model_dump(mode="json")
+        self._index_entry("news", to_ts(news.added_at), news.id, item)
+        if self.search is not None:
+            self._search_add(self.search.add_news, news)
+
+    def _index_insight(self, event_id: str, insight: Insight) -> None:
+        item = insight.model_dump(mode="json")
+        item["event_id"] = event_id
+        self._index_entry("insight", to_ts(insight.timestamp), self._next_key(), item)
+        if self.search is not None:
+            self._search_add(self.search.add_insight, event_id, insight)
+
+    def _search_add(self, add, *args) -> None:
+        try:
+            add(*args)
+        except OSError as e:
+            logger.error(f"AppRepo: Failed to index for search: {e}")
+
+    def replay_history(self, entries, reset: bool = False) -> None:
+        """Index entries read from the history log (without re-recording)."""
+        if reset:
+            self._reset_indexes()
+        self._replaying = True
+        try:
+            for kind, ts, key, item in entries:
+                self._index_entry(kind, ts, key, item)
+                if kind in ("llm_log", "insight"):
+                    self._seq = max(self._seq, int(key))
+        finally:
+            self._replaying = False
+
+    def adopt_indexes(self, other: "AppRepository") -> None:
+        """Serve ``other``'s keyset indexes (a reader's, kept current)."""
+        self.news_index = other.news_index
+        self.news_by_source = other.news_by_source
+        self.llm_log_index = other.llm_log_index
+        self.llm_log_by_event = other.llm_log_by_event
+        self.insights_by_event = other.insights_by_event
+
+    def _history_entries(self):
+        """Every entry the indexes still hold, oldest first per kind."""
+        kinds = (
+            ("news", [self.news_index, *self.news_by_source.values()]),
+            ("llm_log", [self.llm_log_index, *self.llm_log_by_event.values()]),
+            ("insight", list(self.insights_by_event.values())),
         )
+        for kind, indexes in kinds:
+            entries = {}
+            for index in indexes:
+                for ts, key, item in index.entries():
+                    entries[(ts, key)] = item
+            for (ts, key), item in sorted(entries.items(), key=lambda e: e[0]):
+                yield kind, ts, key, item
+
+    def _compact_history(self) -> None:
+        """Rewrite the history log once it is mostly entries no index holds."""
+        indexes = [
+            self.news_index,
+            self.llm_log_index,
+            *self.news_by_source.values(),
+            *self.llm_log_by_event.values(),
+            *self.insights_by_event.values(),
+        ]
+        held = sum(len(index) for index in indexes)  # at least what is kept
+        if self.history.entries > 2 * held + 1000:
+            self.history.compact(self._history_entries())
+
+    def _reset_indexes(self) -> None:
+        self.news_index.clear()
+        self.llm_log_index.clear()
+        self.news_by_source = {}
+        self.llm_log_by_event = {}
+        self.insights_by_event = {}
+
+    def _index_views(self) -> dict:
+        views = {"news": self.news_index.view(), "llm_log": self.llm_log_index.view()}
+        for source, index in self.news_by_source.items():
+            views[f"news:source:{source}"] = index.view()
+        for event_id, index in self.llm_log_by_event.items():
+            views[f"llm_log:event:{event_id}"] = index.view()
+        for event_id, index in self.insights_by_event.items():
+            if event_id in self.events:
+                views[f"insights:event:{event_id}"] = index.view()
+        return views
+
+    def get_app_data(self) -> dict:
+        """Build the full state dict from live objects. Writer-side only."""
         sorted_news = sorted(
             self.news.get_all(), key=lambda n: n.added_at, reverse=True
         )
@@ -113,49 +643,110 @@ class AppRepository:
             "events": [e.model_dump(mode="json") for e in self.events.get_all()],
             "portfolio": self.portfolio.get().model_dump(mode="json"),
             "news_items": [n.model_dump(mode="json") for n in sorted_news],
-            "llm_log": sorted_llm_log[:10],
+            "llm_log": self.llm_log_index.view().page(10).items,
             "processed_news_ids": list(self.processed_news_ids),
         }
 
     def save(self, filename="state.json"):
         tmp_filename = filename + ".tmp"
-        news_count = len(self.news.get_all())
-        logger.info(
-            f"AppRepo: Saving state: {news_count} news, {len(self.llm_log)} llm_log."
-        )
-        with open(tmp_filename, "w") as f:
-            json.dump(self.get_app_data(), f, indent=2)
-        os.replace(tmp_filename, filename)
+        with self._write_lock:
+            news_count = len(self.news.get_all())
+            logger.debug(
+                f"AppRepo: Saving state: {news_count} news, "
+                f"{len(self.llm_log_index)} llm_log."
+            )
+            with SAVE_SECONDS.time(), tracing.span("repo.save"):
+                if self.history is not None:
+                    # On disk before the state that readers reload on
+                    try:
+                        self._compact_history()
+                        self.history.flush()
+                    except OSError as e:
+                        logger.error(f"AppRepo: Failed to write history: {e}")
+                with tracing.span("repo.save.publish"):
+                    snapshot = self.publish()
+                with tracing.span("repo.save.write"), open(tmp_filename, "w") as f:
+                    json.dump(snapshot.to_dict(), f, indent=2)
+                    SAVE_BYTES.set(f.tell())
+                os.replace(tmp_filename, filename)
+            if self.search is not None:
+                self.search.flush()
 
     def load(self, filename="state.json"):
+        with self.writer(), tracing.span("repo.load"):
+            # With a history log the indexes come from it, not the state file
+            self._replaying = self.history is not None
+            try:
+                self._load(filename)
+            finally:
+                self._replaying = False
+            if self.history is not None:
+                self._load_history()
+
+    def _load_history(self) -> None:
+        _, entries = self.history.tail()
+        if entries:
+            self.replay_history(entries, reset=True)
+            logger.info(f"AppRepo: Loaded {len(entries)} history entries")
+        elif len(self.news_index) or len(self.llm_log_index) or self.insights_by_event:
+            # First start with a history log: seed it from the state file
+            try:
+                self.history.compact(self._history_entries())
+            except OSError as e:
+                logger.error(f"AppRepo: Failed to write history: {e}")
+
+    def _load(self, filename):
         try:
             with open(filename, "r") as f:
                 state = json.load(f)
+            self._reset_indexes()
             # Restore events
-            self.events._events = {}
+            self.events.clear()
             events_to_load = state.get("events", [])[: self.events.max_events]
             for event_data in events_to_load:
-                self.events.add(TrackedEvent(**event_data))  # Use TrackedEvent
+                event = TrackedEvent(**event_data)
+                if event.insights and event.stats.count == 0:
+                    # State saved before aggregates existed: rebuild them
+                    event.stats = InsightStats()
+                    for insight in event.insights:
+                        event.stats.update(insight, self.ewma_alpha)
+                if (
+                    event.is_locked
+                    and event.settled_at is None
+                    and event.lock_time is not None
+                    and to_ts(event.lock_time) >= to_ts(event.event_time)
+                ):
+                    # Older versions locked only when settling the event
+                    event.settled_at = event.lock_time
+                self._trim_insights(event)
+                self.events.add(event)
+                for insight in event.insights:
+                    self._index_insight(event.id, insight)
             # Restore news
-            self.news.news_items = []
-            self.news.news_ids = set()
+            self.news = NewsRepository(max_news=self.news.max_news)
+            news_items = []
             for news_data in state.get("news_items", []):
                 if "added_at" not in news_data:
                     news_data["added_at"] = news_data["timestamp"]
-                self.news.add(NewsItem(**news_data))  # Use NewsItem
+                news_items.append(NewsItem(**news_data))  # Use NewsItem
+            self.add_news_bulk(news_items)
             # Restore portfolio
             from src.models import VirtualPortfolio
 
             portfolio_data = state.get("portfolio")
             if portfolio_data:
                 self.portfolio.set(VirtualPortfolio(**portfolio_data))
-            # Restore llm_log
-            self.llm_log = state.get("llm_log", [])
+            # Restore llm_log (saved newest first)
+            for entry in reversed(state.get("llm_log", [])):
+                if isinstance(entry, list) and entry:
+                    entry = entry[0]  # Older saves wrapped global entries in a list
+                self.add_llm_log(entry)
             # Restore processed_news_ids
-            self.processed_news_ids = set(state.get("processed_news_ids", []))
+            self.processed_news_ids = ProcessedIds(state.get("processed_news_ids", []))
             logger.info(
                 f"AppRepo: Loaded state: {len(self.news.news_items)} news, "
-                f"{len(self.events._events)} events, {len(self.llm_log)} llm_log, "
+                f"{len(self.events)} events, "
+                f"{len(self.llm_log_index)} llm_log, "
                 f"{len(self.processed_news_ids)} processed IDs."
             )
         except FileNotFoundError:
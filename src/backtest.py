@@ -0,0 +1,273 @@
+"""
+Backtest: Replay archived insights against known event outcomes and sweep the
+prediction parameters.
+
+Usage:
+    python -m src.backtest --outcomes outcomes.json \\
+        [--archive data/insight_archive] [--grid grid.yaml] [--workers 4] \\
+        [--config config/config.yaml] [--output results.json]
+
+``outcomes.json`` is a list of ``{"event_id", "event_time", "outcome"}`` with
+outcome ``Call`` or ``Put``. Insights are read from the ``InsightArchive``
+directory (one JSONL file per event), which holds an event's full history
+once it has expired. The grid YAML maps parameter names to lists of values;
+omitted parameters use ``DEFAULT_GRID``, except ``evidence_weight``, which
+defaults to the configured ``sentiment.evidence_weight`` so the backtest
+scores the same confidences as the live predictor.
+
+For each configuration the predictor's sentiment is evaluated at lock time
+(``event_time - lock_hours_before``) from the last ``window`` insights seen by
+then (0 = all), and the locked action is scored with the portfolio rules.
+Configurations sharing (window, lock lead, half-life, evidence weight) are
+evaluated together, with thresholds and confidence cut-offs broadcast as array
+axes; those groups are spread over a process pool.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+from loguru import logger
+
+from src.config import PortfolioConfig, SentimentConfig, load_config
+from src.event_predictor import decayed_sentiment, decide_actions
+from src.insight_archive import InsightArchive
+from src.portfolio_manager import OUTCOME_CODES, prediction_deltas
+from src.query_index import to_ts
+
+DEFAULT_GRID = {
+    "threshold": [0.1, 0.2, 0.3, 0.4, 0.5],
+    "min_confidence": [0.0, 0.4, 0.6, 0.8],
+    "half_life_hours": [1.0, 6.0, 24.0],
+    "window": [0, 5, 20],
+    "lock_hours_before": [0.0, 1.0, 6.0],
+    "evidence_weight": [SentimentConfig().evidence_weight],
+}
+
+
+@dataclass
+class ReplayData:
+    """Columnar insights sorted by (event, timestamp) plus per-event outcomes."""
+
+    event_ids: List[str]
+    event_time: np.ndarray  # (n_events,) POSIX seconds
+    outcome: np.ndarray  # (n_events,) action codes
+    row_event: np.ndarray  # (n_rows,) event index of each insight
+    ts: np.ndarray
+    score: np.ndarray
+    relevance: np.ndarray
+    event_start: np.ndarray  # (n_events,) first row of each event
+
+
+def load_replay_data(outcomes_path: str, archive_dir: str) -> ReplayData:
+    """Load outcomes and the archived insights of those events."""
+    with open(outcomes_path, "r") as f:
+        outcomes = json.load(f)
+    archive = InsightArchive(archive_dir)
+    event_ids, event_time, outcome = [], [], []
+    rows = []
+    for idx, item in enumerate(outcomes):
+        event_ids.append(str(item["event_id"]))
+        event_time.append(to_ts(item["event_time"]))
+        outcome.append(OUTCOME_CODES[item["outcome"]])
+        for insight in archive.iter(event_ids[-1]):
+            rel = 1.0 if insight.relevance_score is None else insight.relevance_score
+            rows.append((idx, to_ts(insight.timestamp), insight.score, rel))
+    cols = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    order = np.lexsort((cols[:, 1], cols[:, 0]))
+    cols = cols[order]
+    row_event = cols[:, 0].astype(np.int64)
+    return ReplayData(
+        event_ids=event_ids,
+        event_time=np.array(event_time, dtype=np.float64),
+        outcome=np.array(outcome, dtype=np.int64),
+        row_event=row_event,
+        ts=cols[:, 1].copy(),
+        score=cols[:, 2].copy(),
+        relevance=cols[:, 3].copy(),
+        event_start=np.searchsorted(row_event, np.arange(len(event_ids))),
+    )
+
+
+def _visible_rows(data: ReplayData, window: int, lock_hours: float) -> np.ndarray:
+    """Mask of insights known at lock time and within the last ``window``."""
+    lock_at = data.event_time - lock_hours * 3600.0
+    mask = data.ts <= lock_at[data.row_event]
+    if window > 0:
+        # Rows are sorted by (event, ts), so visible rows of an event are a
+        # prefix of its block; keep the last `window` of that prefix.
+        visible_end = data.event_start + np.bincount(
+            data.row_event[mask], minlength=len(data.event_ids)
+        )
+        position = np.arange(len(data.ts))
+        mask &= position >= visible_end[data.row_event] - window
+    return mask
+
+
+def evaluate_group(
+    data: ReplayData,
+    window: int,
+    lock_hours: float,
+    half_life_hours: float,
+    evidence_weight: float,
+    thresholds: np.ndarray,
+    min_confidences: np.ndarray,
+    points_per_correct: float,
+    points_per_incorrect: float,
+) -> List[dict]:
+    """Score every (threshold, min_confidence) pair for one group at once."""
+    start = time.perf_counter()
+    mask = _visible_rows(data, window, lock_hours)
+    lock_at = data.event_time - lock_hours * 3600.0
+    # Each event is evaluated at its own lock time: shift timestamps so that
+    # "now" is 0 for every event.
+    rel_ts = data.ts[mask] - lock_at[data.row_event[mask]]
+    sentiment, confidence = decayed_sentiment(
+        data.row_event[mask],
+        data.score[mask],
+        rel_ts,
+        data.relevance[mask],
+        len(data.event_ids),
+        0.0,
+        half_life_hours * 3600.0,
+        evidence_weight,
+    )
+    # Axes: (threshold, min_confidence, event)
+    actions = decide_actions(
+        sentiment,
+        confidence,
+        thresholds[:, None, None],
+        min_confidences[None, :, None],
+    )
+    deltas = prediction_deltas(
+        actions, data.outcome, points_per_correct, points_per_incorrect
+    )
+    trades = (actions != 0).sum(axis=2)
+    hits = ((actions != 0) & (actions == data.outcome)).sum(axis=2)
+    pnl = deltas.sum(axis=2)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    per_config_ms = elapsed_ms / max(pnl.size, 1)
+
+    results = []
+    for (i, threshold), (j, min_conf) in itertools.product(
+        enumerate(thresholds), enumerate(min_confidences)
+    ):
+        results.append(
+            {
+                "threshold": float(threshold),
+                "min_confidence": float(min_conf),
+                "half_life_hours": half_life_hours,
+                "window": window,
+                "lock_hours_before": lock_hours,
+                "evidence_weight": evidence_weight,
+                "pnl": float(pnl[i, j]),
+                "trades": int(trades[i, j]),
+                "hit_rate": float(hits[i, j] / trades[i, j]) if trades[i, j] else None,
+                "elapsed_ms": per_config_ms,
+            }
+        )
+    return results
+
+
+_worker_data: Optional[ReplayData] = None
+
+
+def _init_worker(data: ReplayData):
+    global _worker_data
+    _worker_data = data
+
+
+def _run_group(args) -> List[dict]:
+    return evaluate_group(_worker_data, *args)
+
+
+def run_sweep(
+    data: ReplayData,
+    grid: Dict[str, list],
+    portfolio: Optional[PortfolioConfig] = None,
+    workers: Optional[int] = None,
+) -> List[dict]:
+    """Evaluate every configuration in ``grid``; results sorted by P&L."""
+    portfolio = portfolio or PortfolioConfig()
+    grid = {**DEFAULT_GRID, **grid}
+    thresholds = np.asarray(grid["threshold"], dtype=np.float64)
+    min_confs = np.asarray(grid["min_confidence"], dtype=np.float64)
+    groups = [
+        (
+            int(window),
+            float(lock),
+            float(half_life),
+            float(evidence_weight),
+            thresholds,
+            min_confs,
+            portfolio.points_per_correct,
+            portfolio.points_per_incorrect,
+        )
+        for window, lock, half_life, evidence_weight in itertools.product(
+            grid["window"],
+            grid["lock_hours_before"],
+            grid["half_life_hours"],
+            grid["evidence_weight"],
+        )
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(groups) <= 1:
+        chunks = [evaluate_group(data, *g) for g in groups]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(data,)
+        ) as pool:
+            chunksize = max(1, len(groups) // (workers * 4))
+            chunks = list(pool.map(_run_group, groups, chunksize=chunksize))
+    results = [r for chunk in chunks for r in chunk]
+    results.sort(key=lambda r: r["pnl"], reverse=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest prediction parameters")
+    parser.add_argument("--outcomes", required=True, help="JSON list of outcomes")
+    parser.add_argument("--archive", default="data/insight_archive")
+    parser.add_argument("--grid", help="YAML file with parameter lists")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--config",
+        default="config/config.yaml",
+        help="Application config (default evidence_weight)",
+    )
+    parser.add_argument("--output", help="Write all results as JSON")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid, "r") as f:
+            grid = yaml.safe_load(f) or {}
+    portfolio = PortfolioConfig(**grid.pop("portfolio", {}))
+    if "evidence_weight" not in grid and os.path.exists(args.config):
+        grid["evidence_weight"] = [load_config(args.config).sentiment.evidence_weight]
+
+    start = time.perf_counter()
+    data = load_replay_data(args.outcomes, args.archive)
+    results = run_sweep(data, grid, portfolio, args.workers)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Backtest: {len(results)} configurations over {len(data.event_ids)} "
+        f"events and {len(data.ts)} insights in {elapsed:.2f}s"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    for r in results[: args.top]:
+        print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Bootstrap: Explicit, side-effect-free application setup.
+
+Importing this module does nothing. ``get_app()`` returns the process-wide
+``Application``, whose components are built on first access:
+
+- ``config``: loads ``.env``, parses the YAML config and sets up logging, once
+- ``app_repo``: the repository, with ``state.json`` loaded
+- ``search_index``: full-text index the repository feeds (``None`` if off)
+- ``timeseries``, ``portfolio_manager``, ``predictor``
+- ``token_ledger`` and ``budget``: LLM usage and the spend budget
+- ``breakers``: the per-upstream circuit breakers, configured
+- ``trending``: the trending-ticker detector fed by ingestion
+- ``news_analyzer`` (Anthropic), ``reddit_scraper`` (PRAW) and
+  ``event_finder`` (OpenAI): the heavy client libraries are only imported
+  when these are first used
+
+Every import and construction is timed by ``profiler``; ``report()`` prints
+the per-component breakdown (``python -m src.main --profile-startup``).
+"""
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records: List[Tuple[str, str, float]] = []  # (component, kind, ms)
+
+    @contextmanager
+    def measure(self, component: str, kind: str = "init"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append(
+                (component, kind, (time.perf_counter() - start) * 1000.0)
+            )
+
+    def import_module(self, name: str, component: Optional[str] = None):
+        with self.measure(component or name, "import"):
+            return importlib.import_module(name)
+
+    def report(self) -> str:
+        lines = [f"{'component':<24} {'kind':<7} {'ms':>9}"]
+        for component, kind, ms in self.records:
+            lines.append(f"{component:<24} {kind:<7} {ms:>9.1f}")
+        # Nested measurements overlap, so show wall time instead of a sum
+        elapsed = (time.perf_counter() - self.started) * 1000.0
+        lines.append(f"{'since bootstrap import':<32} {elapsed:>9.1f}")
+        return "\n".join(lines)
+
+
+profiler = StartupProfiler()
+
+
+class _component:
+    """Like ``functools.cached_property``, but timed and thread-safe."""
+
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+
+    def __get__(self, app, owner=None):
+        if app is None:
+            return self
+        if self.name in app.__dict__:
+            return app.__dict__[self.name]
+        with app._lock:
+            if self.name not in app.__dict__:
+                with profiler.measure(self.name):
+                    app.__dict__[self.name] = self.build(app)
+        return app.__dict__[self.name]
+
+
+class Application:
+    def __init__(
+        self, config_path: str = "config/config.yaml", state_file: str = "state.json"
+    ):
+        """
+        Args:
+            config_path: YAML configuration file
+            state_file: Where the repository state is loaded from and saved
+        """
+        self.config_path = config_path
+        self.state_file = state_file
+        # Reentrant: building a component may build its dependencies
+        self._lock = threading.RLock()
+
+    @_component
+    def config(self):
+        from dotenv import load_dotenv
+
+        from src.config import load_config
+        from src.logger import setup_logging
+
+        load_dotenv()
+        config = load_config(Path(self.config_path))
+        setup_logging(config.logging)
+        return config
+
+    @_component
+    def app_repo(self):
+        from src.app_repository import AppRepository
+        from src.history_log import HistoryLog
+        from src.insight_archive import InsightArchive
+
+        repo = AppRepository(
+            max_events=self.config.max_events,
+            max_inline_insights=self.config.sentiment.max_inline_insights,
+            ewma_alpha=self.config.sentiment.ewma_alpha,
+            archive=InsightArchive(self.config.insight_archive_dir),
+            search=self.search_index,
+            history=HistoryLog(self.config.history_file),
+        )
+        repo.load(self.state_file)
+        return repo
+
+    @_component
+    def search_index(self):
+        from src.search_index import SearchIndex
+
+        search = self.config.search
+        if not search.enabled:
+            return None
+        return SearchIndex(search.directory, checkpoint_every=search.checkpoint_every)
+
+    @_component
+    def timeseries(self):
+        from src.timeseries import TimeSeriesStore
+
+        return TimeSeriesStore(self.config.timeseries_dir)
+
+    @_component
+    def portfolio_manager(self):
+        from src.portfolio_manager import PortfolioManager
+
+        portfolio = self.config.portfolio
+        manager = PortfolioManager(
+            initial_value=portfolio.initial_value,
+            history=self.timeseries.series("portfolio"),
+            points_per_correct=portfolio.points_per_correct,
+            points_per_incorrect=portfolio.points_per_incorrect,
+        )
+        manager.current_value = self.app_repo.portfolio.get().current_value
+        return manager
+
+    @_component
+    def predictor(self):
+        from src.event_predictor import Predictor
+
+        predictor = Predictor(self.config.sentiment)
+        predictor.load_events(self.app_repo.events.get_all())
+        return predictor
+
+    @_component
+    def token_ledger(self):
+        from src.token_ledger import TokenLedger
+
+        budget = self.config.budget
+        return TokenLedger(budget.ledger_path, budget.prices)
+
+    @_component
+    def budget(self):
+        from src.token_ledger import Budget
+
+        return Budget(self.token_ledger, self.config.budget)
+
+    @_component
+    def trending(self):
+        from src.trending import TrendingDetector
+
+        return TrendingDetector(self.config.trending)
+
+    @_component
+    def breakers(self):
+        from src import circuit_breaker
+
+        circuit_breaker.registry.configure(self.config.breakers)
+        return circuit_breaker.registry
+
+    @_component
+    def news_analyzer(self):
+        from src import rate_governor
+
+        module = profiler.import_module("src.news_analyzer", "anthropic")
+        governor = rate_governor.shared("anthropic", self.config.rate_limits.anthropic)
+        return module.NewsAnalyzer(
+            governor,
+            self.token_ledger,
+            self.budget,
+            breaker=self.breakers.get("anthropic"),
+        )
+
+    @_component
+    def reddit_scraper(self):
+        import os
+
+        module = profiler.import_module("src.reddit_scraper", "praw")
+        return module.RedditScraper(
+            client_id=os.getenv("REDDIT_CLIENT_ID"),
+            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+            user_agent=os.getenv("REDDIT_USER_AGENT"),
+            breakers=self.breakers,
+        )
+
+    @_component
+    def event_finder(self):
+        from src import rate_governor
+
+        module = profiler.import_module("src.find_target_events", "openai")
+        governor = rate_governor.shared("openai", self.config.rate_limits.openai)
+        return module.FindTargetEvents(
+            governor, self.token_ledger, breaker=self.breakers.get("openai")
+        )
+
+
+_app: Optional[Application] = None
+_app_lock = threading.Lock()
+
+
+def get_app(config_path: str = "config/config.yaml") -> Application:
+    """The process-wide ``Application`` (created on first call, cheaply)."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = Application(config_path)
+        elif config_path != _app.config_path:
+            logger.warning(
+                f"Bootstrap: application already configured from "
+                f"{_app.config_path}; ignoring {config_path}"
+            )
+        return _app
@@ -0,0 +1,235 @@
+"""
+Per-upstream circuit breakers and jittered exponential backoff.
+
+Each upstream (``reddit/<subreddit>``, ``anthropic``, ``openai``) has a
+``CircuitBreaker``. After ``failure_threshold`` consecutive failures it opens
+and rejects calls immediately with ``CircuitOpen`` (no request, no quota
+spent); once its backoff has passed it lets a single probe through
+(half-open), which closes it on success or re-opens it for longer on failure.
+Nothing here sleeps: callers skip the upstream or reschedule the work for
+``retry_in`` seconds later, so an outage of one upstream never holds up the
+others.
+
+    breaker = circuit_breaker.get("anthropic")
+    with breaker.guard():
+        response = client.messages.create(...)
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from src import metrics
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+TRIPS = metrics.counter(
+    "circuit_breaker_trips_total", "Times a circuit breaker opened", ["upstream"]
+)
+REJECTED = metrics.counter(
+    "circuit_breaker_rejected_total",
+    "Calls rejected without contacting the upstream",
+    ["upstream"],
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit '{name}' is open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class Backoff:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+
+    def __init__(self, base: float = 5.0, cap: float = 300.0, rng=None):
+        self.base = base
+        self.cap = cap
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (from 1)."""
+        ceiling = min(self.cap, self.base * 2 ** max(0, attempt - 1))
+        return ceiling / 2 + self.rng.uniform(0, ceiling / 2)
+
+
+def upstream_failure(exc: BaseException) -> bool:
+    """
+    Whether an exception means the upstream is unhealthy: transport errors,
+    timeouts, 408, 429 and 5xx. Other 4xx responses prove it is up.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        # prawcore exceptions carry the requests response
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is None:
+        return True
+    return status in (408, 429) or status >= 500
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        backoff: Optional[Backoff] = None,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            name: Upstream name (metrics label and log prefix)
+            failure_threshold: Consecutive failures that open the circuit
+            backoff: Open period after the n-th consecutive trip
+            clock: Monotonic seconds (for tests)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff or Backoff()
+        self.failures = 0  # consecutive
+        self.trips = 0  # consecutive openings without a success in between
+        self.last_error: Optional[str] = None
+        self._open_until = 0.0
+        self._probing = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.trips == 0:
+            return CLOSED
+        return OPEN if self._clock() < self._open_until else HALF_OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the next call may go through (0 if it may now)."""
+        return max(0.0, self._open_until - self._clock()) if self.trips else 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now; never blocks."""
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True  # exactly one probe
+                return True
+        REJECTED.labels(self.name).inc()
+        return False
+
+    def check(self):
+        """Raise ``CircuitOpen`` unless a call may go through now."""
+        if not self.allow():
+            raise CircuitOpen(self.name, max(self.retry_in(), 0.1))
+
+    def record_success(self):
+        with self._lock:
+            if self.trips:
+                logger.info(f"CircuitBreaker[{self.name}]: closed")
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if error is not None:
+                self.last_error = f"{type(error).__name__}: {error}"[:200]
+            # A failed probe re-opens at once, for longer
+            if self.trips or self.failures >= self.failure_threshold:
+                self.trips += 1
+                delay = self.backoff.delay(self.trips)
+                self._open_until = self._clock() + delay
+                TRIPS.labels(self.name).inc()
+                logger.warning(
+                    f"CircuitBreaker[{self.name}]: open for {delay:.1f}s after "
+                    f"{self.failures} consecutive failures ({self.last_error})"
+                )
+
+    @contextmanager
+    def guard(self, is_failure: Callable[[BaseException], bool] = upstream_failure):
+        """
+        Run a call through the breaker: ``CircuitOpen`` if it is open, else
+        the outcome is recorded (exceptions that are not upstream failures,
+        e.g. a 400, count as the upstream being up).
+        """
+        self.check()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure(e)
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "retry_in": round(self.retry_in(), 3),
+            "last_error": self.last_error,
+        }
+
+
+class BreakerRegistry:
+    """The process's breakers by upstream name, created on first use."""
+
+    def __init__(self):
+        self.failure_threshold = 3
+        self.base_delay = 5.0
+        self.max_delay = 600.0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        """Apply a ``BreakerConfig`` to existing and future breakers."""
+        with self._lock:
+            self.failure_threshold = config.failure_threshold
+            self.base_delay = config.base_delay
+            self.max_delay = config.max_delay
+            for breaker in self._breakers.values():
+                breaker.failure_threshold = config.failure_threshold
+                breaker.backoff = Backoff(config.base_delay, config.max_delay)
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(
+                    name,
+                    self.failure_threshold,
+                    Backoff(self.base_delay, self.max_delay),
+                )
+            return breaker
+
+    def status(self) -> Dict[str, dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.status() for breaker in breakers}
+
+
+registry = BreakerRegistry()
+
+metrics.gauge(
+    "circuit_breaker_state",
+    "State of each upstream's breaker (0 closed, 1 half-open, 2 open)",
+    ["upstream"],
+    callback=lambda: {
+        (name,): _STATE_VALUES[status["state"]]
+        for name, status in registry.status().items()
+    },
+)
+
+
+def get(name: str) -> CircuitBreaker:
+    return registry.get(name)
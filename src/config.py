@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Literal, Optional
 from pathlib import Path
 import yaml
 from pydantic import BaseModel, Field
@@ -39,10 +39,226 @@ class PortfolioConfig(BaseModel):
 class SentimentConfig(BaseModel):
     """Sentiment analysis configuration."""
 
-    lock_hours_before: int = Field(1, description="Hours before event to lock bias")
+    lock_hours_before: float = Field(
+        1, description="Hours before event to lock bias"
+    )
+    expire_hours_after: float = Field(
+        1, description="Hours after the event before it is removed"
+    )
     min_confidence: float = Field(
         0.6, description="Minimum confidence score for predictions"
     )
+    half_life_hours: float = Field(
+        6.0, description="Half-life of an insight's weight in the sentiment"
+    )
+    action_threshold: float = Field(
+        0.3, description="Absolute sentiment needed for a Call/Put prediction"
+    )
+    evidence_weight: float = Field(
+        1.0,
+        description="Decayed insight weight at which evidence reaches ~63%",
+    )
+    max_inline_insights: int = Field(
+        20, description="Insights kept inline per event; older ones are archived"
+    )
+    ewma_alpha: float = Field(
+        0.3, description="Smoothing factor of the per-event score EWMA"
+    )
+
+
+class PipelineConfig(BaseModel):
+    """Ingestion/analysis pipeline configuration."""
+
+    queue_size: int = Field(500, description="Capacity of each stage's queue")
+    analyze_concurrency: int = Field(
+        2, description="News items analyzed by the LLM at the same time"
+    )
+    analyze_queue_size: int = Field(
+        100,
+        description="Items waiting for analysis; the oldest is set aside when full",
+    )
+    max_deferred: int = Field(
+        10000,
+        description=(
+            "Items set aside for a later analysis (shed, out of retries or "
+            "paused); the longest-held is dropped beyond this"
+        ),
+    )
+    require_keyword_match: bool = Field(
+        False, description="Only analyze news mentioning an event keyword"
+    )
+    external_workers: bool = Field(
+        False,
+        description="Hand analysis to analyzer worker processes via the work queue",
+    )
+    queue_path: str = Field(
+        "data/work_queue.db", description="SQLite work queue for external workers"
+    )
+    lease_seconds: float = Field(
+        120.0, description="Visibility timeout of a leased work item"
+    )
+    max_attempts: int = Field(3, description="Analysis attempts per work item")
+    queue_retention_hours: float = Field(
+        24.0, description="Applied and failed work items are deleted after this"
+    )
+
+
+class DiscoveryConfig(BaseModel):
+    """Background discovery of upcoming events."""
+
+    target_events: int = Field(3, description="Upcoming events to keep tracked")
+    cache_file: str = Field(
+        "data/event_cache.json", description="Persistent cache of discovered events"
+    )
+    cache_ttl_hours: float = Field(
+        12.0, description="How long a discovery result is reused"
+    )
+    timeout_seconds: float = Field(
+        90.0, description="Timeout of one LLM discovery request"
+    )
+    refresh_minutes: float = Field(
+        30.0, description="Interval between checks for missing events"
+    )
+
+
+class RateLimitConfig(BaseModel):
+    """Budget of one LLM provider; headers and 429s adapt within it."""
+
+    requests_per_minute: float = Field(50, description="Request budget")
+    tokens_per_minute: float = Field(
+        40_000, description="Input plus output token budget"
+    )
+    max_concurrency: int = Field(4, description="Upper bound of calls in flight")
+    max_attempts: int = Field(4, description="Tries of a throttled request")
+    backoff_seconds: float = Field(
+        2.0, description="Pause after a 429/overload without retry-after"
+    )
+
+
+class RateLimitsConfig(BaseModel):
+    """Shared rate governors, one per LLM provider."""
+
+    anthropic: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    openai: RateLimitConfig = Field(
+        default_factory=lambda: RateLimitConfig(
+            requests_per_minute=20, tokens_per_minute=30_000, max_concurrency=2
+        )
+    )
+
+
+class ModelPrice(BaseModel):
+    """Dollars per million tokens."""
+
+    input_per_mtok: float
+    output_per_mtok: float
+
+
+def _default_prices() -> Dict[str, ModelPrice]:
+    return {
+        "claude-3-7-sonnet": ModelPrice(input_per_mtok=3.0, output_per_mtok=15.0),
+        "claude-3-5-haiku": ModelPrice(input_per_mtok=0.8, output_per_mtok=4.0),
+        "gpt-4o": ModelPrice(input_per_mtok=2.5, output_per_mtok=10.0),
+        "default": ModelPrice(input_per_mtok=3.0, output_per_mtok=15.0),
+    }
+
+
+class BudgetConfig(BaseModel):
+    """Token ledger and the LLM spend budget the pipeline degrades against."""
+
+    ledger_path: str = Field(
+        "data/token_ledger.db", description="SQLite ledger of LLM usage"
+    )
+    period: Literal["day", "hour"] = Field("day", description="Budget period (UTC)")
+    limit_usd: float = Field(0.0, description="Spend per period (0: unlimited)")
+    larger_batches_at: float = Field(
+        0.5, description="Spent fraction from which Reddit is polled less often"
+    )
+    strict_prefilter_at: float = Field(
+        0.7, description="Spent fraction from which the keyword prefilter tightens"
+    )
+    cheap_model_at: float = Field(
+        0.85, description="Spent fraction from which the cheap model analyzes"
+    )
+    pause_at: float = Field(1.0, description="Spent fraction that pauses analysis")
+    batch_interval_factor: float = Field(
+        3.0, description="Fetch interval multiplier in larger_batches mode"
+    )
+    strict_keyword_hits: int = Field(
+        2, description="Distinct event keywords required by the strict prefilter"
+    )
+    cheap_model: str = Field(
+        "claude-3-5-haiku-20241022", description="Analysis model when saving"
+    )
+    refresh_seconds: float = Field(
+        10.0, description="How long a read of the spend is reused"
+    )
+    prices: Dict[str, ModelPrice] = Field(
+        default_factory=_default_prices,
+        description="Model name or prefix (or 'default') -> price",
+    )
+
+
+class BreakerConfig(BaseModel):
+    """Per-upstream circuit breakers and the retry delay of failed work."""
+
+    failure_threshold: int = Field(
+        3, description="Consecutive failures that open an upstream's circuit"
+    )
+    base_delay: float = Field(5.0, description="First open period in seconds")
+    max_delay: float = Field(600.0, description="Longest open period in seconds")
+    retry_base_seconds: float = Field(
+        5.0, description="Delay before the first retry of a failed analysis"
+    )
+    retry_max_seconds: float = Field(
+        300.0, description="Longest delay before retrying a failed analysis"
+    )
+
+
+class TrendingConfig(BaseModel):
+    """Streaming trending-ticker detection over ingested news."""
+
+    enabled: bool = Field(True, description="Count tickers of ingested news")
+    window_minutes: float = Field(60.0, description="Recent window")
+    window_buckets: int = Field(12, description="Buckets of the recent window")
+    baseline_hours: float = Field(24.0, description="Baseline window")
+    baseline_buckets: int = Field(24, description="Buckets of the baseline")
+    sketch_width: int = Field(1024, description="Count-Min Sketch counters per row")
+    sketch_depth: int = Field(4, description="Count-Min Sketch rows")
+    top_k: int = Field(50, description="Heavy hitters kept per window bucket")
+    min_mentions: int = Field(3, description="Mentions needed to flag a burst")
+    burst_z: float = Field(
+        3.0, description="Poisson z-score against the baseline that is a burst"
+    )
+
+
+class SearchConfig(BaseModel):
+    """Full-text search over news and insight history."""
+
+    enabled: bool = Field(True, description="Index news and insights as added")
+    directory: str = Field("data/search", description="Document log and postings")
+    checkpoint_every: int = Field(
+        10000, description="Documents indexed between postings checkpoints"
+    )
+
+
+class TracingConfig(BaseModel):
+    """Opt-in spans (Chrome trace) and cProfile dumps of slow cycles."""
+
+    enabled: bool = Field(False, description="Record timing spans")
+    trace_file: str = Field(
+        "logs/trace.json", description="Chrome trace JSON written by the engine"
+    )
+    max_spans: int = Field(100_000, description="Spans kept in memory")
+    export_interval: float = Field(
+        30.0, description="Minimum seconds between trace file writes"
+    )
+    profile_slowest: int = Field(
+        0, description="Keep cProfile dumps of the N slowest cycles (0: off)"
+    )
+    profile_sample_rate: float = Field(
+        0.1, description="Fraction of cycles profiled"
+    )
+    profile_dir: str = Field("logs/profiles", description="Where dumps are kept")
 
 
 class LoggingConfig(BaseModel):
@@ -52,6 +268,16 @@ class LoggingConfig(BaseModel):
     file: str = Field("logs/app.log", description="Log file path")
     max_size: str = Field("10MB", description="Maximum size of log file")
     backup_count: int = Field(5, description="Number of backup log files to keep")
+    console: bool = Field(True, description="Also log to stdout")
+    json_file: Optional[str] = Field(
+        None, description="Structured (JSON lines) log file; empty to disable"
+    )
+    rate_limit: int = Field(
+        20, description="Records per call site and interval below WARNING (0: off)"
+    )
+    rate_limit_interval: float = Field(
+        60.0, description="Window of the per-call-site rate limit in seconds"
+    )
 
 
 class AppConfig(BaseModel):
@@ -61,10 +287,44 @@ class AppConfig(BaseModel):
     portfolio: PortfolioConfig
     sentiment: SentimentConfig
     logging: LoggingConfig
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
+    discovery: DiscoveryConfig = Field(default_factory=DiscoveryConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    rate_limits: RateLimitsConfig = Field(default_factory=RateLimitsConfig)
+    budget: BudgetConfig = Field(default_factory=BudgetConfig)
+    breakers: BreakerConfig = Field(default_factory=BreakerConfig)
+    trending: TrendingConfig = Field(default_factory=TrendingConfig)
+    search: SearchConfig = Field(default_factory=SearchConfig)
     ui_update_interval: int = Field(
         5, description="Interval (in seconds) between UI/state updates"
     )
     max_events: int = Field(10, description="Maximum number of events allowed")
+    events: List[EventConfig] = Field(
+        default_factory=list,
+        description="Events seeded on first start (when there is no state file)",
+    )
+    insight_archive_dir: str = Field(
+        "data/insight_archive",
+        description="Directory for insights evicted from events (JSON lines)",
+    )
+    history_file: str = Field(
+        "data/history.jsonl",
+        description="News, insight and LLM log history served by paginated queries",
+    )
+    timeseries_dir: str = Field(
+        "data/timeseries",
+        description="Directory for portfolio and sentiment time series",
+    )
+    engine_mode: str = Field(
+        "embedded",
+        description=(
+            "'embedded' runs the engine inside the web server; 'external' serves "
+            "the state saved by a separate `python -m src.main` process"
+        ),
+    )
+    engine_status_file: str = Field(
+        "engine_status.json", description="Engine metrics shared with the web tier"
+    )
 
 
 def load_config(config_path: str | Path) -> AppConfig:
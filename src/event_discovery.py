@@ -0,0 +1,223 @@
+"""
+EventDiscovery: Keeps enough tracked events by refreshing them in the
+background instead of blocking startup on an LLM web search.
+
+Discovered events go into an ``EventCache`` (a JSON file with a TTL), so a
+restart within the TTL reuses them without calling the LLM. Candidates are
+deduplicated by meaning rather than ID: two events on the same UTC date whose
+normalized names share most of their words are the same event, whatever ID
+the LLM gave them.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional
+
+from loguru import logger
+
+from src.models import TrackedEvent
+from src.query_index import to_ts
+
+# Words that do not distinguish one event from another
+_FILLER = set(
+    "the a an of for and on in at to us report release announcement meeting "
+    "data event".split()
+)
+SIMILARITY = 0.5
+
+
+def name_tokens(name: str) -> frozenset:
+    """Lowercased, accent-free words of a name without filler or years."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return frozenset(
+        w for w in words if w not in _FILLER and not re.fullmatch(r"(19|20)\d\d", w)
+    )
+
+
+def event_date(event: TrackedEvent) -> str:
+    when = datetime.fromtimestamp(to_ts(event.event_time), tz=timezone.utc)
+    return when.date().isoformat()
+
+
+def same_event(a: TrackedEvent, b: TrackedEvent) -> bool:
+    """Same ID, or same date with mostly the same name (Jaccard >= 0.5)."""
+    if a.id == b.id:
+        return True
+    if event_date(a) != event_date(b):
+        return False
+    ta, tb = name_tokens(a.name), name_tokens(b.name)
+    if not ta or not tb:
+        return False
+    return len(ta & tb) / len(ta | tb) >= SIMILARITY
+
+
+def dedupe(
+    candidates: Iterable[TrackedEvent], existing: Iterable[TrackedEvent] = ()
+) -> List[TrackedEvent]:
+    """Candidates that match neither an existing event nor an earlier candidate."""
+    kept: List[TrackedEvent] = []
+    existing = list(existing)
+    for event in candidates:
+        if not any(same_event(event, other) for other in existing + kept):
+            kept.append(event)
+    return kept
+
+
+class EventCache:
+    def __init__(self, path: str, ttl_seconds: float):
+        """
+        Args:
+            path: JSON file holding the discovered events
+            ttl_seconds: How long a discovery result is reused
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.fetched_at = 0.0
+        self._events: List[TrackedEvent] = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.fetched_at = float(data.get("fetched_at", 0.0))
+            self._events = [TrackedEvent(**e) for e in data.get("events", [])]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"EventCache: ignoring unreadable cache {self.path}: {e}")
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "fetched_at": self.fetched_at,
+                    "events": [e.model_dump(mode="json") for e in self._events],
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp, self.path)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.fetched_at < self.ttl_seconds
+
+    def events(self, now: Optional[float] = None) -> List[TrackedEvent]:
+        """Cached events that have not happened yet, soonest first."""
+        now = time.time() if now is None else now
+        upcoming = [e for e in self._events if to_ts(e.event_time) > now]
+        return sorted(upcoming, key=lambda e: to_ts(e.event_time))
+
+    def store(self, events: Iterable[TrackedEvent], now: Optional[float] = None):
+        """Merge a discovery result (deduplicated) and restart the TTL."""
+        now = time.time() if now is None else now
+        fresh = dedupe(events)
+        self._events = fresh + dedupe(self.events(now), fresh)
+        self.fetched_at = now
+        self._save()
+
+
+class EventDiscovery:
+    def __init__(
+        self,
+        app_repo,
+        discover: Callable[[int], List[TrackedEvent]],
+        cache: EventCache,
+        on_added: Callable[[TrackedEvent], None],
+        target: int = 3,
+        interval: float = 1800.0,
+    ):
+        """
+        Args:
+            app_repo: Repository the events are added to
+            discover: ``discover(n)`` returns up to n candidate events (e.g. the
+                LLM search); it should enforce its own timeout
+            cache: Persistent cache of discovery results
+            on_added: Called with each added event (outside the writer lock)
+            target: Number of upcoming events to keep
+            interval: Seconds between checks when nothing wakes the task
+        """
+        self.app_repo = app_repo
+        self.discover = discover
+        self.cache = cache
+        self.on_added = on_added
+        self.target = target
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fill_from(self, candidates: List[TrackedEvent]) -> List[TrackedEvent]:
+        added = []
+        with self.app_repo.writer():
+            existing = self.app_repo.events.get_all()
+            for event in dedupe(candidates, existing):
+                if len(self.app_repo.events) >= self.target:
+                    break
+                if self.app_repo.events.add(event.model_copy(deep=True)):
+                    added.append(self.app_repo.events.get(event.id))
+        for event in added:
+            logger.info(f"EventDiscovery: added {event.id} - {event.name}")
+            self.on_added(event)
+        return added
+
+    def refresh(self) -> List[TrackedEvent]:
+        """Top up the tracked events from the cache, then from ``discover``."""
+        needed = self.target - len(self.app_repo.events)
+        if needed <= 0:
+            return []
+        added = self._fill_from(self.cache.events())
+        if len(self.app_repo.events) >= self.target or self.cache.is_fresh():
+            return added
+        start = time.perf_counter()
+        try:
+            candidates = self.discover(self.target)
+        except Exception as e:
+            logger.error(f"EventDiscovery: discovery failed: {e}")
+            return added
+        logger.info(
+            f"EventDiscovery: {len(candidates)} candidates in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+        if candidates:
+            self.cache.store(candidates)
+        return added + self._fill_from(self.cache.events())
+
+    def wake(self):
+        """Check again now (e.g. after an event expired)."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(f"EventDiscovery: refresh failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="event-discovery", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
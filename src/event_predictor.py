@@ -1,28 +1,224 @@
-from src.models import TrackedEvent
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src import metrics, tracing
+from src.config import SentimentConfig
+from src.models import Insight, TrackedEvent
+from src.query_index import to_ts
+
+ACTIONS = np.array(["Hold", "Call", "Put"])
+HOLD, CALL, PUT = 0, 1, 2
+
+RUN_SECONDS = metrics.histogram(
+    "predictor_run_seconds", "Duration of one predict_all over all events"
+)
+
+
+def decayed_sentiment(
+    event_idx: np.ndarray,
+    scores: np.ndarray,
+    timestamps: np.ndarray,
+    relevance: np.ndarray,
+    n_events: int,
+    now: float,
+    half_life: float,
+    evidence_weight: float = 1.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Time-decayed, relevance-weighted sentiment and confidence for many events
+    in one pass.
+
+    Each insight is weighted by ``relevance * 2 ** (-age / half_life)``.
+    Sentiment is the weighted mean score per event. Confidence multiplies
+    agreement (how one-sided the weighted scores are, 0 to 1) by evidence
+    (``1 - exp(-total_weight / evidence_weight)``), so a single stale or
+    marginally relevant insight cannot produce a confident call.
+
+    Args:
+        event_idx: Event slot of each insight (int array)
+        scores, timestamps, relevance: Per-insight columns (POSIX seconds)
+        n_events: Number of event slots
+        now: Evaluation time (POSIX seconds)
+        half_life: Decay half-life in seconds
+
+    Returns:
+        (sentiment, confidence), each of shape (n_events,)
+    """
+    # Insights from the future (clock skew) count as fresh, not amplified
+    age = np.maximum(now - timestamps, 0.0)
+    weight = relevance * np.exp2(-age / half_life)
+    w_sum = np.bincount(event_idx, weights=weight, minlength=n_events)
+    w_score = np.bincount(event_idx, weights=weight * scores, minlength=n_events)
+    w_abs = np.bincount(
+        event_idx, weights=weight * np.abs(scores), minlength=n_events
+    )
+    sentiment = np.divide(w_score, w_sum, out=np.zeros(n_events), where=w_sum > 0)
+    agreement = np.divide(
+        np.abs(w_score), w_abs, out=np.zeros(n_events), where=w_abs > 0
+    )
+    confidence = agreement * (1.0 - np.exp(-w_sum / evidence_weight))
+    return sentiment, confidence
+
+
+def decide_actions(
+    sentiment: np.ndarray,
+    confidence: np.ndarray,
+    threshold: float,
+    min_confidence: float,
+) -> np.ndarray:
+    """Action codes (HOLD/CALL/PUT); broadcasts over threshold arrays."""
+    confident = confidence >= min_confidence
+    return np.where(
+        confident & (sentiment > threshold),
+        CALL,
+        np.where(confident & (sentiment < -threshold), PUT, HOLD),
+    )
 
 
 class Predictor:
-    @staticmethod
-    def predict(event: TrackedEvent) -> TrackedEvent:
+    """
+    Batched sentiment engine for all tracked events.
+
+    Insight scores, timestamps and relevance are kept in growable NumPy
+    columns tagged with an event slot, so ``predict_all`` evaluates every
+    event with a handful of vectorized operations instead of a Python loop
+    over insights. Rows whose decayed weight has become negligible and rows of
+    forgotten events are dropped when the columns are compacted.
+    """
+
+    # Rows older than this many half-lives weigh < 1e-6 and are dropped
+    MAX_AGE_HALF_LIVES = 20
+
+    def __init__(self, config: Optional[SentimentConfig] = None):
+        config = config or SentimentConfig()
+        self.half_life = config.half_life_hours * 3600.0
+        self.threshold = config.action_threshold
+        self.min_confidence = config.min_confidence
+        self.evidence_weight = config.evidence_weight
+        self._slots: Dict[str, int] = {}
+        self._next_slot = 0
+        self._n = 0
+        self._dead = 0
+        self._event_idx = np.empty(256, dtype=np.int32)
+        self._ts = np.empty(256)
+        self._score = np.empty(256)
+        self._rel = np.empty(256)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _slot(self, event_id: str) -> int:
+        slot = self._slots.get(event_id)
+        if slot is None:
+            slot = self._slots[event_id] = self._next_slot
+            self._next_slot += 1
+        return slot
+
+    def _grow(self, needed: int):
+        capacity = len(self._ts)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_event_idx", "_ts", "_score", "_rel"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def observe(self, event_id: str, insight: Insight):
+        """Add one insight to the engine. O(1) amortized."""
+        self._grow(self._n + 1)
+        i = self._n
+        self._event_idx[i] = self._slot(event_id)
+        self._ts[i] = to_ts(insight.timestamp)
+        self._score[i] = insight.score
+        rel = insight.relevance_score
+        self._rel[i] = 1.0 if rel is None else rel
+        self._n += 1
+
+    def load_events(self, events: Iterable[TrackedEvent]):
+        """Seed the engine from the inline insights of already stored events."""
+        for event in events:
+            for insight in event.insights:
+                self.observe(event.id, insight)
+
+    def forget(self, event_id: str):
+        """Stop tracking an event; its rows are dropped on the next compaction."""
+        slot = self._slots.pop(event_id, None)
+        if slot is None:
+            return
+        self._dead += int(np.count_nonzero(self._event_idx[: self._n] == slot))
+
+    def _compact(self, now: float):
+        n = self._n
+        live_slots = np.fromiter(self._slots.values(), dtype=np.int64)
+        keep = np.isin(self._event_idx[:n], live_slots)
+        keep &= self._ts[:n] >= now - self.MAX_AGE_HALF_LIVES * self.half_life
+        # Renumber slots densely so bincount output stays small
+        size = max(int(self._event_idx[:n].max(initial=0)), *self._slots.values(), 0)
+        remap = np.full(size + 1, -1)
+        for new_slot, (event_id, old_slot) in enumerate(list(self._slots.items())):
+            remap[old_slot] = new_slot
+            self._slots[event_id] = new_slot
+        self._next_slot = len(self._slots)
+        m = int(keep.sum())
+        self._event_idx[:m] = remap[self._event_idx[:n][keep]]
+        self._ts[:m] = self._ts[:n][keep]
+        self._score[:m] = self._score[:n][keep]
+        self._rel[:m] = self._rel[:n][keep]
+        self._n = m
+        self._dead = 0
+
+    def _evaluate(self, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        if self._n and (
+            self._dead * 2 > self._n
+            or self._ts[0] < now - self.MAX_AGE_HALF_LIVES * self.half_life
+        ):
+            self._compact(now)
+        n = self._n
+        return decayed_sentiment(
+            self._event_idx[:n],
+            self._score[:n],
+            self._ts[:n],
+            self._rel[:n],
+            self._next_slot,
+            now,
+            self.half_life,
+            self.evidence_weight,
+        )
+
+    def evaluate(self, now: Optional[float] = None) -> Dict[str, Tuple[float, float]]:
+        """Return ``{event_id: (sentiment, confidence)}`` for all tracked events."""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        sentiment, confidence = self._evaluate(now)
+        return {
+            event_id: (float(sentiment[slot]), float(confidence[slot]))
+            for event_id, slot in self._slots.items()
+        }
+
+    def predict_all(self, events: Iterable[TrackedEvent], now: Optional[float] = None):
         """
-        Aggregates all insights for the event, determines predicted_action, generates thinking_text, and updates the event.
+        Update sentiment, confidence, predicted_action and thinking_text of
+        every unlocked event in place, from one batched evaluation.
         """
-        if not event.insights:
-            return event
-        # Use most recent N insights (e.g., 5)
-        recent_insights = event.insights[-5:]
-        avg_score = sum(i.score for i in recent_insights) / len(recent_insights)
-        # Determine bias
-        if avg_score > 0.3:
-            action = "Call"
-        elif avg_score < -0.3:
-            action = "Put"
-        else:
-            action = "Hold"
-        # Combine thoughts for thinking_text
-        thinking_text = "\n".join(i.text for i in recent_insights)
-        # Update event
-        updated_event = event.copy(
-            update={"predicted_action": action, "thinking_text": thinking_text}
-        )
-        return updated_event
+        with RUN_SECONDS.time(), tracing.span("predictor.predict_all"):
+            now = datetime.now(timezone.utc).timestamp() if now is None else now
+            sentiment, confidence = self._evaluate(now)
+            decisions = decide_actions(
+                sentiment, confidence, self.threshold, self.min_confidence
+            )
+            actions = ACTIONS[decisions]
+            for event in events:
+                slot = self._slots.get(event.id)
+                if slot is None or event.is_locked:
+                    continue
+                event.current_sentiment_score = float(sentiment[slot])
+                event.prediction_confidence = float(confidence[slot])
+                event.predicted_action = str(actions[slot])
+                # Combine the most recent thoughts for thinking_text
+                event.thinking_text = "\n".join(
+                    i.text for i in event.insights[-5:]
+                )
@@ -9,7 +9,10 @@ from loguru import logger
 from src.models import TrackedEvent
 from openai import OpenAI
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+from src import circuit_breaker, rate_governor
+from src.token_ledger import TokenLedger
 
 
 # Pydantic models for structured output
@@ -25,38 +28,83 @@ class EventListResponse(BaseModel):
     events: List[EventResponseItem]
 
 
+MODEL = "gpt-4o"  # Use a model supporting structured outputs
+SEARCH_TOKEN_ESTIMATE = 8000
+
+
 class FindTargetEvents:
     """
     Service for seeding the event repository with upcoming financial events using OpenAI LLM.
     Should be called at app startup if there are no events defined.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        governor: Optional[rate_governor.RateGovernor] = None,
+        ledger: Optional[TokenLedger] = None,
+        breaker: Optional[circuit_breaker.CircuitBreaker] = None,
+    ):
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = OpenAI(api_key=openai_api_key)
+        # Throttled requests are retried (and paced) by the governor
+        self.client = OpenAI(api_key=openai_api_key, max_retries=0)
+        self.governor = governor or rate_governor.shared("openai")
+        self.ledger = ledger
+        self.breaker = breaker or circuit_breaker.get("openai")
 
-    def get_llm_events(self, n=3) -> List[TrackedEvent]:
-        """Fetch N events using OpenAI Structured Outputs and return TrackedEvent list."""
-        prompt = (
-            f"Top {n} upcoming financial events in next 1-2 wks?"
-        )
+    def _record_usage(self, response):
+        usage = getattr(response, "usage", None)
+        if self.ledger is None or usage is None:
+            return
         try:
-            response = self.client.responses.parse(
-                model="gpt-4o",  # Use a model supporting structured outputs
+            self.ledger.record(
+                "event_discovery",
+                getattr(response, "model", None) or MODEL,
+                usage.input_tokens,
+                usage.output_tokens,
+            )
+        except Exception as e:  # bookkeeping must not fail discovery
+            logger.warning(f"FindTargetEvents: could not record token usage: {e}")
+
+    def _request(self, prompt: str, timeout=None):
+        return self.governor.call(
+            lambda: self.client.responses.parse(
+                model=MODEL,
                 input=[
                     {"role": "system", "content": "Extract the event information."},
                     {"role": "user", "content": prompt},
                 ],
                 text_format=EventListResponse,
                 tools=[{"type": "web_search_preview"}],  # web search
-            )
+                # None would disable the client's default timeout entirely
+                **({"timeout": timeout} if timeout else {}),
+            ),
+            # Web search results make the input much larger than the prompt
+            tokens=SEARCH_TOKEN_ESTIMATE,
+            usage=lambda r: getattr(r.usage, "total_tokens", None),
+        )
+
+    def get_llm_events(self, n=3, timeout=None) -> List[TrackedEvent]:
+        """Fetch N events using OpenAI Structured Outputs and return TrackedEvent list.
+
+        ``timeout`` (seconds) bounds the request; on timeout no events are returned.
+        """
+        prompt = (
+            f"Top {n} upcoming financial events in next 1-2 wks?"
+        )
+        try:
+            with self.breaker.guard():
+                response = self._request(prompt, timeout)
+            self._record_usage(response)
             parsed_output: EventListResponse = response.output_parsed
             if not parsed_output or not parsed_output.events:
                 logger.warning("LLM parsing returned no events.")
                 return []
 
+        except circuit_breaker.CircuitOpen as e:
+            logger.info(f"FindTargetEvents: skipped, {e}")
+            return []
         except Exception as e:
             logger.error(
                 f"Failed to fetch/parse LLM events: {e}\n"
@@ -0,0 +1,112 @@
+"""
+HistoryLog: The repository's paginated history (news, insights, LLM log) on
+disk, for restarts and for web processes in external mode.
+
+``state.json`` only carries a recent window of news and LLM log entries; the
+keyset indexes the paginated endpoints serve hold up to ``max_history``
+entries each. Every entry added to those indexes is appended here as one
+JSON line ``{"kind", "ts", "key", "item"}`` (an ``event_removed`` line drops
+the per-event indexes of event ``key``), so:
+
+- the engine rebuilds the same indexes (with the same keys, so cursors stay
+  valid) when it restarts;
+- readers tail the file and keep their own copy of the indexes current.
+
+Entries beyond what the indexes keep are dropped by ``compact``, which
+rewrites the file atomically; readers notice the new file and reread it.
+"""
+
+import json
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+Entry = Tuple[str, float, str, dict]  # (kind, ts, key, item)
+
+
+class HistoryLog:
+    def __init__(self, path: str, readonly: bool = False):
+        """
+        Args:
+            path: JSON-lines file
+            readonly: Only read (tail) the file another process writes
+        """
+        self.path = path
+        self.readonly = readonly
+        self.entries = 0  # lines in the file, as far as this process knows
+        self._file = None
+        self._offset = 0  # bytes already read by ``tail``
+        self._inode: Optional[int] = None
+
+    def append(self, kind: str, ts: float, key: str, item: dict):
+        if self.readonly:
+            raise RuntimeError("HistoryLog is read-only")
+        if self._file is None:
+            self._makedirs()
+            self._file = open(self.path, "a", encoding="utf-8")
+        line = {"kind": kind, "ts": ts, "key": key, "item": item}
+        self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.entries += 1
+
+    def _makedirs(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def tail(self) -> Tuple[bool, List[Entry]]:
+        """
+        Entries appended since the last call.
+
+        Returns:
+            (restarted, entries): ``restarted`` when the file was replaced
+            (compacted) or truncated; ``entries`` are then the whole file
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False, []
+        entries = []
+        with f:
+            # fstat the open file: the path may be replaced meanwhile
+            st = os.fstat(f.fileno())
+            restarted = st.st_ino != self._inode or st.st_size < self._offset
+            if restarted:
+                self._inode, self._offset, self.entries = st.st_ino, 0, 0
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                self._offset += len(line)
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    logger.warning(f"HistoryLog: skipping bad line in {self.path}: {e}")
+                    continue
+                entries.append((data["kind"], data["ts"], data["key"], data["item"]))
+        self.entries += len(entries)
+        return restarted, entries
+
+    def compact(self, entries: Iterable[Entry]):
+        """Replace the file with ``entries`` (those the indexes still hold)."""
+        self._makedirs()
+        tmp = self.path + ".tmp"
+        count = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            for kind, ts, key, item in entries:
+                line = {"kind": kind, "ts": ts, "key": key, "item": item}
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+                count += 1
+        self.close()
+        os.replace(tmp, self.path)
+        logger.info(f"HistoryLog: compacted {self.entries} entries to {count}")
+        self.entries = count
@@ -0,0 +1,54 @@
+"""
+InsightArchive: Cold storage for insights evicted from a TrackedEvent.
+
+Each event gets one append-only JSON-lines file, so archiving is a single
+sequential write and the inline event payload stays a fixed size no matter how
+long the event is tracked.
+"""
+
+import json
+import os
+import re
+from typing import Iterable, Iterator, List
+
+from loguru import logger
+
+from src.models import Insight
+
+
+class InsightArchive:
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Directory holding one ``<event_id>.jsonl`` file per event
+        """
+        self.directory = directory
+
+    def path_for(self, event_id: str) -> str:
+        # Event IDs come from the LLM; keep them filesystem-safe
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", event_id)
+        return os.path.join(self.directory, f"{safe}.jsonl")
+
+    def append(self, event_id: str, insights: Iterable[Insight]) -> int:
+        """Append insights to the event's archive. Returns the number written."""
+        lines = [insight.model_dump_json() + "\n" for insight in insights]
+        if not lines:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path_for(event_id), "a", encoding="utf-8") as f:
+            f.writelines(lines)
+        logger.debug(f"InsightArchive: Archived {len(lines)} insights for {event_id}")
+        return len(lines)
+
+    def iter(self, event_id: str) -> Iterator[Insight]:
+        """Yield archived insights for an event, oldest first."""
+        try:
+            with open(self.path_for(event_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield Insight(**json.loads(line))
+        except FileNotFoundError:
+            return
+
+    def read(self, event_id: str) -> List[Insight]:
+        return list(self.iter(event_id))
@@ -0,0 +1,156 @@
+"""
+LifecycleScheduler: Fires lock, settle and expire actions at each event's
+deadlines instead of scanning all events every loop iteration.
+
+Deadlines live in a min-heap. A dedicated thread sleeps until the earliest one
+(or until an earlier deadline is scheduled) and runs the registered handler,
+so actions happen on time regardless of the ingestion ``fetch_interval``.
+Rescheduling or cancelling an event bumps its generation; stale heap entries
+are skipped when popped.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.models import TrackedEvent
+from src.query_index import to_ts
+
+LOCK, SETTLE, EXPIRE = "lock", "settle", "expire"
+# Same-second deadlines fire in lifecycle order
+_ORDER = {LOCK: 0, SETTLE: 1, EXPIRE: 2}
+
+Handler = Callable[[str], None]
+
+
+class LifecycleScheduler:
+    def __init__(
+        self,
+        handlers: Dict[str, Handler],
+        lock_lead: timedelta = timedelta(hours=1),
+        expire_after: timedelta = timedelta(hours=1),
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            handlers: Action name (lock/settle/expire) -> callable(event_id)
+            lock_lead: How long before ``event_time`` the bias is locked
+            expire_after: How long after ``event_time`` the event is removed
+            clock: Time source in POSIX seconds (injectable for tests)
+        """
+        self.handlers = handlers
+        self.lock_lead = lock_lead
+        self.expire_after = expire_after
+        self.clock = clock
+        # (deadline, lifecycle order, seq, event_id, generation, action)
+        self._heap: List[Tuple[float, int, int, str, int, str]] = []
+        self._generation: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def deadlines(self, event: TrackedEvent) -> Dict[str, float]:
+        event_ts = to_ts(event.event_time)
+        return {
+            LOCK: event_ts - self.lock_lead.total_seconds(),
+            SETTLE: event_ts,
+            EXPIRE: event_ts + self.expire_after.total_seconds(),
+        }
+
+    def schedule_event(self, event: TrackedEvent):
+        """(Re)schedule all pending actions of an event. O(log n)."""
+        with self._cond:
+            gen = self._generation.get(event.id, 0) + 1
+            self._generation[event.id] = gen
+            for action, deadline in self.deadlines(event).items():
+                if action == LOCK and event.is_locked:
+                    continue
+                if action == SETTLE and event.settled_at is not None:
+                    continue
+                entry = (deadline, _ORDER[action], next(self._seq), event.id, gen)
+                heapq.heappush(self._heap, entry + (action,))
+            self._cond.notify()
+
+    def cancel(self, event_id: str):
+        """Drop all pending actions of an event."""
+        with self._cond:
+            if event_id in self._generation:
+                self._generation[event_id] += 1
+
+    def next_deadline(self) -> Optional[float]:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap and self._heap[0][4] != self._generation.get(
+            self._heap[0][3]
+        ):
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: float) -> List[Tuple[str, str]]:
+        due = []
+        with self._cond:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, _, event_id, _, action = heapq.heappop(self._heap)
+                due.append((action, event_id))
+        return due
+
+    def run_due(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Fire every action due at ``now``; returns ``(action, event_id)``s."""
+        due = self._pop_due(self.clock() if now is None else now)
+        for action, event_id in due:
+            handler = self.handlers.get(action)
+            if handler is None:
+                continue
+            try:
+                handler(event_id)
+                logger.info(f"LifecycleScheduler: {action} fired for {event_id}")
+            except Exception as e:
+                logger.exception(
+                    f"LifecycleScheduler: {action} failed for {event_id}: {e}"
+                )
+            if action == EXPIRE:
+                with self._cond:
+                    self._generation.pop(event_id, None)
+        return due
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                self._drop_stale()
+                timeout = None
+                if self._heap:
+                    timeout = max(self._heap[0][0] - self.clock(), 0.0)
+                if timeout is None or timeout > 0:
+                    # Woken early by schedule_event() or stop()
+                    self._cond.wait(timeout)
+                    continue
+            self.run_due()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="lifecycle-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
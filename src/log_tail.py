@@ -0,0 +1,184 @@
+"""
+LogTail: Cheap tail/follow reads of the application log file.
+
+Reads seek backwards from the end of the file instead of loading it whole, and
+a byte-offset cursor lets clients fetch only what was appended since their last
+read. Cursors survive the size-based rotation configured in ``setup_logging``:
+loguru renames the full file and starts a new one, so a cursor whose file has
+been rotated away is resolved by inode to the renamed file, drained, and then
+continued at the start of the new file.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass
+class LogChunk:
+    """Lines read from the log plus the cursor to resume from."""
+
+    lines: List[str] = field(default_factory=list)
+    cursor: str = ""
+    rotated: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.lines)
+
+
+class LogTail:
+    def __init__(self, path: str, block_size: int = 8192, max_read: int = 256 * 1024):
+        """
+        Args:
+            path: Path of the active log file
+            block_size: Bytes read per backwards step when tailing
+            max_read: Upper bound of bytes returned by a single cursor read
+        """
+        self.path = path
+        self.block_size = block_size
+        self.max_read = max_read
+
+    @staticmethod
+    def make_cursor(inode: int, offset: int) -> str:
+        return f"{inode}:{offset}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> Optional[Tuple[int, int]]:
+        try:
+            inode, offset = cursor.split(":", 1)
+            return int(inode), int(offset)
+        except (AttributeError, ValueError):
+            return None
+
+    def tail(self, lines: int = 100) -> LogChunk:
+        """Return the last ``lines`` complete lines and a cursor at end of file."""
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                end = self._last_newline_end(f, st.st_size)
+                data = self._read_last_lines(f, end, lines)
+        except FileNotFoundError:
+            return LogChunk()
+        return LogChunk(
+            lines=self._decode_lines(data),
+            cursor=self.make_cursor(st.st_ino, end),
+        )
+
+    def read_since(self, cursor: Optional[str], lines: int = 100) -> LogChunk:
+        """
+        Return complete lines appended after ``cursor``.
+
+        Without a valid cursor this behaves like ``tail(lines)``. If the file
+        was rotated since the cursor was issued, the remainder of the rotated
+        file is returned first, followed by the new file.
+        """
+        parsed = self.parse_cursor(cursor) if cursor else None
+        if parsed is None:
+            return self.tail(lines)
+        inode, offset = parsed
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return LogChunk(cursor=cursor)
+
+        if st.st_ino == inode and st.st_size >= offset:
+            data, new_offset = self._read_forward(self.path, offset)
+            return LogChunk(
+                lines=self._decode_lines(data),
+                cursor=self.make_cursor(inode, new_offset),
+            )
+
+        # Rotated (new inode) or truncated in place: drain the old file if it
+        # can still be found, then start the current file from the top.
+        drained = b""
+        old_path = self._find_rotated(inode) if st.st_ino != inode else None
+        if old_path:
+            drained, _ = self._read_forward(old_path, offset, final=True)
+        data, new_offset = self._read_forward(
+            self.path, 0, budget=max(self.max_read - len(drained), 0)
+        )
+        logger.debug(f"LogTail: rotation detected, resumed from {old_path or 'top'}")
+        return LogChunk(
+            lines=self._decode_lines(drained + data),
+            cursor=self.make_cursor(st.st_ino, new_offset),
+            rotated=True,
+        )
+
+    def _read_last_lines(self, f, end: int, lines: int) -> bytes:
+        """Read backwards from ``end`` in blocks until ``lines`` lines are found."""
+        if lines <= 0 or end == 0:
+            return b""
+        pos = end
+        buf = b""
+        # One extra newline is needed to find the start of the first line
+        while pos > 0 and buf.count(b"\n") <= lines:
+            step = min(self.block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+        # buf ends with a newline, so the last part is empty; when pos > 0 the
+        # first part is a partial line and is never within the kept slice.
+        parts = buf.split(b"\n")
+        return b"\n".join(parts[-(lines + 1):])
+
+    def _last_newline_end(self, f, size: int) -> int:
+        """Offset just past the last newline, so partial lines are never served."""
+        pos = size
+        while pos > 0:
+            step = min(self.block_size, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            idx = block.rfind(b"\n")
+            if idx != -1:
+                return pos - step + idx + 1
+            pos -= step
+        return 0
+
+    def _read_forward(
+        self, path: str, offset: int, budget: Optional[int] = None, final=False
+    ) -> Tuple[bytes, int]:
+        """
+        Read complete lines from ``offset``. Returns the data and the offset
+        just past the last complete line. ``final`` also returns a trailing
+        partial line (used for rotated files that will not grow any more).
+        A line longer than ``budget`` is returned in pieces of ``budget``
+        bytes, so the offset always advances.
+        """
+        budget = self.max_read if budget is None else budget
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(budget)
+        except FileNotFoundError:
+            return b"", offset
+        if not final:
+            cut = data.rfind(b"\n") + 1
+            if cut or len(data) < budget:
+                data = data[:cut]
+        elif data and not data.endswith(b"\n"):
+            data += b"\n"
+        return data, offset + len(data)
+
+    def _find_rotated(self, inode: int) -> Optional[str]:
+        """Locate the renamed file that still carries ``inode``."""
+        log_dir = os.path.dirname(os.path.abspath(self.path))
+        try:
+            entries = list(os.scandir(log_dir))
+        except FileNotFoundError:
+            return None
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.inode() == inode:
+                    return entry.path
+            except OSError:
+                continue
+        return None
+
+    @staticmethod
+    def _decode_lines(data: bytes) -> List[str]:
+        if not data:
+            return []
+        return data.decode("utf-8", errors="replace").splitlines(keepends=True)
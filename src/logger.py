@@ -1,49 +1,133 @@
 from loguru import logger
 from src.config import LoggingConfig
 import os
+import sys
+import threading
+import time
 
 
-def setup_logging(config: LoggingConfig) -> None:
+_configured = False
+
+
+class RateLimitFilter:
+    """
+    Loguru filter that caps how often each log call site emits.
+
+    Records below WARNING from one call site (module and line) pass at most
+    ``limit`` times per ``interval`` seconds; the rest are dropped and
+    counted, and the next record that passes notes how many were skipped.
+    Warnings and errors always pass.
+
+    The last decision is remembered per thread, so one instance can be
+    shared by several sinks (which see the same record in turn) without
+    counting a record twice.
+    """
+
+    def __init__(self, limit: int = 20, interval: float = 60.0):
+        self.limit = limit
+        self.interval = interval
+        self._windows = {}  # (module, line) -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+        self._last = threading.local()
+
+    def __call__(self, record) -> bool:
+        last = self._last
+        if getattr(last, "record", None) is record:
+            return last.allowed
+        last.record, last.allowed = record, self._allow(record)
+        return last.allowed
+
+    def _allow(self, record) -> bool:
+        if self.limit <= 0 or record["level"].no >= 30:  # WARNING and above
+            return True
+        key = (record["name"], record["line"])
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.limit:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record["message"] += f" [{suppressed} similar messages suppressed]"
+        return True
+
+
+def setup_logging(config: LoggingConfig, force: bool = False) -> None:
     """
     Configure application logging using loguru.
 
+    Only the first call takes effect, so every entry point can call it.
+    Every sink is asynchronous (``enqueue=True``): a log call formats the
+    record and hands it to a background thread, so slow disks or terminals
+    never block the pipeline.
+
     Args:
         config: Logging configuration object
+        force: Reconfigure even if logging was already set up
     """
+    global _configured
+    if _configured and not force:
+        return
+    _configured = True
+    config = config or LoggingConfig()
+    level = config.level.upper()
+    rate_limit = RateLimitFilter(config.rate_limit, config.rate_limit_interval)
+
     # Remove default handlers
     logger.remove()
 
     # Console handler
-    logger.add(
-        lambda msg: print(msg, end=""),
-        colorize=True,
-        format=(
-            "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-            "<level>{level: <8}</level> | "
-            "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-            "<level>{message}</level>"
-        ),
-    )
+    if config.console:
+        logger.add(
+            sys.stdout,
+            level=level,
+            colorize=sys.stdout.isatty(),
+            enqueue=True,
+            filter=rate_limit,
+            format=(
+                "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+                "<level>{level: <8}</level> | "
+                "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+                "<level>{message}</level>"
+            ),
+        )
 
-    # File handler
-    log_dir = os.path.join(os.path.dirname(__file__), "..", "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "app.log")
-    print("Log file path:", os.path.abspath(log_file))
+    # File handler (tailed by the UI through /api/logs)
+    log_dir = os.path.dirname(config.file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
     logger.add(
-        log_file,
-        rotation="10 MB",
-        retention="10 days",
+        config.file,
+        level=level,
+        rotation=config.max_size,
+        retention=config.backup_count,
         encoding="utf-8",
         enqueue=True,
-        backtrace=True,
-        diagnose=True,
-        level="DEBUG",
+        backtrace=False,
+        diagnose=False,  # never dump local variables (API keys) into the file
+        filter=rate_limit,
     )
 
-    # Optionally apply config
-    if config:
-        # You can add more config-based handlers here if needed
-        pass
+    # Structured sink: one JSON object per line, for log shippers
+    if config.json_file:
+        json_dir = os.path.dirname(config.json_file)
+        if json_dir:
+            os.makedirs(json_dir, exist_ok=True)
+        logger.add(
+            config.json_file,
+            level=level,
+            rotation=config.max_size,
+            retention=config.backup_count,
+            encoding="utf-8",
+            enqueue=True,
+            serialize=True,
+            filter=rate_limit,
+        )
 
-    logger.info("Logging system initialized")
+    logger.info(f"Logging system initialized (level={level}, file={config.file})")
@@ -1,60 +1,44 @@
+import argparse
+import asyncio
 import os
 import signal
 import sys
+import threading
 import time
-from datetime import timezone  # Removed timedelta, datetime
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from loguru import logger
-from dotenv import load_dotenv
-from pathlib import Path
 
-import threading
+from src import circuit_breaker, metrics, tracing
+from src.bootstrap import get_app, profiler
+from src.circuit_breaker import Backoff, CircuitOpen
+from src.event_discovery import EventCache, EventDiscovery
+from src.lifecycle_scheduler import EXPIRE, LOCK, SETTLE, LifecycleScheduler
+from src.models import TrackedEvent, VirtualPortfolio
+from src.pipeline import Deferred, Pipeline, Stage
+from src.state_reader import write_status
+from src.work_queue import WorkQueue
+
+# Nothing is loaded or constructed at import time: components are built on
+# first use (see src.bootstrap)
+app = get_app()
+pipeline: Optional[Pipeline] = None
+deferred: Optional[Deferred] = None
+discovery: Optional[EventDiscovery] = None
+
 
-from src.config import load_config
-from src.logger import setup_logging
-from src.app_repository import AppRepository
-from src.portfolio_manager import PortfolioManager
-from src.models import TrackedEvent
-from src.news_analyzer import NewsAnalyzer
-from src.event_predictor import Predictor
-from src.reddit_scraper import RedditScraper
-from src.find_target_events import FindTargetEvents
-
-# Load configuration
-load_dotenv()
-config = load_config(Path("config/config.yaml"))
-setup_logging(config.logging)
-logger.info("Starting TwitchBot...")
-logger.info("Test log: server started and logging is working.")
-
-# Initialize NewsAnalyzer after dotenv is loaded
-news_analyzer = NewsAnalyzer()
-
-# Load state from disk if available
-state_file = "state.json"
-state_exists = os.path.exists(state_file)
-app_repo = AppRepository(max_events=getattr(config, "max_events", 10))
-portfolio_manager = PortfolioManager()
-# Store global LLM log entries
-app_repo.llm_log = []
-
-
-def main(with_signals=True):
+def main(with_signals=True, profile_startup=False):
     """Main entry point for the application."""
     try:
-        # Load configuration
-        load_dotenv()
-        config = load_config(Path("config/config.yaml"))
-        setup_logging(config.logging)
+        config = app.config
+        tracing.configure(config.tracing)
         logger.info("Starting TwitchBot...")
-        logger.info("Test log: server started and logging is working.")
-
-        # Initialize NewsAnalyzer after dotenv is loaded
-        news_analyzer = NewsAnalyzer()
-
-        # Load state from disk if available
-        state_file = "state.json"
-        state_exists = os.path.exists(state_file)
-        app_repo.load()
+        app_repo = app.app_repo  # loads state.json if present
+        state_exists = os.path.exists(app.state_file)
+        # Build these before the scheduler can fire handlers that use them
+        app.predictor
+        app.portfolio_manager
         if not state_exists:
             # Seed events from config.yaml only if state.json does not exist
             for event_cfg in config.events:
@@ -64,71 +48,49 @@ def main(with_signals=True):
                     event_time=event_cfg.event_time,
                     keywords=event_cfg.keywords,
                 )
-                logger.info(f"main.py: Adding event from config of type {type(event)}")
-                assert isinstance(
-                    event, TrackedEvent
-                ), f"Attempted to add non-TrackedEvent: {event}"
                 event_time = event.event_time
                 if event_time.tzinfo is None:
                     event_time = event_time.replace(tzinfo=timezone.utc)
                 event.event_time = event_time
-                app_repo.events.add(event)
+                with app_repo.writer():
+                    app_repo.events.add(event)
                 logger.info(f"Added event from config: {event.id}")
-            # Force immediate save to debug state
             app_repo.save()
 
-        # --- Event update logic: ensure at least 3 up-to-date events ---
-        from datetime import datetime, timezone
-
-        now = datetime.now(timezone.utc)
-        # Remove outdated events
-        current_events = app_repo.events.get_all()
-        outdated_ids = [e.id for e in current_events if e.event_time < now]
-        for eid in outdated_ids:
-            app_repo.events.remove(eid)
-        # Refresh current events after removals
-        current_events = app_repo.events.get_all()
-        needed = 3 - len(current_events)
-        logger.info(f"Event update: needed={needed}, outdated_ids={outdated_ids}")
-        if needed > 0:
-            logger.info("Attempting to fetch new events from LLM...")
-            # Call the synchronous method to get LLM events
-            llm_events = FindTargetEvents().get_llm_events(needed)
-            logger.info(
-                f"Fetched {len(llm_events)} events from LLM: "
-                f"{[e.id for e in llm_events]}"
-            )
-            # Only add events that are not already present (by ID)
-            existing_ids = {e.id for e in app_repo.events.get_all()}
-            added = False
-            for event in llm_events:
-                if event.id not in existing_ids:
-                    logger.info(
-                        f"Adding event to repository: {event.id} - {event.name}"
-                    )
-                    app_repo.events.add(event)
-                    added = True
-            logger.info(
-                f"Events after update: {[e.id for e in app_repo.events.get_all()]}"
-            )
-            if added or outdated_ids:
-                app_repo.save()
-                logger.info("Saved state after event update.")
+        # Lock/settle/expire run at each event's deadlines from here on;
+        # actions that became due while we were down fire right away.
+        scheduler = LifecycleScheduler(
+            {LOCK: _lock_event, SETTLE: _settle_event, EXPIRE: _expire_event},
+            lock_lead=timedelta(hours=config.sentiment.lock_hours_before),
+            expire_after=timedelta(hours=config.sentiment.expire_hours_after),
+        )
+        for event in app_repo.events.get_all():
+            scheduler.schedule_event(event)
+        fired = scheduler.run_due()
+        logger.info(f"Startup: {len(fired)} overdue lifecycle actions applied")
 
-        last_save = time.time()
+        # Missing events are discovered in the background (cache first, then
+        # the LLM) so ingestion starts right away
+        global discovery
+        discovery = build_discovery(scheduler)
 
-        # Initialize RedditScraper directly
-        scraper = RedditScraper(
-            client_id=os.getenv("REDDIT_CLIENT_ID"),
-            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-            user_agent=os.getenv("REDDIT_USER_AGENT"),
-        )
+        scraper = app.reddit_scraper
+        news_analyzer = None if config.pipeline.external_workers else app.news_analyzer
+        if profile_startup:
+            logger.info(f"Startup profile:\n{profiler.report()}")
+            return
 
         shutdown_event = threading.Event()
 
+        scheduler.start()
+        discovery.start()
+
         def signal_handler(signum, frame):
             logger.info("Shutting down...")
+            scheduler.stop()
+            discovery.stop()
             app_repo.save()
+            _export_trace(force=True)
             shutdown_event.set()
             sys.exit(0)
 
@@ -136,149 +98,415 @@ def main(with_signals=True):
             signal.signal(signal.SIGINT, signal_handler)
             signal.signal(signal.SIGTERM, signal_handler)
 
-        # Track processed news IDs to avoid duplicate analysis
-        # Use persistent processed_news_ids from app_repo
-        shown_news_ids = set()
-
-        # Main integration loop
+        # Ingest -> dedupe -> prefilter -> analyze -> aggregate -> persist,
+        # each stage with its own queue and workers
         fetch_interval = getattr(config.reddit, "fetch_interval", 300)
         logger.info(
             f"Reddit fetch interval set to {fetch_interval} seconds from config."
         )
-        save_interval = getattr(config, "ui_update_interval", 5)
-        while not shutdown_event.is_set():
-            try:
-                # 1. Fetch news from all subreddits and update state
-                all_news = []
-                for subreddit in config.reddit.subreddits:
-                    try:
-                        posts = scraper.fetch_subreddit_posts(
-                            subreddit, limit=config.reddit.max_posts_per_fetch
-                        )
-                        all_news.extend(posts)
-                    except Exception as e:
-                        logger.error(f"Error fetching from r/{subreddit}: {str(e)}")
-                        continue
-                # Only process new news for analysis
-                new_news = [
-                    n for n in all_news if n.id not in app_repo.processed_news_ids
-                ]
-                for news in new_news:
-                    # Only add to state if not already shown, and only if truly new
-                    if news.id not in shown_news_ids:
-                        added = app_repo.news.add(news)
-                        if added:
-                            app_repo.save()  # Save state immediately after adding news
-                        shown_news_ids.add(news.id)
-
-                # 2. Analyze all new news items (synchronously)
-                for news in new_news:
-                    results = news_analyzer.analyze(news, app_repo.events.get_all())
-                    if hasattr(results, "__await__"):
-                        import asyncio
-
-                        results = asyncio.run(results)
-                    for event_id, insight in results:
-                        if event_id == "__global__":
-                            current_time_iso = datetime.now(timezone.utc).isoformat()
-                            log_entry = (
-                                {
-                                    "text": insight.text,
-                                    "score": insight.score,
-                                    "trend": insight.trend,
-                                    "timestamp": insight.timestamp.isoformat(),
-                                    "news_id": news.id,
-                                    "news_title": news.title,
-                                    "added_at": current_time_iso,
-                                },
-                            )
-                            app_repo.llm_log.insert(0, log_entry)
-                        else:
-                            event = next(
-                                (
-                                    e
-                                    for e in app_repo.events.get_all()
-                                    if e.id == event_id
-                                ),
-                                None,
-                            )
-                            if event:
-                                event.insights.append(insight)
-                                app_repo.events.update(event_id, event)
-                                # Also add event-specific insights to llm_log for UI display
-                                app_repo.llm_log.insert(
-                                    0,
-                                    {
-                                        "text": insight.text,
-                                        "score": insight.score,
-                                        "trend": insight.trend,
-                                        "timestamp": insight.timestamp.isoformat(),
-                                        "news_id": news.id,
-                                        "news_title": news.title,
-                                        "event_id": event_id,
-                                        "added_at": datetime.now(
-                                            timezone.utc
-                                        ).isoformat(),
-                                    },
-                                )
-                    app_repo.processed_news_ids.add(news.id)
-                    app_repo.save()  # Save state after each LLM analysis
-
-                # 3. After all news are analyzed, run prediction for each event
-                for event in app_repo.events.get_all():
-                    assert not isinstance(event, dict), f"Dict found in events: {event}"
-                    updated_event = Predictor.predict(event)
-                    app_repo.events.update(event.id, updated_event)
-
-                # 4. Simulate event completion and portfolio update
-                now = datetime.now(timezone.utc)
-                for event in app_repo.events.get_all():
-                    et = event.event_time
-                    if et.tzinfo is None:
-                        et = et.replace(tzinfo=timezone.utc)
-                    et_ts = et.timestamp()
-                    now_ts = now.timestamp()
-                    if not event.is_locked and (et_ts - now_ts) < 0:
-                        actual_outcome = "Call"
-                        portfolio_manager.update_on_event(event, actual_outcome)
-                        from src.models import VirtualPortfolio
-
-                        app_repo.portfolio.set(
-                            VirtualPortfolio(
-                                current_value=portfolio_manager.get_value()
-                            )
-                        )
-                        # For lock, update the event object directly and store
-                        locked_event = app_repo.events.get(event.id)
-                        locked_event.is_locked = True
-                        locked_event.lock_time = now
-                        app_repo.events.update(event.id, locked_event)
-
-                # 5. Update portfolio in state
-                from src.models import VirtualPortfolio
-
-                app_repo.portfolio.set(
-                    VirtualPortfolio(current_value=portfolio_manager.get_value())
-                )
-
-                # 6. Save state every 5 seconds
-                now = time.time()
-                if now - last_save >= save_interval:
-                    app_repo.save()
-                    last_save = now
-
-            except Exception as e:
-                logger.exception(f"Main loop error: {e}")
-            sleep_step = 1
-            slept = 0
-            while not shutdown_event.is_set() and slept < fetch_interval:
-                time.sleep(sleep_step)
-                slept += sleep_step
+        global pipeline
+        pipeline = build_pipeline(scraper, news_analyzer, fetch_interval)
+        asyncio.run(pipeline.run(stop=shutdown_event.is_set))
 
     except Exception as e:
         logger.exception(f"Error in main: {str(e)}")
         raise
 
 
+def build_discovery(scheduler: LifecycleScheduler) -> EventDiscovery:
+    """Background event discovery that schedules and saves what it adds."""
+    settings = app.config.discovery
+
+    def discover(n):
+        # The OpenAI client is only built (and imported) on the first miss
+        return app.event_finder.get_llm_events(n, timeout=settings.timeout_seconds)
+
+    def on_added(event):
+        scheduler.schedule_event(event)
+        app.app_repo.save()
+
+    return EventDiscovery(
+        app.app_repo,
+        discover,
+        EventCache(settings.cache_file, settings.cache_ttl_hours * 3600.0),
+        on_added,
+        target=settings.target_events,
+        interval=settings.refresh_minutes * 60.0,
+    )
+
+
+def build_pipeline(scraper, news_analyzer, fetch_interval: float) -> Pipeline:
+    """Wire the ingestion and analysis stages around the shared repository."""
+    cfg = app.config.pipeline
+    # Fetched but not yet applied; keeps re-fetched posts from being queued
+    # twice. The scraper never returns a post twice, so items that cannot be
+    # analyzed now are set aside in `deferred` and fed back to the prefilter
+    # later, rather than released.
+    in_flight = set()
+    # Failed analyses are rescheduled with jittered exponential backoff
+    breakers = app.config.breakers
+    backoff = Backoff(breakers.retry_base_seconds, breakers.retry_max_seconds)
+    attempts = {}  # news ID -> failed analysis attempts
+
+    def give_up(news):
+        logger.warning(f"Too many items set aside; {news.id} will not be analyzed")
+        in_flight.discard(news.id)
+
+    global deferred
+    parked = deferred = Deferred(
+        cfg.max_deferred, poll=min(1.0, fetch_interval), on_drop=give_up
+    )
+
+    def defer(news, delay: float):
+        parked.hold(news.id, news, time.time() + delay)
+
+    async def ingest(emit):
+        while True:
+            for subreddit in app.config.reddit.subreddits:
+                try:
+                    posts = await asyncio.to_thread(
+                        scraper.fetch_subreddit_posts,
+                        subreddit,
+                        limit=app.config.reddit.max_posts_per_fetch,
+                    )
+                except CircuitOpen as e:
+                    logger.debug(f"Skipping r/{subreddit}: {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Error fetching from r/{subreddit}: {str(e)}")
+                    continue
+                for post in posts:
+                    await emit(post)
+            await asyncio.to_thread(_write_engine_status)
+            # Polled less often when saving budget, so each cycle is a larger batch
+            await asyncio.sleep(app.budget.fetch_interval(fetch_interval))
+
+    async def dedupe(batch):
+        fresh = []
+        with app.app_repo.writer():
+            for news in batch:
+                if news.id in app.app_repo.processed_news_ids or news.id in in_flight:
+                    continue
+                in_flight.add(news.id)
+                app.app_repo.add_news(news)
+                fresh.append(news)
+        return fresh
+
+    async def trending(batch):
+        # New items only (after dedupe), whether or not they get analyzed
+        app.trending.observe(batch)
+        return batch
+
+    async def prefilter(batch):
+        events = app.app_repo.events.get_all()
+        if not events:
+            for news in batch:
+                in_flight.discard(news.id)
+            return []
+        if app.budget.paused:
+            # Paused by the budget: hold the items until the period resets
+            resume_in = max(0.0, app.budget.period_end() - time.time())
+            for news in batch:
+                defer(news, resume_in)
+            return []
+        min_hits = app.budget.min_keyword_hits(cfg.require_keyword_match)
+        if not min_hits:
+            return batch
+        keywords = {k.lower() for e in events for k in e.keywords}
+        keep = []
+        with app.app_repo.writer():
+            for news in batch:
+                text = f"{news.title} {news.snippet}".lower()
+                if sum(k in text for k in keywords) >= min_hits:
+                    keep.append(news)
+                else:
+                    app.app_repo.processed_news_ids.add(news.id)
+                    in_flight.discard(news.id)
+        return keep
+
+    async def analyze(batch):
+        (news,) = batch
+        try:
+            with tracing.news_item(news.id):
+                results = await news_analyzer.analyze(
+                    news, app.app_repo.events.get_all()
+                )
+        except CircuitOpen as e:
+            # Anthropic is failing: park the item until the breaker half-opens
+            # (not an attempt; the request was never sent)
+            analyze_stage.retry_later(news, e.retry_in + backoff.delay(1))
+            return []
+        except Exception as e:
+            attempt = attempts[news.id] = attempts.get(news.id, 0) + 1
+            if attempt >= cfg.max_attempts:
+                # Out of quick retries: try again much later
+                attempts.pop(news.id, None)
+                logger.error(
+                    f"Analysis of {news.id} failed {attempt} times; set aside for "
+                    f"{backoff.cap:.0f}s: {e}"
+                )
+                defer(news, backoff.cap)
+                return []
+            delay = backoff.delay(attempt)
+            logger.warning(
+                f"Analysis of {news.id} failed (attempt {attempt}/"
+                f"{cfg.max_attempts}); retrying in {delay:.1f}s: {e}"
+            )
+            analyze_stage.retry_later(news, delay)
+            return []
+        attempts.pop(news.id, None)
+        return [(news, results)]
+
+    async def aggregate(batch):
+        # Apply every finished analysis in one update, then predict once.
+        # Already processed items (re-delivered by the work queue) are skipped.
+        with app.app_repo.writer():
+            updated = set()
+            for news, results in batch:
+                if news.id not in app.app_repo.processed_news_ids:
+                    with tracing.news_item(news.id), tracing.span("aggregate.apply"):
+                        updated |= _apply_analysis(news, results)
+                in_flight.discard(news.id)
+            app.predictor.predict_all(app.app_repo.events.get_all())
+            _record_sentiment(updated)
+        return [news.id for news, _ in batch]
+
+    async def persist(batch):
+        await asyncio.to_thread(app.app_repo.save)
+        await asyncio.to_thread(_write_engine_status)
+        await asyncio.to_thread(_export_trace)
+        if queue is not None:
+            # Only after the state holding them is on disk
+            await asyncio.to_thread(queue.mark_applied, batch)
+            applying.difference_update(batch)
+
+    stages = [
+        Stage("dedupe", dedupe, maxsize=cfg.queue_size, batch_size=100),
+        Stage("prefilter", prefilter, maxsize=cfg.queue_size, batch_size=100),
+    ]
+    if app.config.trending.enabled:
+        stages.insert(
+            1, Stage("trending", trending, maxsize=cfg.queue_size, batch_size=100)
+        )
+    feeds = {}
+    if not cfg.external_workers:
+        queue = None
+        analyze_stage = Stage(
+            "analyze",
+            analyze,
+            concurrency=cfg.analyze_concurrency,
+            maxsize=cfg.analyze_queue_size,
+            overflow="drop_oldest",
+            # Shed while saturated: offered again after the next fetch
+            on_drop=lambda news: defer(news, fetch_interval),
+        )
+        stages.append(analyze_stage)
+    else:
+        # Analysis runs in `python -m src.analyzer_worker` processes
+        queue = WorkQueue(cfg.queue_path)
+        applying = set()  # collected from the queue, not yet marked applied
+
+        async def enqueue(batch):
+            await asyncio.to_thread(queue.publish_events, app.app_repo.events.get_all())
+            await asyncio.to_thread(queue.enqueue, batch)
+            # The queue now owns these and dedupes by ID
+            for news in batch:
+                in_flight.discard(news.id)
+            return []
+
+        async def collect(emit):
+            retention = cfg.queue_retention_hours * 3600
+            next_purge = 0.0
+            while True:
+                if time.time() >= next_purge:
+                    purged = await asyncio.to_thread(
+                        queue.purge, time.time() - retention
+                    )
+                    if purged:
+                        logger.info(f"Purged {purged} finished work items")
+                    next_purge = time.time() + min(retention, 600)
+                done = await asyncio.to_thread(queue.completed, 100, set(applying))
+                for news, results in done:
+                    applying.add(news.id)
+                    await emit((news, results))
+                if not done:
+                    await asyncio.sleep(1.0)
+
+        stages.append(Stage("enqueue", enqueue, maxsize=cfg.queue_size, batch_size=100))
+        feeds["aggregate"] = collect
+    stages += [
+        Stage("aggregate", aggregate, maxsize=cfg.queue_size, batch_size=100),
+        Stage("persist", persist, maxsize=cfg.queue_size, batch_size=1000),
+    ]
+    feeds["prefilter"] = parked.feed
+    return Pipeline(ingest, stages, feeds)
+
+
+metrics.gauge(
+    "pipeline_deferred_items",
+    "Items set aside for a later analysis",
+    callback=lambda: len(deferred) if deferred is not None else 0,
+)
+
+
+def pipeline_metrics() -> dict:
+    """Per-stage queue depth and latency of the running pipeline."""
+    return pipeline.metrics() if pipeline is not None else {}
+
+
+def _stage_values(field):
+    return lambda: {
+        (name,): stage[field] for name, stage in pipeline_metrics().items()
+    }
+
+
+metrics.gauge(
+    "pipeline_queue_depth",
+    "Items waiting in each stage's queue",
+    ["stage"],
+    callback=_stage_values("queue_depth"),
+)
+metrics.gauge(
+    "pipeline_processed_items",
+    "Items each stage has finished",
+    ["stage"],
+    callback=_stage_values("processed"),
+)
+metrics.gauge(
+    "pipeline_dropped_items",
+    "Items each stage dropped on overflow",
+    ["stage"],
+    callback=_stage_values("dropped"),
+)
+
+
+def _write_engine_status():
+    """Share pipeline metrics with web processes running in external mode."""
+    try:
+        status = {
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "pipeline": pipeline_metrics(),
+            "breakers": circuit_breaker.registry.status(),
+            "trending": app.trending.snapshot(),
+            "metrics": metrics.REGISTRY.render(),
+        }
+        write_status(app.config.engine_status_file, status)
+    except OSError as e:
+        logger.warning(f"Could not write engine status: {e}")
+
+
+_last_trace_export = 0.0
+
+
+def _export_trace(force=False):
+    """Write the Chrome trace file, at most every ``export_interval`` seconds."""
+    global _last_trace_export
+    settings = app.config.tracing
+    if not settings.enabled:
+        return
+    if not force and time.monotonic() - _last_trace_export < settings.export_interval:
+        return
+    _last_trace_export = time.monotonic()
+    try:
+        tracing.tracer.export(settings.trace_file)
+    except OSError as e:
+        logger.warning(f"Could not write trace file: {e}")
+
+
+def _apply_analysis(news, results):
+    """
+    Record analyzer results for one news item. Call inside app_repo.writer().
+    Returns the IDs of the events that got new insights.
+    """
+    updated = set()
+    for event_id, insight in results:
+        log_entry = {
+            "text": insight.text,
+            "score": insight.score,
+            "trend": insight.trend,
+            "relevance_score": insight.relevance_score,
+            "timestamp": insight.timestamp.isoformat(),
+            "news_id": news.id,
+            "news_title": news.title,
+            "source": news.source,
+            "added_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if event_id == "__global__":
+            app.app_repo.add_llm_log(log_entry)
+        elif app.app_repo.add_insight(event_id, insight):
+            updated.add(event_id)
+            app.predictor.observe(event_id, insight)
+            # Also add event-specific insights to llm_log for UI display
+            log_entry["event_id"] = event_id
+            app.app_repo.add_llm_log(log_entry)
+    app.app_repo.processed_news_ids.add(news.id)
+    return updated
+
+
+def _record_sentiment(event_ids):
+    """
+    Append the current sentiment of events with new insights to their time
+    series. Call inside app_repo.writer(): an event expired meanwhile is gone
+    and its series closed, so it is skipped rather than reopened.
+    """
+    now = time.time()
+    for event_id in event_ids:
+        event = app.app_repo.events.get(event_id)
+        if event is None or event.is_locked or event.current_sentiment_score is None:
+            continue
+        app.timeseries.series(f"sentiment/{event.id}").append(
+            now, event.current_sentiment_score
+        )
+
+
+def _lock_event(event_id):
+    """Freeze the event's bias; the predictor no longer updates locked events."""
+    with app.app_repo.writer():
+        event = app.app_repo.events.get(event_id)
+        if event is None or event.is_locked:
+            return
+        event.is_locked = True
+        event.lock_time = datetime.now(timezone.utc)
+    app.app_repo.save()
+
+
+def _settle_event(event_id):
+    """Apply the event's outcome to the portfolio once it has taken place."""
+    with app.app_repo.writer():
+        event = app.app_repo.events.get(event_id)
+        if event is None or event.settled_at is not None:
+            return
+        now = datetime.now(timezone.utc)
+        if not event.is_locked:
+            event.is_locked = True
+            event.lock_time = now
+        actual_outcome = "Call"  # Simulated until real outcomes are sourced
+        app.portfolio_manager.update_on_event(event, actual_outcome)
+        app.app_repo.portfolio.set(
+            VirtualPortfolio(current_value=app.portfolio_manager.get_value())
+        )
+        event.settled_at = now
+    app.app_repo.save()
+
+
+def _expire_event(event_id):
+    """Drop an event some time after it took place."""
+    with app.app_repo.writer():
+        app.app_repo.remove_event(event_id)
+        app.predictor.forget(event_id)
+        app.timeseries.close(f"sentiment/{event_id}")
+    app.app_repo.save()
+    if discovery is not None:
+        discovery.wake()
+
+
 if __name__ == "__main__":
-    main(with_signals=True)
+    parser = argparse.ArgumentParser(description="Run the ingestion engine")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import/init time per component after startup and exit",
+    )
+    args = parser.parse_args()
+    main(with_signals=True, profile_startup=args.profile_startup)
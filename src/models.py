@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -29,6 +29,48 @@ class Insight(BaseModel):
     timestamp: datetime = Field(
         default_factory=datetime.utcnow, description="When the insight was generated"
     )
+    relevance_score: Optional[float] = Field(
+        None, description="LLM relevance of the news to the event (0 to 1)"
+    )
+    news_id: Optional[str] = Field(
+        None, description="ID of the news item the insight was derived from"
+    )
+
+
+TRENDS = ("improving", "worsening", "stable")
+
+
+class InsightStats(BaseModel):
+    """Running aggregates over every insight an event has received."""
+
+    count: int = Field(0, description="Number of insights received")
+    score_sum: float = Field(0.0, description="Sum of insight scores")
+    ewma_score: Optional[float] = Field(
+        None, description="Exponentially weighted moving average of scores"
+    )
+    trend_counts: Dict[str, int] = Field(
+        default_factory=dict, description="Insights per trend label"
+    )
+    last_insight_at: Optional[datetime] = Field(
+        None, description="Timestamp of the most recent insight"
+    )
+
+    @property
+    def mean_score(self) -> float:
+        return self.score_sum / self.count if self.count else 0.0
+
+    def update(self, insight: "Insight", alpha: float) -> None:
+        """Fold one insight into the aggregates in O(1)."""
+        self.count += 1
+        self.score_sum += insight.score
+        if self.ewma_score is None:
+            self.ewma_score = insight.score
+        else:
+            self.ewma_score += alpha * (insight.score - self.ewma_score)
+        # Unknown labels are bucketed so the dict stays bounded
+        trend = insight.trend if insight.trend in TRENDS else "other"
+        self.trend_counts[trend] = self.trend_counts.get(trend, 0) + 1
+        self.last_insight_at = insight.timestamp
 
 
 class TrackedEvent(BaseModel):
@@ -47,6 +89,9 @@ class TrackedEvent(BaseModel):
     predicted_action: Optional[str] = Field(
         None, description="Predicted action (Put/Call/Hold)"
     )
+    prediction_confidence: Optional[float] = Field(
+        None, description="Confidence of the current prediction (0 to 1)"
+    )
     thinking_text: Optional[str] = Field(
         None, description="Generated text explaining the current analysis"
     )
@@ -56,8 +101,16 @@ class TrackedEvent(BaseModel):
     lock_time: Optional[datetime] = Field(
         None, description="When the event's bias was locked"
     )
+    settled_at: Optional[datetime] = Field(
+        None, description="When the event's outcome was applied to the portfolio"
+    )
     insights: List[Insight] = Field(
-        default_factory=list, description="LLM-generated insights for this event"
+        default_factory=list,
+        description="Most recent LLM-generated insights (older ones are archived)",
+    )
+    stats: InsightStats = Field(
+        default_factory=InsightStats,
+        description="Running aggregates over all insights, including archived",
     )
 
     @field_validator("event_time", mode="before")
@@ -1,12 +1,27 @@
+import asyncio
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 import os
 
 from loguru import logger
 from anthropic import Anthropic
-from ratelimit import limits, sleep_and_retry
 
+from src import circuit_breaker, metrics, rate_governor, tracing
 from src.models import NewsItem, TrackedEvent, Insight
+from src.token_ledger import Budget, TokenLedger
+
+LLM_CALLS = metrics.counter(
+    "news_analyzer_calls_total", "NewsAnalyzer.analyze calls", ["outcome"]
+)
+LLM_SECONDS = metrics.histogram(
+    "news_analyzer_request_seconds",
+    "Duration of one LLM request (after the rate governor)",
+)
+LLM_TOKENS = metrics.counter(
+    "news_analyzer_tokens_total", "LLM tokens used by news analysis", ["direction"]
+)
+MODEL = "claude-3-7-sonnet-20250219"
+MAX_TOKENS = 500
 
 
 # NewsAnalyzer: Only handles news analysis for events.
@@ -14,14 +29,77 @@ from src.models import NewsItem, TrackedEvent, Insight
 
 
 class NewsAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        governor: Optional[rate_governor.RateGovernor] = None,
+        ledger: Optional[TokenLedger] = None,
+        budget: Optional[Budget] = None,
+        breaker: Optional[circuit_breaker.CircuitBreaker] = None,
+    ):
+        """
+        Args:
+            governor: Paces the requests (the shared "anthropic" one by default)
+            ledger: Records every call's token usage
+            budget: Picks the model as spend rises
+            breaker: Rejects calls while Anthropic is failing ("anthropic")
+        """
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
-        self.client = Anthropic(api_key=api_key)
+        # Throttled requests are retried by the governor, which paces every
+        # Anthropic caller; SDK retries would hide the 429s from it
+        self.client = Anthropic(api_key=api_key, max_retries=0)
+        self.governor = governor or rate_governor.shared("anthropic")
+        self.ledger = ledger
+        self.budget = budget
+        self.breaker = breaker or circuit_breaker.get("anthropic")
+
+    def _create_message(self, prompt: str, model: str = MODEL):
+        """Governed, blocking LLM call; run it off the event loop."""
+
+        def send():
+            with LLM_SECONDS.time(), tracing.span("news_analyzer.llm_request"):
+                return self.client.messages.with_raw_response.create(
+                    model=model,
+                    max_tokens=MAX_TOKENS,
+                    temperature=0.0,
+                    system="Financial analyst providing event-relevant news.",
+                    messages=[{"role": "user", "content": prompt}],
+                )
+
+        # Roughly four characters per input token, plus the answer
+        estimate = len(prompt) // 4 + MAX_TOKENS
+        raw = self.governor.call(send, tokens=estimate, usage=self._used_tokens)
+        return raw.parse()
+
+    @staticmethod
+    def _used_tokens(raw) -> Optional[int]:
+        usage = getattr(raw.parse(), "usage", None)
+        used = 0
+        for direction in ("input", "output"):
+            tokens = getattr(usage, f"{direction}_tokens", None)
+            if isinstance(tokens, int):
+                LLM_TOKENS.labels(direction).inc(tokens)
+                used += tokens
+        return used or None
+
+    def _record_usage(self, response, model, news, events):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        try:
+            self.ledger.record(
+                "news_analyzer",
+                getattr(response, "model", None) or model,
+                usage.input_tokens,
+                usage.output_tokens,
+                news_id=news.id,
+                subreddit=news.source,
+                event_ids=[e.id for e in events],
+            )
+        except Exception as e:  # bookkeeping must not fail the analysis
+            logger.warning(f"NewsAnalyzer: could not record token usage: {e}")
 
-    @sleep_and_retry
-    @limits(calls=15, period=60)
     async def analyze(
         self, news: NewsItem, events: List[TrackedEvent]
     ) -> List[Insight]:
@@ -64,13 +142,44 @@ class NewsAnalyzer:
         ]
         prompt = "\n".join(prompt_parts)
 
-        response = self.client.messages.create(
-            model="claude-3-7-sonnet-20250219",
-            max_tokens=500,
-            temperature=0.0,
-            system="Financial analyst providing event-relevant news.",
-            messages=[{"role": "user", "content": prompt}],
+        # In a worker thread so concurrent analyses (and the governor's
+        # waits) do not block the event loop
+        try:
+            # Includes the governor's wait; each request is a nested span
+            with self.breaker.guard(), tracing.span("news_analyzer.call"):
+                model = self.budget.model(MODEL) if self.budget else MODEL
+                response = await asyncio.to_thread(
+                    self._create_message, prompt, model
+                )
+        except circuit_breaker.CircuitOpen:
+            LLM_CALLS.labels("circuit_open").inc()
+            raise
+        except Exception:
+            LLM_CALLS.labels("error").inc()
+            raise
+        if self.ledger is not None:
+            await asyncio.to_thread(self._record_usage, response, model, news, events)
+        try:
+            with tracing.span("news_analyzer.parse"):
+                result = self._parse_response(news, response)
+        except ValueError:
+            LLM_CALLS.labels("parse_error").inc()
+            raise
+        LLM_CALLS.labels("ok").inc()
+        logger.info(
+            f"NewsAnalyzer: Finished news ID={news.id}, title='{news.title}'. "
+            f"Found {len(result)} insights."
         )
+        for event_id, insight in result:
+            logger.debug(
+                f"Insight for event {event_id}: score={insight.score} "
+                f"trend={insight.trend} relevance={insight.text!r}"
+            )
+        return result
+
+    @staticmethod
+    def _parse_response(news: NewsItem, response) -> list:
+        """(event_id, Insight) pairs from the LLM's line-based answer."""
         # Parse response
         insights = []
         current_event = None
@@ -128,6 +237,8 @@ class NewsAnalyzer:
                             score=score,
                             trend=trend,
                             timestamp=datetime.now(timezone.utc),
+                            relevance_score=relevance_score,
+                            news_id=news.id,
                         ),
                     )
                 )
@@ -143,23 +254,8 @@ class NewsAnalyzer:
                         score=0.0,
                         trend="n/a",
                         timestamp=datetime.now(timezone.utc),
+                        news_id=news.id,
                     ),
                 )
             )
-        logger.info(
-            f"NewsAnalyzer: Finished news ID={news.id}, title='{news.title}'. "
-            f"Found {len(result)} insights."
-        )
-        for event_id, insight in result:
-            logger.info(
-                f"Insight for Event: {event_id}\n"
-                f"  RELEVANCE: {insight.text}\n"
-                f"  SCORE: {insight.score}\n"
-                f"  TREND: {insight.trend}\n"
-                f"  (Linked to event ID: {event_id})"
-            )
-        import asyncio
-
-        # Delay only after finishing all analysis and logging
-        await asyncio.sleep(3)
         return result
@@ -0,0 +1,299 @@
+"""
+Pipeline: Independent async stages connected by bounded queues.
+
+Each ``Stage`` owns an input queue and ``concurrency`` workers. A worker takes
+up to ``batch_size`` queued items, awaits the stage handler and puts every
+returned item on the next stage's queue. A full queue either blocks the
+producer (``overflow="block"``, i.e. backpressure) or evicts its oldest item
+(``overflow="drop_oldest"``, i.e. load shedding), so a saturated stage never
+stalls the stages in front of it beyond its own queue. A handler can hand an
+item back with ``retry_later``; it re-enters the queue after the delay without
+occupying a worker meanwhile. Work that must wait longer (shed on overflow,
+out of retries, paused) is parked in a ``Deferred``, a source that feeds it
+back once due.
+
+Per-stage metrics (queue depth, busy workers, processed/dropped/error/retry
+counts, queue wait and handler latency) are kept in plain counters that can be read
+from any thread.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from src import tracing
+
+Handler = Callable[[List[Any]], Awaitable[Optional[Iterable[Any]]]]
+Source = Callable[[Callable[[Any], Awaitable[None]]], Awaitable[None]]
+
+
+@dataclass
+class StageMetrics:
+    processed: int = 0
+    errors: int = 0
+    dropped: int = 0
+    retried: int = 0
+    retry_pending: int = 0
+    busy: int = 0
+    batches: int = 0
+    wait_ms_avg: float = 0.0
+    latency_ms_avg: float = 0.0
+    latency_ms_max: float = 0.0
+
+    def record(self, items: int, wait_ms: float, latency_ms: float, alpha=0.2):
+        """Count a finished batch; averages are EWMAs."""
+        self.processed += items
+        self.batches += 1
+        if self.batches == 1:
+            self.wait_ms_avg, self.latency_ms_avg = wait_ms, latency_ms
+        else:
+            self.wait_ms_avg += alpha * (wait_ms - self.wait_ms_avg)
+            self.latency_ms_avg += alpha * (latency_ms - self.latency_ms_avg)
+        self.latency_ms_max = max(self.latency_ms_max, latency_ms)
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        concurrency: int = 1,
+        maxsize: int = 100,
+        batch_size: int = 1,
+        overflow: str = "block",
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Args:
+            name: Stage name used in logs and metrics
+            handler: ``async handler(batch) -> outputs`` (None for no outputs)
+            concurrency: Number of workers
+            maxsize: Input queue capacity
+            batch_size: Maximum items handed to one handler call
+            overflow: ``block`` or ``drop_oldest`` when the queue is full
+            on_drop: Called with each item evicted by ``drop_oldest``
+        """
+        if overflow not in ("block", "drop_oldest"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.on_drop = on_drop
+        self.metrics = StageMetrics()
+        self.queue: Optional[asyncio.Queue] = None
+        self.next: Optional["Stage"] = None
+        self._delayed = set()
+
+    async def put(self, item: Any):
+        """Enqueue an item, applying the overflow policy."""
+        entry = (time.perf_counter(), item)
+        if self.overflow == "block":
+            await self.queue.put(entry)
+            return
+        while self.queue.full():
+            _, evicted = self.queue.get_nowait()
+            self.queue.task_done()
+            self.metrics.dropped += 1
+            if self.on_drop:
+                self.on_drop(evicted)
+        self.queue.put_nowait(entry)
+
+    def retry_later(self, item: Any, delay: float):
+        """Put ``item`` back on this stage's queue after ``delay`` seconds.
+
+        Nothing waits for it meanwhile; on shutdown pending retries are
+        cancelled and handed to ``on_drop``.
+        """
+
+        async def requeue():
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                if self.on_drop:
+                    self.on_drop(item)
+                raise
+            finally:
+                self.metrics.retry_pending -= 1
+            await self.put(item)
+
+        self.metrics.retried += 1
+        self.metrics.retry_pending += 1
+        task = asyncio.create_task(requeue())
+        self._delayed.add(task)
+        task.add_done_callback(self._delayed.discard)
+
+    def _take_batch(self, first) -> list:
+        batch = [first]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _worker(self):
+        while True:
+            entries = self._take_batch(await self.queue.get())
+            start = time.perf_counter()
+            self.metrics.busy += 1
+            try:
+                batch = [item for _, item in entries]
+                with tracing.span(
+                    f"stage.{self.name}", items=len(batch), news_ids=_ids(batch)
+                ), tracing.profile_cycle(self.name):
+                    outputs = await self.handler(batch)
+                if self.next is not None:
+                    for out in outputs or ():
+                        await self.next.put(out)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.errors += len(entries)
+                logger.exception(f"Pipeline stage '{self.name}' failed: {e}")
+            finally:
+                self.metrics.busy -= 1
+                end = time.perf_counter()
+                wait = sum(start - enqueued for enqueued, _ in entries) / len(entries)
+                self.metrics.record(len(entries), wait * 1000, (end - start) * 1000)
+                for _ in entries:
+                    self.queue.task_done()
+
+    def snapshot(self) -> dict:
+        depth = self.queue.qsize() if self.queue is not None else 0
+        return {
+            "queue_depth": depth,
+            "queue_capacity": self.maxsize,
+            "concurrency": self.concurrency,
+            "overflow": self.overflow,
+            **asdict(self.metrics),
+        }
+
+
+def _ids(batch: list) -> list:
+    """News IDs in a batch (items, ``(item, ...)`` tuples or plain IDs)."""
+    if not tracing.tracer.enabled:
+        return []
+    ids = []
+    for item in batch:
+        if isinstance(item, tuple) and item:
+            item = item[0]
+        item_id = item if isinstance(item, str) else getattr(item, "id", None)
+        if item_id is not None:
+            ids.append(item_id)
+    return ids
+
+
+class Deferred:
+    """
+    Items set aside until a given time, then fed back into a stage.
+
+    ``hold`` parks an item under a key (holding it again only moves its due
+    time); ``feed`` is a pipeline source that emits items once due. At most
+    ``capacity`` items are kept: beyond that the longest-held one is handed
+    to ``on_drop``.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        poll: float = 1.0,
+        on_drop: Optional[Callable[[Any], None]] = None,
+        clock=time.time,
+    ):
+        self.capacity = capacity
+        self.poll = poll
+        self.on_drop = on_drop
+        self._clock = clock
+        self._items: Dict[Any, tuple] = {}  # key -> (due, item), held first
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def hold(self, key: Any, item: Any, until: float):
+        self._items[key] = (until, item)
+        while len(self._items) > self.capacity:
+            oldest = next(iter(self._items))
+            _, evicted = self._items.pop(oldest)
+            if self.on_drop:
+                self.on_drop(evicted)
+
+    def due(self, now: Optional[float] = None) -> List[Any]:
+        """Remove and return the items due at ``now``."""
+        now = self._clock() if now is None else now
+        keys = [key for key, (until, _) in self._items.items() if until <= now]
+        return [self._items.pop(key)[1] for key in keys]
+
+    async def feed(self, emit):
+        while True:
+            for item in self.due():
+                await emit(item)
+            await asyncio.sleep(self.poll)
+
+
+class Pipeline:
+    def __init__(
+        self,
+        source: Source,
+        stages: List[Stage],
+        feeds: Optional[Dict[str, Source]] = None,
+    ):
+        """
+        Args:
+            source: ``async source(emit)`` that produces items until cancelled
+                or it returns; ``emit`` feeds the first stage
+            stages: Stages in order; each feeds the next
+            feeds: Extra sources keyed by the name of the stage they feed
+        """
+        self.source = source
+        self.stages = stages
+        by_name = {stage.name: stage for stage in stages}
+        self.feeds = [(source, stages[0])] + [
+            (feed, by_name[name]) for name, feed in (feeds or {}).items()
+        ]
+        for stage, following in zip(stages, stages[1:]):
+            stage.next = following
+
+    async def run(self, stop: Optional[Callable[[], bool]] = None):
+        """
+        Run until the sources return, then drain all queues.
+
+        Args:
+            stop: Polled once a second; when it returns True the sources are
+                cancelled and the queues are drained
+        """
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(stage.maxsize)
+        workers = [
+            asyncio.create_task(stage._worker(), name=f"{stage.name}-{i}")
+            for stage in self.stages
+            for i in range(stage.concurrency)
+        ]
+        sources = {
+            asyncio.create_task(feed(stage.put)) for feed, stage in self.feeds
+        }
+        try:
+            while not all(task.done() for task in sources):
+                if stop is not None and stop():
+                    for task in sources:
+                        task.cancel()
+                    break
+                await asyncio.wait(sources, timeout=1.0)
+            await asyncio.gather(*sources, return_exceptions=True)
+            for task in sources:
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error(f"Pipeline source failed: {task.exception()}")
+            for stage in self.stages:
+                await stage.queue.join()
+        finally:
+            delayed = [task for stage in self.stages for task in stage._delayed]
+            for task in workers + delayed:
+                task.cancel()
+            await asyncio.gather(
+                *workers, *sources, *delayed, return_exceptions=True
+            )
+
+    def metrics(self) -> dict:
+        return {stage.name: stage.snapshot() for stage in self.stages}
@@ -1,14 +1,53 @@
 from datetime import datetime, timezone
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.event_predictor import CALL, HOLD, PUT
 from src.models import TrackedEvent
+from src.timeseries import TimeSeries, to_datetime_pairs
+
+OUTCOME_CODES = {"Hold": HOLD, "Call": CALL, "Put": PUT}
+
+
+def prediction_deltas(
+    actions: np.ndarray,
+    outcomes: np.ndarray,
+    points_per_correct: float = 100.0,
+    points_per_incorrect: float = -50.0,
+) -> np.ndarray:
+    """
+    Vectorized portfolio delta of predicted action codes against outcome codes.
+    Hold earns nothing; the arrays broadcast against each other.
+    """
+    return np.where(
+        actions == HOLD,
+        0.0,
+        np.where(actions == outcomes, points_per_correct, points_per_incorrect),
+    )
 
 
 class PortfolioManager:
-    def __init__(self, initial_value: float = 1000.0):
+    def __init__(
+        self,
+        initial_value: float = 1000.0,
+        history: Optional[TimeSeries] = None,
+        points_per_correct: float = 100.0,
+        points_per_incorrect: float = -50.0,
+    ):
+        """
+        Args:
+            initial_value: Starting value, recorded if ``history`` is empty
+            history: Value time series; in memory if not given
+            points_per_correct: Delta for a correct Call/Put prediction
+            points_per_incorrect: Delta for an incorrect Call/Put prediction
+        """
         self.current_value = initial_value
-        self.history: List[Tuple[datetime, float]] = [
-            (datetime.now(timezone.utc), initial_value)
-        ]
+        self.points_per_correct = points_per_correct
+        self.points_per_incorrect = points_per_incorrect
+        self.history = history if history is not None else TimeSeries()
+        if len(self.history) == 0:
+            self.history.append(datetime.now(timezone.utc).timestamp(), initial_value)
 
     def update_on_event(self, event: TrackedEvent, actual_outcome: str) -> float:
         """
@@ -18,15 +57,15 @@ class PortfolioManager:
         if not event.predicted_action or event.predicted_action == "Hold":
             delta = 0
         elif event.predicted_action == actual_outcome:
-            delta = 100  # Reward for correct prediction
+            delta = self.points_per_correct
         else:
-            delta = -50  # Penalty for incorrect prediction
+            delta = self.points_per_incorrect
         self.current_value += delta
-        self.history.append((datetime.now(timezone.utc), self.current_value))
+        self.history.append(datetime.now(timezone.utc).timestamp(), self.current_value)
         return self.current_value
 
     def get_value(self) -> float:
         return self.current_value
 
     def get_history(self) -> List[Tuple[datetime, float]]:
-        return self.history
+        return to_datetime_pairs(self.history)
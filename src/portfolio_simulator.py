@@ -0,0 +1,126 @@
+"""
+PortfolioSimulator: Monte Carlo distribution of the virtual portfolio value
+once all open events have settled.
+
+Each open event with a Call/Put prediction is a Bernoulli trade: it wins
+``points_per_correct`` with probability ``0.5 + 0.5 * confidence`` (a
+confidence of 0 is a coin flip, 1 is certain) and loses
+``points_per_incorrect`` otherwise. Events settle in ``event_time`` order, so
+the running sum along the event axis gives each path's drawdown. Paths are
+simulated in fixed-size chunks to keep memory flat.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from src.config import PortfolioConfig
+from src.query_index import to_ts
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+_CHUNK = 1 << 16
+
+
+class SimulationResult(BaseModel):
+    """Summary of simulated final portfolio values and drawdowns."""
+
+    paths: int
+    events: int = Field(..., description="Open Call/Put events simulated")
+    current_value: float
+    expected_value: float
+    std: float
+    prob_loss: float = Field(..., description="P(final value < current value)")
+    quantiles: dict = Field(..., description="Quantile -> final value")
+    expected_max_drawdown: float
+    drawdown_quantiles: dict = Field(..., description="Quantile -> max drawdown")
+
+
+def win_probability(confidence: np.ndarray) -> np.ndarray:
+    return 0.5 + 0.5 * np.clip(np.nan_to_num(confidence), 0.0, 1.0)
+
+
+def simulate(
+    current_value: float,
+    win_prob: Sequence[float],
+    points_per_correct: float = 100.0,
+    points_per_incorrect: float = -50.0,
+    paths: int = 100_000,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulate ``paths`` outcome sequences for trades settling in the given order.
+
+    Args:
+        current_value: Portfolio value before any of the trades settle
+        win_prob: Per-trade probability that the prediction is correct
+        paths: Number of Monte Carlo paths
+        seed: Seed for reproducible results
+    """
+    win_prob = np.asarray(win_prob, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    final = np.empty(paths)
+    drawdown = np.empty(paths)
+    gain = points_per_correct - points_per_incorrect
+    for start in range(0, paths, _CHUNK):
+        n = min(_CHUNK, paths - start)
+        hits = rng.random((n, len(win_prob)), dtype=np.float32) < win_prob
+        # cumulative P&L per path, with the starting point as column 0
+        pnl = np.zeros((n, len(win_prob) + 1))
+        np.cumsum(hits * gain + points_per_incorrect, axis=1, out=pnl[:, 1:])
+        final[start : start + n] = current_value + pnl[:, -1]
+        drawdown[start : start + n] = (
+            np.maximum.accumulate(pnl, axis=1) - pnl
+        ).max(axis=1)
+
+    qs = np.asarray(quantiles)
+    return SimulationResult(
+        paths=paths,
+        events=len(win_prob),
+        current_value=current_value,
+        expected_value=float(final.mean()),
+        std=float(final.std()),
+        prob_loss=float((final < current_value).mean()),
+        quantiles=dict(zip(map(str, qs), np.quantile(final, qs).tolist())),
+        expected_max_drawdown=float(drawdown.mean()),
+        drawdown_quantiles=dict(zip(map(str, qs), np.quantile(drawdown, qs).tolist())),
+    )
+
+
+def simulate_events(
+    events: Iterable[dict],
+    current_value: float,
+    config: Optional[PortfolioConfig] = None,
+    paths: int = 100_000,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulate the unsettled Call/Put events of a state snapshot.
+
+    Args:
+        events: Event dicts as in ``StateSnapshot.events``
+        current_value: Current portfolio value
+        config: Points per correct/incorrect prediction
+    """
+    config = config or PortfolioConfig()
+    open_trades = sorted(
+        (
+            e
+            for e in events
+            if e.get("predicted_action") in ("Call", "Put")
+            and e.get("settled_at") is None
+        ),
+        key=lambda e: to_ts(e["event_time"]),
+    )
+    confidence = np.array(
+        [e.get("prediction_confidence") or 0.0 for e in open_trades], dtype=float
+    )
+    return simulate(
+        current_value,
+        win_probability(confidence),
+        config.points_per_correct,
+        config.points_per_incorrect,
+        paths=paths,
+        seed=seed,
+    )
@@ -0,0 +1,168 @@
+"""
+KeysetIndex: Time-ordered secondary indexes with keyset (cursor) pagination.
+
+Each index keeps its entries sorted by ``(timestamp, id)`` in two parallel
+lists. Readers take an ``IndexView``, which captures the lists and their length
+at publish time; the writer only ever appends to those lists or swaps in new
+ones (copy-on-write for out-of-order inserts and eviction), so a view stays
+valid without locking. A page costs O(log n + page size) instead of a sort or
+scan over the whole history.
+"""
+
+import base64
+import bisect
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+Key = Tuple[float, str]
+
+
+def to_ts(value: datetime | str) -> float:
+    """POSIX timestamp of a datetime or ISO string; naive values are UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def encode_cursor(key: Key) -> str:
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Key:
+    """Decode a cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(ts), str(item_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class Page:
+    """One page of results, newest first."""
+
+    __slots__ = ("items", "next_cursor")
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def to_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "count": len(self.items),
+            "next_cursor": self.next_cursor,
+        }
+
+
+class IndexView:
+    """Immutable view of a KeysetIndex as of the moment it was taken."""
+
+    __slots__ = ("_keys", "_items", "_n")
+
+    def __init__(self, keys: List[Key], items: List[Any], n: int):
+        self._keys = keys
+        self._items = items
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        max_scan: Optional[int] = None,
+    ) -> Page:
+        """
+        Return up to ``limit`` items, newest first.
+
+        Args:
+            limit: Page size
+            cursor: ``next_cursor`` of the previous page
+            since: Only items at or after this timestamp
+            until: Only items at or before this timestamp
+            predicate: Extra filter evaluated while walking the range
+            max_scan: Stop after examining this many entries (bounds the cost
+                of selective predicates); the returned cursor resumes the walk
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        keys, n = self._keys, self._n
+        hi = n
+        if cursor:
+            hi = bisect.bisect_left(keys, decode_cursor(cursor), 0, n)
+        if until is not None:
+            hi = min(hi, bisect.bisect_left(keys, (until, "\U0010ffff"), 0, n))
+        lo = 0
+        if since is not None:
+            lo = bisect.bisect_left(keys, (since, ""), 0, n)
+        if max_scan is None:
+            max_scan = hi - lo
+
+        results = []
+        i = hi - 1
+        stop = max(lo, hi - max_scan)
+        while i >= stop and len(results) < limit:
+            item = self._items[i]
+            if predicate is None or predicate(item):
+                results.append(item)
+            i -= 1
+        # i + 1 is the last examined entry; continue below it if anything is left
+        next_cursor = encode_cursor(keys[i + 1]) if i >= lo else None
+        return Page(results, next_cursor)
+
+
+class KeysetIndex:
+    def __init__(self, max_items: Optional[int] = None):
+        """
+        Args:
+            max_items: Keep only the newest N entries (None for unbounded)
+        """
+        self.max_items = max_items
+        self._keys: List[Key] = []
+        self._items: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, ts: float, item_id: str, item: Any) -> None:
+        """Insert an item; amortized O(1) when timestamps arrive in order."""
+        key = (ts, item_id)
+        if not self._keys or key >= self._keys[-1]:
+            self._items.append(item)
+            self._keys.append(key)
+        else:
+            # Out-of-order insert: copy so that views of the old lists stay valid
+            pos = bisect.bisect_right(self._keys, key)
+            self._keys = self._keys[:pos] + [key] + self._keys[pos:]
+            self._items = self._items[:pos] + [item] + self._items[pos:]
+        self._evict()
+
+    def clear(self) -> None:
+        self._keys = []
+        self._items = []
+
+    def view(self) -> IndexView:
+        return IndexView(self._keys, self._items, len(self._keys))
+
+    def entries(self) -> Iterator[Tuple[float, str, Any]]:
+        """``(ts, id, item)`` of every entry, oldest first."""
+        for (ts, item_id), item in zip(self._keys, self._items):
+            yield ts, item_id, item
+
+    def _evict(self) -> None:
+        # Trim in batches so eviction copies are amortized over many inserts
+        if self.max_items is None:
+            return
+        if len(self._keys) > self.max_items + max(self.max_items // 4, 1):
+            self._keys = self._keys[-self.max_items:]
+            self._items = self._items[-self.max_items:]
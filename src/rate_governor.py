@@ -0,0 +1,406 @@
+"""
+Adaptive rate governor shared by every LLM caller of a provider.
+
+A ``RateGovernor`` paces requests with two token buckets (requests and tokens
+per minute) and bounds the calls in flight with an AIMD concurrency limit:
+every success raises the limit by ``1 / limit`` (about one per round of
+calls), every 429 / overload halves it, and the request rate backs off with
+it. Rate-limit response headers (``anthropic-ratelimit-*``,
+``x-ratelimit-*``) correct the buckets to what the provider reports, and
+``retry-after`` pauses all callers until the hint has passed.
+
+    governor = rate_governor.shared("anthropic")
+    response = governor.call(send, tokens=1500, usage=used_tokens)
+
+``call`` blocks (run it off the event loop), retries throttled requests up to
+``max_attempts`` and re-raises everything else. Governors are per process;
+the analyzer workers of ``pipeline.external_workers`` each pace themselves
+and converge through the provider's headers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional, TypeVar
+
+from loguru import logger
+
+from src import metrics
+
+T = TypeVar("T")
+
+# Too many requests, service unavailable, Anthropic "overloaded"
+THROTTLE_STATUSES = {429: "rate_limited", 503: "overloaded", 529: "overloaded"}
+
+WAIT_SECONDS = metrics.histogram(
+    "llm_governor_wait_seconds",
+    "Time LLM calls waited for the rate governor",
+    ["provider"],
+)
+THROTTLED = metrics.counter(
+    "llm_governor_throttled_total",
+    "Throttled LLM responses (429 / overload)",
+    ["provider", "reason"],
+)
+CONCURRENCY = metrics.gauge(
+    "llm_governor_concurrency_limit",
+    "Current AIMD limit of concurrent LLM calls",
+    ["provider"],
+    callback=lambda: {(name,): g.limit for name, g in _governors.items()},
+)
+IN_FLIGHT = metrics.gauge(
+    "llm_governor_in_flight",
+    "LLM calls currently in flight",
+    ["provider"],
+    callback=lambda: {(name,): g.in_flight for name, g in _governors.items()},
+)
+
+
+class Throttled(Exception):
+    """A throttled response seen by ``call``; carries its status and headers."""
+
+    def __init__(self, status: int, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(f"throttled with HTTP {status}")
+        self.status = status
+        self.headers = headers or {}
+
+
+class TokenBucket:
+    """``capacity`` units refilled at ``rate`` per second; not thread-safe."""
+
+    def __init__(self, capacity: float, rate: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        self._refill()
+        # A request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount  # may go negative to repay an underestimate
+
+    def give(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def observe(self, limit: Optional[float], remaining: Optional[float]):
+        """
+        Cap the bucket at the provider's per-minute limit and (lower)
+        remaining count. The limit is only a ceiling: a pace already cut
+        below it after throttling stays cut.
+        """
+        self._refill()
+        if limit:
+            self.capacity = min(self.capacity, limit)
+            self.rate = min(self.rate, limit / 60.0)
+            self.level = min(self.level, self.capacity)
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+    def reset(self, per_minute: float):
+        """Set a new per-minute budget, e.g. from configuration."""
+        self._refill()
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = min(self.level, per_minute)
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _duration(value: str) -> Optional[float]:
+    """Seconds from "20ms", "1s", "6m0s" or "1h2m3.5s" (OpenAI reset headers)."""
+    seconds, number = 0.0, ""
+    i = 0
+    while i < len(value):
+        c = value[i]
+        if c.isdigit() or c == ".":
+            number += c
+        elif value.startswith("ms", i) and number:
+            seconds += float(number) / 1000
+            number, i = "", i + 1
+        elif c in "hms" and number:
+            seconds += float(number) * {"h": 3600, "m": 60, "s": 1}[c]
+            number = ""
+        else:
+            return None
+        i += 1
+    return seconds if not number else None
+
+
+def _until(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds until a reset/retry hint: seconds, a duration or a timestamp."""
+    if not value:
+        return None
+    value = value.strip()
+    if (seconds := _number(value)) is not None:
+        return max(0.0, seconds)
+    if (seconds := _duration(value)) is not None:
+        return seconds
+    now = time.time() if now is None else now
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)  # HTTP date (Retry-After)
+        except (TypeError, ValueError):
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - now)
+
+
+def parse_headers(headers: Mapping[str, str], now: Optional[float] = None) -> dict:
+    """
+    Normalize Anthropic and OpenAI rate-limit headers.
+
+    Returns:
+        dict with any of ``requests_limit``, ``requests_remaining``,
+        ``requests_reset``, ``tokens_limit``, ``tokens_remaining``,
+        ``tokens_reset`` (seconds from now) and ``retry_after`` (seconds)
+    """
+    h = {k.lower(): v for k, v in headers.items()}
+    info = {}
+    for kind in ("requests", "tokens"):
+        limit = h.get(f"anthropic-ratelimit-{kind}-limit") or h.get(
+            f"x-ratelimit-limit-{kind}"
+        )
+        remaining = h.get(f"anthropic-ratelimit-{kind}-remaining") or h.get(
+            f"x-ratelimit-remaining-{kind}"
+        )
+        reset = h.get(f"anthropic-ratelimit-{kind}-reset") or h.get(
+            f"x-ratelimit-reset-{kind}"
+        )
+        for key, value in (("limit", limit), ("remaining", remaining)):
+            if (number := _number(value)) is not None:
+                info[f"{kind}_{key}"] = number
+        if (seconds := _until(reset, now)) is not None:
+            info[f"{kind}_reset"] = seconds
+    if (ms := _number(h.get("retry-after-ms"))) is not None:
+        info["retry_after"] = ms / 1000
+    elif (seconds := _until(h.get("retry-after"), now)) is not None:
+        info["retry_after"] = seconds
+    return info
+
+
+def throttle_of(exc: BaseException):
+    """``(status, headers)`` if ``exc`` is a throttled HTTP response, else None."""
+    if isinstance(exc, Throttled):
+        return exc.status, exc.headers
+    # anthropic/openai APIStatusError: status_code plus the httpx response
+    status = getattr(exc, "status_code", None)
+    if status not in THROTTLE_STATUSES:
+        return None
+    response = getattr(exc, "response", None)
+    return status, getattr(response, "headers", None) or {}
+
+
+class RateGovernor:
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 40_000,
+        max_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_attempts: int = 4,
+        backoff_seconds: float = 2.0,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            name: Provider name, used as the metrics label
+            requests_per_minute: Configured request budget (upper bound)
+            tokens_per_minute: Configured input+output token budget
+            max_concurrency: Upper bound of the AIMD concurrency limit
+            min_concurrency: Lower bound the limit is never cut below
+            max_attempts: Tries of one ``call`` while it is throttled
+            backoff_seconds: Pause after a throttle without ``retry-after``
+        """
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        rpm, tpm = requests_per_minute, tokens_per_minute
+        self.requests = TokenBucket(rpm, rpm / 60, clock)
+        self.tokens = TokenBucket(tpm, tpm / 60, clock)
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_cut = float("-inf")
+        self._clock = clock
+        self._cond = threading.Condition()
+
+    def _wait_time(self, tokens: float) -> float:
+        if self.in_flight >= max(self.min_concurrency, int(self.limit)):
+            return float("inf")  # until a call finishes and notifies
+        return max(
+            self.paused_until - self._clock(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+        )
+
+    @contextmanager
+    def slot(self, tokens: float = 0):
+        """Block until a request of ``tokens`` estimated tokens may start."""
+        start = time.perf_counter()
+        with self._cond:
+            while (delay := self._wait_time(tokens)) > 0:
+                self._cond.wait(None if delay == float("inf") else delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+        WAIT_SECONDS.labels(self.name).observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, headers: Optional[Mapping[str, str]]):
+        """Correct the buckets from a response's rate-limit headers."""
+        if not headers:
+            return
+        info = parse_headers(headers)
+        with self._cond:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = info.get(f"{kind}_remaining")
+                bucket.observe(info.get(f"{kind}_limit"), remaining)
+                if remaining is not None and remaining < 1 and f"{kind}_reset" in info:
+                    self._pause(info[f"{kind}_reset"])
+            if "retry_after" in info:
+                self._pause(info["retry_after"])
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, self._clock() + seconds)
+
+    def on_success(self, estimated: float = 0, used: Optional[float] = None):
+        """Additive increase; settle the token estimate against actual usage."""
+        with self._cond:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            # Recover the request pace toward the configured budget (or the
+            # provider's limit, if lower)
+            target = min(self.requests_per_minute, self.requests.capacity) / 60
+            if self.requests.rate < target:
+                self.requests.rate = min(target, self.requests.rate + target * 0.05)
+            if used is not None:
+                if used > estimated:
+                    self.tokens.take(used - estimated)
+                else:
+                    self.tokens.give(estimated - used)
+            self._cond.notify_all()
+
+    def on_throttle(self, status: int, headers: Optional[Mapping[str, str]] = None):
+        """Multiplicative decrease and a pause until the hinted retry time."""
+        reason = THROTTLE_STATUSES.get(status, "rate_limited")
+        THROTTLED.labels(self.name, reason).inc()
+        info = parse_headers(headers or {})
+        with self._cond:
+            now = self._clock()
+            # One cut per burst: calls already in flight fail together
+            if now - self._last_cut >= 1.0:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self.requests.rate = max(
+                    self.requests_per_minute / 600, self.requests.rate / 2
+                )
+                self._last_cut = now
+            self._pause(info.get("retry_after", self.backoff_seconds))
+            self._cond.notify_all()
+        logger.warning(
+            f"RateGovernor[{self.name}]: HTTP {status} ({reason}); "
+            f"concurrency limit {self.limit:.1f}, "
+            f"paused {max(0.0, self.paused_until - now):.1f}s"
+        )
+
+    def call(
+        self,
+        send: Callable[[], T],
+        tokens: float = 0,
+        usage: Optional[Callable[[T], Optional[float]]] = None,
+    ) -> T:
+        """
+        Run ``send()`` under the governor, retrying throttled attempts.
+
+        Args:
+            send: Makes one request; its result's ``headers`` (raw responses)
+                are read if present
+            tokens: Estimated input+output tokens of the request
+            usage: Actual tokens used, read from the result
+
+        Returns:
+            The result of the first ``send()`` that was not throttled
+        """
+        attempt = 1
+        while True:
+            with self.slot(tokens):
+                try:
+                    result = send()
+                except Exception as e:
+                    throttle = throttle_of(e)
+                    if throttle is None:
+                        raise
+                    self.on_throttle(*throttle)
+                    if attempt >= self.max_attempts:
+                        raise
+                    attempt += 1
+                    continue
+            self.observe(getattr(result, "headers", None))
+            self.on_success(tokens, usage(result) if usage else None)
+            return result
+
+    def configure(self, config):
+        """Apply a ``RateLimitConfig`` (limits learned from headers are reset)."""
+        with self._cond:
+            self.requests_per_minute = config.requests_per_minute
+            self.max_concurrency = config.max_concurrency
+            self.max_attempts = config.max_attempts
+            self.backoff_seconds = config.backoff_seconds
+            self.requests.reset(config.requests_per_minute)
+            self.tokens.reset(config.tokens_per_minute)
+            self.limit = min(self.limit, float(config.max_concurrency))
+            self._cond.notify_all()
+
+
+_governors: Dict[str, RateGovernor] = {}
+_lock = threading.Lock()
+
+
+def shared(name: str, config=None) -> RateGovernor:
+    """
+    The process-wide governor of a provider, created on first use.
+
+    Args:
+        name: Provider, e.g. "anthropic" or "openai"
+        config: ``RateLimitConfig`` to apply (defaults on first use otherwise)
+    """
+    with _lock:
+        governor = _governors.get(name)
+        if governor is None:
+            governor = _governors[name] = RateGovernor(name)
+    if config is not None:
+        governor.configure(config)
+    return governor
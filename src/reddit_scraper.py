@@ -1,11 +1,22 @@
 import time
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Optional
 import praw
 from loguru import logger
 
+from src import circuit_breaker, metrics, tracing
 from src.models import NewsItem
 
+FETCHES = metrics.counter(
+    "reddit_fetch_total", "Reddit fetch attempts", ["subreddit", "outcome"]
+)
+FETCH_SECONDS = metrics.histogram(
+    "reddit_fetch_seconds", "Duration of one Reddit fetch attempt", ["subreddit"]
+)
+POSTS = metrics.counter(
+    "reddit_news_items_total", "New news items returned by fetches", ["subreddit"]
+)
+
 
 class RedditScraper:
     def __init__(
@@ -15,6 +26,7 @@ class RedditScraper:
         user_agent: str,
         rate_limit_calls: int = 30,
         rate_limit_period: int = 60,
+        breakers: Optional[circuit_breaker.BreakerRegistry] = None,
     ):
         """
         Initialize the Reddit scraper with rate limiting.
@@ -25,6 +37,7 @@ class RedditScraper:
             user_agent: Reddit API user agent
             rate_limit_calls: Maximum number of API calls per period (default: 30)
             rate_limit_period: Period in seconds for rate limiting (default: 60)
+            breakers: Circuit breakers; one per subreddit ("reddit/<name>")
         """
         self.reddit = praw.Reddit(
             client_id=client_id, client_secret=client_secret, user_agent=user_agent
@@ -35,6 +48,7 @@ class RedditScraper:
         self.rate_limit_period = rate_limit_period
         self.call_timestamps: List[float] = []
         self.seen_news_ids = set()
+        self.breakers = breakers or circuit_breaker.registry
 
         logger.info("Reddit scraper initialized")
 
@@ -65,65 +79,68 @@ class RedditScraper:
         self.call_timestamps.append(current_time)
 
     def fetch_subreddit_posts(
-        self,
-        subreddit_name: str,
-        limit: int = 10,
-        max_retries: int = 3,
-        retry_delay: int = 5,
+        self, subreddit_name: str, limit: int = 10
     ) -> List[NewsItem]:
         """
-        Fetch recent posts from a subreddit with retry logic.
+        Fetch recent posts from a subreddit, once.
+
+        Failures are not retried here (that would stall the other subreddits);
+        they count against the subreddit's circuit breaker and the next fetch
+        cycle tries again. While the breaker is open, ``CircuitOpen`` is
+        raised without contacting Reddit.
 
         Args:
             subreddit_name: Name of the subreddit to fetch from
             limit: Maximum number of posts to fetch
-            max_retries: Maximum number of retry attempts
-            retry_delay: Delay between retries in seconds
 
         Returns:
             List of NewsItem objects
         """
-        for attempt in range(max_retries):
-            try:
-                self._check_rate_limit()
-
-                subreddit = self.reddit.subreddit(subreddit_name)
-                posts = list(subreddit.new(limit=limit))
-
-                news_items = []
-                for post in posts:
-                    # Only include posts from the last 24 hours
-                    post_time = datetime.fromtimestamp(
-                        post.created_utc, tz=timezone.utc
-                    )
-                    if datetime.now(timezone.utc) - post_time > timedelta(hours=24):
-                        continue
-                    if post.id in self.seen_news_ids:
-                        continue
-
-                    news_item = NewsItem(
-                        id=post.id,
-                        source=subreddit_name,
-                        title=post.title,
-                        snippet=(
-                            post.selftext[:500] if post.selftext else "[No content]"
-                        ),
-                        timestamp=post_time,
-                        added_at=datetime.now(timezone.utc),
-                    )
-                    news_items.append(news_item)
-                    self.seen_news_ids.add(post.id)
-
-                logger.info(
-                    f"RedditScraper: {len(posts)} posts fetched, {len(news_items)} news items after filtering. IDs: {[n.id for n in news_items]}"
-                )
-                return sorted(news_items, key=lambda x: x.timestamp, reverse=True)
-
-            except Exception as e:
-                logger.error(
-                    f"Error fetching from r/{subreddit_name} (attempt {attempt + 1}/{max_retries}): {str(e)}"
-                )
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                else:
-                    raise
+        breaker = self.breakers.get(f"reddit/{subreddit_name}")
+        started = time.perf_counter()
+        try:
+            with breaker.guard():
+                with tracing.span("reddit.rate_limit"):
+                    self._check_rate_limit()
+
+                with tracing.span("reddit.fetch", subreddit=subreddit_name):
+                    subreddit = self.reddit.subreddit(subreddit_name)
+                    posts = list(subreddit.new(limit=limit))
+        except circuit_breaker.CircuitOpen:
+            FETCHES.labels(subreddit_name, "circuit_open").inc()
+            raise
+        except Exception as e:
+            FETCH_SECONDS.labels(subreddit_name).observe(time.perf_counter() - started)
+            FETCHES.labels(subreddit_name, "error").inc()
+            logger.error(f"Error fetching from r/{subreddit_name}: {str(e)}")
+            raise
+
+        news_items = []
+        for post in posts:
+            # Only include posts from the last 24 hours
+            post_time = datetime.fromtimestamp(post.created_utc, tz=timezone.utc)
+            if datetime.now(timezone.utc) - post_time > timedelta(hours=24):
+                continue
+            if post.id in self.seen_news_ids:
+                continue
+
+            news_item = NewsItem(
+                id=post.id,
+                source=subreddit_name,
+                title=post.title,
+                snippet=(post.selftext[:500] if post.selftext else "[No content]"),
+                timestamp=post_time,
+                added_at=datetime.now(timezone.utc),
+            )
+            news_items.append(news_item)
+            self.seen_news_ids.add(post.id)
+
+        FETCH_SECONDS.labels(subreddit_name).observe(time.perf_counter() - started)
+        FETCHES.labels(subreddit_name, "ok").inc()
+        POSTS.labels(subreddit_name).inc(len(news_items))
+        logger.info(
+            f"RedditScraper: r/{subreddit_name}: {len(posts)} posts fetched, "
+            f"{len(news_items)} news items after filtering"
+        )
+        logger.debug(f"RedditScraper: new IDs {[n.id for n in news_items]}")
+        return sorted(news_items, key=lambda x: x.timestamp, reverse=True)
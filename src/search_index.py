@@ -0,0 +1,454 @@
+"""
+SearchIndex: Incremental inverted index with BM25 ranking over news titles
+and snippets and insight texts.
+
+Documents get dense integer IDs in insertion order, so every posting list
+(term -> doc IDs and term frequencies, in ``array``s) only ever appends.
+Per-document metadata (kind, subreddit, event, timestamp, length) lives in
+parallel arrays, so source/event/time filters are vectorized masks over the
+matching documents only.
+
+On disk (``directory``):
+
+- ``docs.jsonl``: append-only log of every indexed document; the source of
+  truth and where result payloads are read from (by byte offset)
+- ``postings.npz``: compressed checkpoint of the posting lists in CSR form
+  (delta-encoded doc IDs), written every ``checkpoint_every`` documents
+
+Loading reads the checkpoint and replays the log beyond it. A read-only
+index (the web process in external mode) tails the log on every query.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from src import metrics
+from src.models import Insight, NewsItem
+from src.query_index import to_ts
+
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by for from has have he her his i if in into
+    is it its just me my no not of on or our s so than that the their them then
+    there these they this to too was we were what when which who will with you
+    your
+    """.split()
+)
+KINDS = ("news", "insight")
+
+QUERY_SECONDS = metrics.histogram(
+    "search_query_seconds", "Time to rank one full-text search query"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords and single characters."""
+    return [
+        t
+        for t in TOKEN.findall(text.lower())
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+class _Strings:
+    """Interned strings (subreddits, event IDs) <-> small integer codes."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = [""]  # 0: none
+        self.codes: Dict[str, int] = {"": 0}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        directory: str,
+        readonly: bool = False,
+        checkpoint_every: int = 10_000,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        """
+        Args:
+            directory: Holds ``docs.jsonl`` and ``postings.npz``
+            readonly: Never write; pick up documents appended by another process
+            checkpoint_every: Documents between posting checkpoints
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.directory = directory
+        self.readonly = readonly
+        self.checkpoint_every = checkpoint_every
+        self.k1 = k1
+        self.b = b
+        self.log_path = os.path.join(directory, "docs.jsonl")
+        self.checkpoint_path = os.path.join(directory, "postings.npz")
+        self._lock = threading.RLock()
+        self._reset()
+        self._log = None
+        self._load()
+        metrics.gauge(
+            "search_documents",
+            "Documents in the full-text search index",
+            callback=lambda: len(self),
+        )
+
+    def _reset(self):
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.keys: Dict[str, int] = {}  # "news:<id>" -> doc ID
+        self.kinds = array("B")
+        self.sources_of = array("H")
+        self.events_of = array("H")
+        self.timestamps = array("d")
+        self.lengths = array("I")
+        self.offsets = array("Q")  # byte offset of the doc in docs.jsonl
+        self.sources = _Strings()
+        self.events = _Strings()
+        self.total_length = 0
+        self.log_bytes = 0  # docs.jsonl bytes reflected in memory
+        self.checkpointed = 0  # documents in the last checkpoint
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    # --- Loading and persistence ---
+
+    def _load(self):
+        try:
+            self._read_checkpoint()
+        except FileNotFoundError:
+            pass
+        except Exception as e:  # a bad checkpoint only costs a full replay
+            logger.warning(f"SearchIndex: ignoring unreadable checkpoint: {e}")
+            self._reset()
+        if self.log_bytes > self._log_size():  # log replaced: rebuild
+            self._reset()
+        started = len(self)
+        self._replay()
+        if len(self):
+            logger.info(
+                f"SearchIndex: {len(self)} documents "
+                f"({len(self) - started} replayed from the log)"
+            )
+
+    def _read_checkpoint(self):
+        with np.load(self.checkpoint_path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            bounds = data["bounds"]
+            # Every term's first ID is absolute, the rest are deltas
+            deltas = data["id_deltas"].astype(np.int64)
+            tfs = data["tfs"]
+            for i, term in enumerate(terms):
+                lo, hi = bounds[i], bounds[i + 1]
+                ids = np.cumsum(deltas[lo:hi]).astype(np.uint32)
+                self.postings[term] = (
+                    array("I", ids.tobytes()),
+                    array("H", tfs[lo:hi].tobytes()),
+                )
+            self.keys = {key: i for i, key in enumerate(data["keys"].tolist())}
+            self.kinds = array("B", data["kinds"].tobytes())
+            self.sources_of = array("H", data["sources_of"].tobytes())
+            self.events_of = array("H", data["events_of"].tobytes())
+            self.timestamps = array("d", data["timestamps"].tobytes())
+            self.lengths = array("I", data["lengths"].tobytes())
+            self.offsets = array("Q", data["offsets"].tobytes())
+            self.sources = _Strings(data["sources"].tolist()[1:])
+            self.events = _Strings(data["events"].tolist()[1:])
+            self.total_length = int(np.sum(data["lengths"], dtype=np.int64))
+            self.log_bytes = int(data["log_bytes"])
+            self.checkpointed = len(self.lengths)
+
+    def _replay(self):
+        """Index the documents appended to the log since ``log_bytes``."""
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self.log_bytes)
+            offset = self.log_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # being written by the engine; next time
+                doc = json.loads(line)
+                self._index(doc, offset)
+                offset += len(line)
+            self.log_bytes = offset
+
+    def _log_size(self) -> int:
+        try:
+            return os.path.getsize(self.log_path)
+        except OSError:
+            return 0
+
+    def refresh(self):
+        """Read-only indexes: pick up documents appended by the writer."""
+        with self._lock:
+            size = self._log_size()
+            if size < self.log_bytes:  # log replaced: start over
+                self._reset()
+                self._load()
+            elif size > self.log_bytes:
+                self._replay()
+
+    def checkpoint(self):
+        """Write the posting lists; loading then only replays newer docs."""
+        if self.readonly:
+            return
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+            started = time.perf_counter()
+            terms = sorted(self.postings)
+            counts = [len(self.postings[t][0]) for t in terms]
+            bounds = np.zeros(len(terms) + 1, dtype=np.int64)
+            np.cumsum(counts, out=bounds[1:])
+            ids = np.empty(bounds[-1], dtype=np.int64)
+            tfs = np.empty(bounds[-1], dtype=np.uint16)
+            for i, term in enumerate(terms):
+                term_ids, term_tfs = self.postings[term]
+                ids[bounds[i] : bounds[i + 1]] = term_ids
+                tfs[bounds[i] : bounds[i + 1]] = term_tfs
+            # IDs ascend within a term: store small deltas, which compress
+            # well, restarting (absolute) at every term
+            deltas = np.diff(ids, prepend=0)
+            deltas[bounds[:-1]] = ids[bounds[:-1]]
+            tmp = self.checkpoint_path + ".tmp.npz"
+            np.savez_compressed(
+                tmp,
+                terms=np.array(terms, dtype=str),
+                bounds=bounds,
+                id_deltas=deltas.astype(np.uint32),
+                tfs=tfs,
+                keys=np.array(list(self.keys), dtype=str),
+                kinds=np.frombuffer(self.kinds, dtype=np.uint8),
+                sources_of=np.frombuffer(self.sources_of, dtype=np.uint16),
+                events_of=np.frombuffer(self.events_of, dtype=np.uint16),
+                timestamps=np.frombuffer(self.timestamps, dtype=np.float64),
+                lengths=np.frombuffer(self.lengths, dtype=np.uint32),
+                offsets=np.frombuffer(self.offsets, dtype=np.uint64),
+                sources=np.array(self.sources.values, dtype=str),
+                events=np.array(self.events.values, dtype=str),
+                log_bytes=np.int64(self.log_bytes),
+            )
+            os.replace(tmp, self.checkpoint_path)
+            self.checkpointed = len(self)
+            logger.info(
+                f"SearchIndex: checkpointed {len(self)} documents, {len(terms)} "
+                f"terms in {time.perf_counter() - started:.2f}s"
+            )
+
+    def flush(self):
+        if self._log is not None:
+            self._log.flush()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None and len(self) > self.checkpointed:
+                self.checkpoint()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # --- Indexing ---
+
+    def _index(self, doc: dict, offset: int):
+        key = doc["key"]
+        if key in self.keys:
+            return
+        doc_id = len(self)
+        self.keys[key] = doc_id
+        tokens = tokenize(doc["text"])
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = (array("I"), array("H"))
+            posting[0].append(doc_id)
+            posting[1].append(min(tf, 65535))
+        self.kinds.append(KINDS.index(doc["kind"]))
+        self.sources_of.append(self.sources.code(doc.get("source")))
+        self.events_of.append(self.events.code(doc.get("event_id")))
+        self.timestamps.append(doc["ts"])
+        self.lengths.append(len(tokens))
+        self.offsets.append(offset)
+        self.total_length += len(tokens)
+
+    def _add(self, doc: dict) -> bool:
+        if self.readonly:
+            raise RuntimeError("SearchIndex is read-only")
+        with self._lock:
+            if doc["key"] in self.keys:
+                return False
+            if self._log is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._log = open(self.log_path, "ab")
+                # Drop a line left half-written by a crash
+                if self._log.tell() > self.log_bytes:
+                    self._log.truncate(self.log_bytes)
+            line = (json.dumps(doc, separators=(",", ":")) + "\n").encode()
+            offset = self.log_bytes
+            self._log.write(line)
+            self.log_bytes += len(line)
+            self._index(doc, offset)
+            if len(self) - self.checkpointed >= self.checkpoint_every:
+                self.checkpoint()
+            return True
+
+    def add_news(self, news: NewsItem) -> bool:
+        """Index a news item's title and snippet; False if already indexed."""
+        return self._add(
+            {
+                "key": f"news:{news.id}",
+                "kind": "news",
+                "source": news.source,
+                "ts": to_ts(news.timestamp),
+                "text": f"{news.title}\n{news.snippet}",
+                "item": news.model_dump(mode="json"),
+            }
+        )
+
+    def add_insight(self, event_id: str, insight: Insight) -> bool:
+        """Index an insight's text under its event; False if already indexed."""
+        ts = to_ts(insight.timestamp)
+        return self._add(
+            {
+                "key": f"insight:{event_id}:{insight.news_id}:{ts}",
+                "kind": "insight",
+                "event_id": event_id,
+                "ts": ts,
+                "text": insight.text,
+                "item": {**insight.model_dump(mode="json"), "event_id": event_id},
+            }
+        )
+
+    # --- Querying ---
+
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        source: Optional[str] = None,
+        event_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 20,
+    ) -> dict:
+        """
+        BM25-ranked documents matching any query term.
+
+        Args:
+            query: Free text; tokenized like the documents
+            kind: ``news`` or ``insight``
+            source: Only news from this subreddit
+            event_id: Only insights about this event
+            since: Oldest timestamp (POSIX seconds), inclusive
+            until: Newest timestamp, exclusive
+            limit: Results returned
+
+        Returns:
+            {"query", "total" (matching documents), "took_ms", "results"}, each
+            result the indexed item plus ``kind`` and ``score``
+        """
+        started = time.perf_counter()
+        if self.readonly:
+            self.refresh()
+        with QUERY_SECONDS.time(), self._lock:
+            hits, scores, total = self._score(
+                tokenize(query), kind, source, event_id, since, until, limit
+            )
+            offsets = [self.offsets[i] for i in hits]
+            if offsets and self._log is not None:
+                self._log.flush()
+        results = []
+        if offsets:
+            with open(self.log_path, "rb") as f:
+                for offset, score in zip(offsets, scores):
+                    f.seek(offset)
+                    doc = json.loads(f.readline())
+                    results.append(
+                        {"kind": doc["kind"], "score": round(score, 4), **doc["item"]}
+                    )
+        return {
+            "query": query,
+            "total": total,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+
+    def _score(self, terms, kind, source, event_id, since, until, limit):
+        """
+        (doc IDs, scores, total) of the best matches. Call under the lock:
+        the numpy views over the arrays block appends while they exist, and
+        they are released on return.
+        """
+        n = len(self)
+        if not n or not terms:
+            return [], [], 0
+        avg_length = self.total_length / n
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        doc_ids, doc_scores = [], []
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids = np.frombuffer(posting[0], dtype=np.uint32)
+            tfs = np.frombuffer(posting[1], dtype=np.uint16).astype(np.float64)
+            df = len(ids)
+            idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[ids] / avg_length)
+            doc_ids.append(ids.astype(np.int64))
+            doc_scores.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not doc_ids:
+            return [], [], 0
+        # Sum per document: a linear pass, no sort, even for common terms
+        scores = np.bincount(
+            np.concatenate(doc_ids), np.concatenate(doc_scores), minlength=n
+        )
+        ids = np.flatnonzero(scores)  # BM25 idf > 0: matches score above 0
+        scores = scores[ids]
+        mask = np.ones(len(ids), dtype=bool)
+        if kind is not None:
+            kinds = np.frombuffer(self.kinds, dtype=np.uint8)
+            mask &= kinds[ids] == (KINDS.index(kind) if kind in KINDS else 255)
+        if source is not None:
+            code = self.sources.codes.get(source, -1)
+            sources = np.frombuffer(self.sources_of, dtype=np.uint16)
+            mask &= sources[ids] == code
+        if event_id is not None:
+            code = self.events.codes.get(event_id, -1)
+            events = np.frombuffer(self.events_of, dtype=np.uint16)
+            mask &= events[ids] == code
+        if since is not None or until is not None:
+            timestamps = np.frombuffer(self.timestamps, dtype=np.float64)[ids]
+            if since is not None:
+                mask &= timestamps >= since
+            if until is not None:
+                mask &= timestamps < until
+        ids, scores = ids[mask], scores[mask]
+        total = len(ids)
+        if total > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+            ids, scores = ids[top], scores[top]
+        order = np.lexsort((ids, -scores))  # best first; ties: older first
+        return ids[order].tolist(), scores[order].tolist(), total
@@ -0,0 +1,97 @@
+"""
+StateReader: Read-only view of the state an engine process saves to disk.
+
+When the engine runs as its own process (``python -m src.main``), API
+processes cannot share its ``AppRepository``. The engine already writes
+``state.json`` atomically (write + rename), so readers stat the file and
+reload it into a private, read-only repository when it changes. Between
+reloads requests are served from the repository's lock-free snapshot.
+
+The state file only holds recent windows; with the engine's ``HistoryLog``
+the reader tails it into keyset indexes that every reloaded repository
+serves, so paginated queries see the same history as in the engine.
+
+The engine also writes a small status file (pipeline metrics) with
+``write_status``.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+from src.app_repository import AppRepository
+from src.history_log import HistoryLog
+
+
+class StateReader:
+    def __init__(
+        self,
+        path: str = "state.json",
+        min_interval: float = 0.5,
+        history: Optional[HistoryLog] = None,
+        **repo_kwargs,
+    ):
+        """
+        Args:
+            path: State file saved by the engine
+            min_interval: Seconds between checks of the file for changes
+            history: The engine's history log, opened read-only
+            repo_kwargs: Passed to ``AppRepository`` (e.g. ``max_events``)
+        """
+        self.path = path
+        self.min_interval = min_interval
+        self.history = history
+        self.repo_kwargs = repo_kwargs
+        self._repo = AppRepository(**repo_kwargs)
+        # Only its keyset indexes are used: fed from the history log
+        self._history = AppRepository(**repo_kwargs)
+        self._key = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def repo(self) -> AppRepository:
+        """The repository as of the latest state file; reloads if it changed."""
+        if time.monotonic() - self._checked < self.min_interval:
+            return self._repo
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return self._repo
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if key != self._key:
+                repo = AppRepository(**self.repo_kwargs)
+                repo.load(self.path)
+                if self.history is not None:
+                    restarted, entries = self.history.tail()
+                    self._history.replay_history(entries, reset=restarted)
+                    with repo.writer():
+                        repo.adopt_indexes(self._history)
+                # Swap in one assignment; requests holding the old
+                # repository or its snapshots keep a consistent view
+                self._repo, self._key = repo, key
+        return self._repo
+
+
+def write_status(path: str, status: dict):
+    """Atomically write a JSON status file for other processes."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, path)
+
+
+def read_status(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f"StateReader: unreadable status file {path}: {e}")
+        return None
@@ -0,0 +1,291 @@
+"""
+TimeSeries: Compact, append-only float64 time series with downsampled tiers.
+
+Every series keeps three tiers:
+
+- ``raw``: one ``(t, value)`` row per sample
+- ``1m`` and ``1h``: one ``(t, count, mean, min, max, last)`` row per bucket
+
+On disk each tier is a flat float64 file that is only ever appended to and is
+read through ``numpy.memmap``, so memory use does not grow with history and
+other processes can read the files directly. Without a directory the tiers
+live in growable in-memory arrays. Range queries binary-search the time
+column and pick the finest tier that fits ``max_points``.
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+RAW_COLS = 2
+AGG_COLS = 6  # t, count, mean, min, max, last
+TIERS = {"1m": 60.0, "1h": 3600.0}
+
+
+class _Tier:
+    """Append-only 2-D float64 table, file-backed (memmap) or in memory."""
+
+    def __init__(self, cols: int, path: Optional[str] = None, readonly=False):
+        self.cols = cols
+        self.path = path
+        self._n = 0
+        self._file = None
+        if path is None:
+            self._buf = np.empty((64, cols))
+            return
+        self._map: Optional[np.ndarray] = None
+        self._map_rows = 0
+        if not readonly:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, "ab")
+
+    def append(self, row: Tuple[float, ...]):
+        if self.path is None:
+            if self._n == len(self._buf):
+                grown = np.empty((len(self._buf) * 2, self.cols))
+                grown[: self._n] = self._buf[: self._n]
+                self._buf = grown
+            self._buf[self._n] = row
+            self._n += 1
+            return
+        self._file.write(np.asarray(row, dtype=np.float64).tobytes())
+        self._file.flush()
+
+    def view(self) -> np.ndarray:
+        """Read-only (rows, cols) view of every complete row."""
+        if self.path is None:
+            return self._buf[: self._n]
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        rows = size // (8 * self.cols)
+        if rows == 0:
+            return np.empty((0, self.cols))
+        if rows != self._map_rows:
+            # Partial trailing rows (concurrent append) are excluded
+            self._map = np.memmap(
+                self.path, dtype=np.float64, mode="r", shape=(rows, self.cols)
+            )
+            self._map_rows = rows
+        return self._map
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class TimeSeries:
+    def __init__(self, directory: Optional[str] = None, readonly: bool = False):
+        """
+        Args:
+            directory: Where the tier files live; None keeps them in memory
+            readonly: Read files appended to by another process; the open
+                buckets are then derived from the raw tail on every query
+        """
+        self.directory = directory
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self.raw = _Tier(RAW_COLS, self._path("raw"), readonly)
+        self.tiers = {
+            name: _Tier(AGG_COLS, self._path(name), readonly) for name in TIERS
+        }
+        # Open bucket per tier as an immutable tuple, swapped atomically so
+        # readers never see a half-updated bucket
+        self._open: Dict[str, Optional[Tuple[float, ...]]] = {
+            name: None for name in TIERS
+        }
+        if directory is not None and not readonly:
+            self._recover_open_buckets()
+
+    def _path(self, tier: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, f"{tier}.f64")
+
+    def _recover_open_buckets(self):
+        """Rebuild the in-progress buckets from raw samples after a restart."""
+        raw = self.raw.view()
+        for name, width in TIERS.items():
+            closed = self.tiers[name].view()
+            start = closed[-1, 0] + width if len(closed) else -np.inf
+            pos = np.searchsorted(raw[:, 0], start) if len(raw) else 0
+            for t, value in raw[pos:]:
+                self._fold(name, width, float(t), float(value))
+
+    def _fold(self, name: str, width: float, t: float, value: float):
+        bucket_t = (t // width) * width
+        bucket = self._open[name]
+        if bucket is not None and bucket[0] != bucket_t:
+            self.tiers[name].append(bucket)
+            bucket = None
+        if bucket is None:
+            self._open[name] = (bucket_t, 1.0, value, value, value, value)
+        else:
+            _, count, mean, lo, hi, _ = bucket
+            count += 1
+            self._open[name] = (
+                bucket_t,
+                count,
+                mean + (value - mean) / count,
+                min(lo, value),
+                max(hi, value),
+                value,
+            )
+
+    def append(self, t: float, value: float):
+        """Append a sample; ``t`` is POSIX seconds and should not go backwards."""
+        if self.readonly:
+            raise ValueError("TimeSeries is read-only")
+        with self._lock:
+            self.raw.append((t, value))
+            for name, width in TIERS.items():
+                self._fold(name, width, t, value)
+
+    def __len__(self) -> int:
+        return len(self.raw.view())
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        raw = self.raw.view()
+        return (float(raw[-1, 0]), float(raw[-1, 1])) if len(raw) else None
+
+    def _tail_bucket(self, name: str, closed: np.ndarray) -> Optional[tuple]:
+        """Aggregate the raw samples after the last closed bucket."""
+        raw = self.raw.view()
+        start = closed[-1, 0] + TIERS[name] if len(closed) else -np.inf
+        tail = raw[np.searchsorted(raw[:, 0], start) :]
+        if len(tail) == 0:
+            return None
+        t, v = tail[:, 0], tail[:, 1]
+        bucket_t = (t[0] // TIERS[name]) * TIERS[name]
+        return (bucket_t, len(v), v.mean(), v.min(), v.max(), v[-1])
+
+    def _tier_rows(self, name: str) -> np.ndarray:
+        rows = self.tiers[name].view()
+        if self.readonly:
+            bucket = self._tail_bucket(name, rows)
+        else:
+            bucket = self._open[name]
+        if bucket is None:
+            return rows
+        return np.vstack([rows, np.asarray(bucket)[None, :]])
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        resolution: str = "auto",
+        max_points: int = 1000,
+    ) -> dict:
+        """
+        Samples in ``[start, end]``.
+
+        Args:
+            resolution: ``raw``, ``1m``, ``1h`` or ``auto`` (finest tier with at
+                most ``max_points`` rows in range)
+            max_points: Point budget; a range with more rows in the chosen
+                tier is strided down to it
+
+        Returns:
+            ``{"resolution", "t", "value"}`` for raw rows, plus ``count``,
+            ``min``, ``max`` and ``last`` for downsampled rows (``value`` is
+            the bucket mean)
+        """
+        candidates = ["raw", "1m", "1h"] if resolution == "auto" else [resolution]
+        for name in candidates:
+            rows = self.raw.view() if name == "raw" else self._tier_rows(name)
+            t = rows[:, 0]
+            lo = 0 if start is None else int(np.searchsorted(t, start, "left"))
+            hi = len(rows) if end is None else int(np.searchsorted(t, end, "right"))
+            if hi - lo <= max_points or name == candidates[-1]:
+                break
+        selected = rows[lo:hi]
+        if len(selected) > max_points:
+            selected = selected[:: -(-len(selected) // max_points)]
+        if name == "raw":
+            return {
+                "resolution": name,
+                "t": selected[:, 0].tolist(),
+                "value": selected[:, 1].tolist(),
+            }
+        return {
+            "resolution": name,
+            "t": selected[:, 0].tolist(),
+            "count": selected[:, 1].astype(int).tolist(),
+            "value": selected[:, 2].tolist(),
+            "min": selected[:, 3].tolist(),
+            "max": selected[:, 4].tolist(),
+            "last": selected[:, 5].tolist(),
+        }
+
+    def close(self):
+        self.raw.close()
+        for tier in self.tiers.values():
+            tier.close()
+
+
+class TimeSeriesStore:
+    """Named ``TimeSeries`` under one directory (``None`` for in-memory).
+
+    A ``readonly`` store serves another process's series, e.g. the web tier
+    reading what the engine records.
+    """
+
+    def __init__(self, directory: Optional[str] = None, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self._series: Dict[str, TimeSeries] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        # Names may contain "/" for grouping; everything else is made
+        # filesystem-safe
+        parts = [re.sub(r"[^A-Za-z0-9_.-]", "_", p) for p in name.split("/")]
+        return os.path.join(self.directory, *parts)
+
+    def series(self, name: str) -> TimeSeries:
+        """Series by name, created on first use."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = TimeSeries(
+                    self._path(name), self.readonly
+                )
+            return series
+
+    def close(self, name: str):
+        """Close a series and stop holding it (its files stay on disk)."""
+        with self._lock:
+            series = self._series.pop(name, None)
+        if series is not None:
+            series.close()
+
+    def get(self, name: str) -> Optional[TimeSeries]:
+        """
+        Existing series by name, opening it from disk if needed. A writable
+        store opens it read-only and does not hold it, so queries do not
+        reopen append handles (e.g. of a closed series).
+        """
+        series = self._series.get(name)
+        if series is not None:
+            return series
+        path = self._path(name)
+        if path is None or not os.path.exists(os.path.join(path, "raw.f64")):
+            return None
+        if self.readonly:
+            return self.series(name)
+        return TimeSeries(path, readonly=True)
+
+
+def to_datetime_pairs(series: TimeSeries) -> List[Tuple[datetime, float]]:
+    """All raw samples as ``(datetime, value)`` tuples (for small series)."""
+    return [
+        (datetime.fromtimestamp(t, tz=timezone.utc), float(v))
+        for t, v in series.raw.view()
+    ]
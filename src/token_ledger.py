@@ -0,0 +1,300 @@
+"""
+TokenLedger: Persistent record of the tokens (and dollars) every LLM call used,
+and the ``Budget`` that degrades the pipeline as spend approaches its limit.
+
+Each call is one row with the caller, model, the usage the API returned and,
+for news analysis, the news item, its subreddit and the events it was
+analyzed against (tokens are attributed to those events in equal shares).
+The ledger is a SQLite file in WAL mode, so the engine, analyzer workers and
+web processes all see the same spend.
+
+``Budget`` compares the spend of the current UTC day (or hour) with
+``budget.limit_usd`` and steps down through these modes as it rises:
+
+    normal -> larger_batches -> strict_prefilter -> cheap_model -> paused
+
+``larger_batches`` polls Reddit less often so each cycle carries more posts,
+``strict_prefilter`` only analyzes news with enough event-keyword hits,
+``cheap_model`` switches analysis to ``budget.cheap_model`` and ``paused``
+stops analysis until the next period starts.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from loguru import logger
+
+from src import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    caller TEXT NOT NULL,
+    model TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    news_id TEXT,
+    subreddit TEXT
+);
+CREATE INDEX IF NOT EXISTS calls_ts ON calls (ts);
+CREATE TABLE IF NOT EXISTS call_events (
+    call_id INTEGER NOT NULL REFERENCES calls (id),
+    event_id TEXT NOT NULL,
+    share REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS call_events_call ON call_events (call_id);
+"""
+
+MODES = ("normal", "larger_batches", "strict_prefilter", "cheap_model", "paused")
+
+TOKENS = metrics.counter(
+    "llm_tokens_total", "Tokens recorded in the ledger", ["caller", "direction"]
+)
+COST = metrics.counter(
+    "llm_cost_usd_total", "Dollars recorded in the ledger", ["caller"]
+)
+
+
+class TokenLedger:
+    def __init__(self, path: str, prices: Dict[str, object], busy_timeout=30.0):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            prices: Model name (or prefix, or "default") -> ``ModelPrice``
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        self.path = path
+        self.prices = prices
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def price(self, model: str):
+        """The ``ModelPrice`` of a model: exact name, longest prefix, default."""
+        if model in self.prices:
+            return self.prices[model]
+        prefixes = [name for name in self.prices if model.startswith(name)]
+        if prefixes:
+            return self.prices[max(prefixes, key=len)]
+        return self.prices.get("default")
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        price = self.price(model)
+        if price is None:
+            return 0.0
+        return (
+            input_tokens * price.input_per_mtok + output_tokens * price.output_per_mtok
+        ) / 1e6
+
+    def record(
+        self,
+        caller: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        news_id: Optional[str] = None,
+        subreddit: Optional[str] = None,
+        event_ids: Iterable[str] = (),
+        ts: Optional[float] = None,
+    ) -> float:
+        """Add one call; returns its cost in dollars."""
+        cost = self.cost(model, input_tokens, output_tokens)
+        event_ids = list(event_ids)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO calls (ts, caller, model, input_tokens, output_tokens, "
+                "cost_usd, news_id, subreddit) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time() if ts is None else ts,
+                    caller,
+                    model,
+                    input_tokens,
+                    output_tokens,
+                    cost,
+                    news_id,
+                    subreddit,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO call_events (call_id, event_id, share) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, e, 1 / len(event_ids)) for e in event_ids],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        TOKENS.labels(caller, "input").inc(input_tokens)
+        TOKENS.labels(caller, "output").inc(output_tokens)
+        COST.labels(caller).inc(cost)
+        return cost
+
+    def spent(self, since: float = 0.0) -> float:
+        """Dollars recorded since ``since`` (epoch seconds)."""
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(cost_usd), 0) FROM calls WHERE ts >= ?", (since,)
+        ).fetchone()
+        return row[0]
+
+    def totals(self, by: str, since: float = 0.0) -> Dict[str, dict]:
+        """
+        Usage grouped by ``caller``, ``model``, ``subreddit`` or ``event``.
+
+        Returns:
+            key -> {"calls", "input_tokens", "output_tokens", "cost_usd"};
+            per event, calls count whole and tokens and cost are shares
+        """
+        if by == "event":
+            query = (
+                "SELECT e.event_id, COUNT(*), SUM(c.input_tokens * e.share), "
+                "SUM(c.output_tokens * e.share), SUM(c.cost_usd * e.share) "
+                "FROM calls c JOIN call_events e ON e.call_id = c.id "
+                "WHERE c.ts >= ? GROUP BY e.event_id"
+            )
+        elif by in ("caller", "model", "subreddit"):
+            query = (
+                f"SELECT {by}, COUNT(*), SUM(input_tokens), SUM(output_tokens), "
+                f"SUM(cost_usd) FROM calls WHERE ts >= ? AND {by} IS NOT NULL "
+                f"GROUP BY {by}"
+            )
+        else:
+            raise ValueError(f"Cannot group usage by {by!r}")
+        return {
+            key: {
+                "calls": calls,
+                "input_tokens": round(input_tokens),
+                "output_tokens": round(output_tokens),
+                "cost_usd": cost,
+            }
+            for key, calls, input_tokens, output_tokens, cost in self._conn().execute(
+                query, (since,)
+            )
+        }
+
+
+class Budget:
+    def __init__(self, ledger: TokenLedger, config, clock=time.time):
+        """
+        Args:
+            ledger: Where spend is read from
+            config: ``BudgetConfig``
+            clock: Epoch seconds (for tests)
+        """
+        self.ledger = ledger
+        self.config = config
+        self._clock = clock
+        self._cached_at = float("-inf")
+        self._spent = 0.0
+        self._mode = "normal"
+        self._lock = threading.Lock()
+
+    def period_start(self, now: Optional[float] = None) -> float:
+        now = self._clock() if now is None else now
+        start = datetime.fromtimestamp(now, timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        if self.config.period == "day":
+            start = start.replace(hour=0)
+        return start.timestamp()
+
+    def period_end(self, now: Optional[float] = None) -> float:
+        length = 86400 if self.config.period == "day" else 3600
+        return self.period_start(now) + length
+
+    def spent(self) -> float:
+        """Dollars spent this period; re-read at most every ``refresh_seconds``."""
+        with self._lock:
+            now = self._clock()
+            if now - self._cached_at >= self.config.refresh_seconds:
+                self._spent = self.ledger.spent(self.period_start(now))
+                self._cached_at = now
+            return self._spent
+
+    def fraction(self) -> float:
+        if self.config.limit_usd <= 0:
+            return 0.0  # unlimited
+        return self.spent() / self.config.limit_usd
+
+    @property
+    def mode(self) -> str:
+        cfg = self.config
+        fraction = self.fraction()
+        steps = [
+            cfg.larger_batches_at,
+            cfg.strict_prefilter_at,
+            cfg.cheap_model_at,
+            cfg.pause_at,
+        ]
+        mode = MODES[sum(fraction >= step for step in steps)]
+        if mode != self._mode:
+            log = logger.warning if MODES.index(mode) > 0 else logger.info
+            log(
+                f"Budget: {fraction:.0%} of ${cfg.limit_usd:.2f} per {cfg.period} "
+                f"spent; mode {self._mode} -> {mode}"
+            )
+            self._mode = mode
+        return mode
+
+    def _at_least(self, mode: str) -> bool:
+        return MODES.index(self.mode) >= MODES.index(mode)
+
+    @property
+    def paused(self) -> bool:
+        return self._at_least("paused")
+
+    def fetch_interval(self, base: float) -> float:
+        """Seconds between Reddit polls: longer, so batches grow, when saving."""
+        if self._at_least("larger_batches"):
+            return base * self.config.batch_interval_factor
+        return base
+
+    def min_keyword_hits(self, required: bool) -> int:
+        """Event keywords news must mention to be analyzed (0: any news)."""
+        if self._at_least("strict_prefilter"):
+            return self.config.strict_keyword_hits
+        return 1 if required else 0
+
+    def model(self, default: str) -> str:
+        return self.config.cheap_model if self._at_least("cheap_model") else default
+
+    def status(self) -> dict:
+        """Budget state and this period's usage breakdown (for the API)."""
+        now = self._clock()
+        since = self.period_start(now)
+        return {
+            "period": self.config.period,
+            "limit_usd": self.config.limit_usd,
+            "spent_usd": self.spent(),
+            "fraction": self.fraction(),
+            "mode": self.mode,
+            "period_start": datetime.fromtimestamp(since, timezone.utc).isoformat(),
+            "resets_at": datetime.fromtimestamp(
+                self.period_end(now), timezone.utc
+            ).isoformat(),
+            "usage": {
+                by: self.ledger.totals(by, since)
+                for by in ("caller", "model", "subreddit", "event")
+            },
+        }
@@ -0,0 +1,229 @@
+"""
+Tracing: Opt-in timing spans and profiles of the slowest pipeline cycles.
+
+``span(name, **args)`` times a block and records it as a Chrome trace event
+(open the exported file in ``chrome://tracing`` or https://ui.perfetto.dev).
+Inside ``news_item(news_id)`` every span, including those in threads started
+with ``asyncio.to_thread``, carries the news ID. One item's path through the
+pipeline can then be exported on its own with ``export(path, news_id=...)``.
+
+Both features are off unless enabled with ``configure()`` (``tracing`` in
+config.yaml). When disabled, ``span`` returns a shared no-op context manager.
+
+``profile_cycle(name)`` samples pipeline cycles (one stage handler call) with
+cProfile and keeps the dumps of the ``keep`` slowest as ``.prof`` files. They
+are readable with ``python -m pstats`` or snakeviz. Only one cycle is
+profiled at a time, because cProfile profiles the whole engine thread.
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional
+
+from loguru import logger
+
+_news_id: contextvars.ContextVar = contextvars.ContextVar("news_id", default=None)
+_NOOP = nullcontext()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, max_spans: int = 100_000):
+        """
+        Args:
+            enabled: Record spans; when False ``span`` is a no-op
+            max_spans: Spans kept in memory (oldest are dropped)
+        """
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self._lanes = {}  # lane name -> Chrome trace tid
+        self._lock = threading.Lock()
+
+    def _lane(self) -> int:
+        # Concurrent tasks on the event loop get their own lane, so their
+        # spans nest properly instead of overlapping on the thread's row
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        name = task.get_name() if task else threading.current_thread().name
+        lane = self._lanes.get(name)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.setdefault(name, len(self._lanes) + 1)
+        return lane
+
+    def span(self, name: str, **args):
+        """Context manager timing ``name``; ``args`` are shown in the viewer."""
+        if not self.enabled:
+            return _NOOP
+        return self._record(name, args)
+
+    @contextmanager
+    def _record(self, name: str, args: dict):
+        news_id = _news_id.get()
+        if news_id is not None:
+            args["news_id"] = news_id
+        lane = self._lane()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((name, lane, start, end - start, args))
+
+    def events(self, news_id: Optional[str] = None) -> List[dict]:
+        """Chrome trace events, optionally only those of one news item."""
+        pid = os.getpid()
+        events = [
+            {
+                "ph": "M",
+                "name": "thread_name",
+                "pid": pid,
+                "tid": lane,
+                "args": {"name": name},
+            }
+            for name, lane in list(self._lanes.items())
+        ]
+        for name, lane, start, duration, args in list(self.spans):
+            if news_id is not None and not (
+                args.get("news_id") == news_id or news_id in args.get("news_ids", ())
+            ):
+                continue
+            events.append(
+                {
+                    "ph": "X",
+                    "name": name,
+                    "pid": pid,
+                    "tid": lane,
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "args": args,
+                }
+            )
+        return events
+
+    def export(self, path: str, news_id: Optional[str] = None) -> int:
+        """Write a Chrome trace JSON file; returns the number of spans."""
+        events = self.events(news_id)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, path)
+        return sum(1 for e in events if e["ph"] == "X")
+
+
+class SlowCycleProfiler:
+    def __init__(
+        self,
+        directory: str = "logs/profiles",
+        keep: int = 5,
+        sample_rate: float = 0.1,
+    ):
+        """
+        Args:
+            directory: Where the ``.prof`` dumps are written
+            keep: Number of slowest profiled cycles kept (0 disables profiling)
+            sample_rate: Fraction of cycles profiled
+        """
+        self.directory = directory
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self._slowest = []  # min-heap of (seconds, seq, path)
+        self._seq = itertools.count()
+        self._active = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def cycle(self, name: str):
+        if self.keep <= 0 or random.random() >= self.sample_rate:
+            yield
+            return
+        with self._lock:
+            busy, self._active = self._active, True
+        if busy:
+            yield
+            return
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler owns the thread
+            self._active = False
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active = False
+            self._keep_if_slow(name, time.perf_counter() - start, profile)
+
+    def _keep_if_slow(self, name: str, seconds: float, profile: cProfile.Profile):
+        with self._lock:
+            if len(self._slowest) >= self.keep and seconds <= self._slowest[0][0]:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            seq = next(self._seq)
+            path = os.path.join(
+                self.directory, f"{name}-{seconds * 1000:.0f}ms-{seq}.prof"
+            )
+            profile.dump_stats(path)
+            heapq.heappush(self._slowest, (seconds, seq, path))
+            if len(self._slowest) > self.keep:
+                _, _, evicted = heapq.heappop(self._slowest)
+                try:
+                    os.remove(evicted)
+                except OSError:
+                    pass
+        logger.info(f"Tracing: kept profile of slow cycle {name} in {path}")
+
+    def slowest(self) -> List[tuple]:
+        """(seconds, path) of the kept profiles, slowest first."""
+        return [(s, p) for s, _, p in sorted(self._slowest, reverse=True)]
+
+
+tracer = Tracer()
+cycle_profiler = SlowCycleProfiler(keep=0)
+
+
+def configure(config) -> None:
+    """Apply a ``TracingConfig``; tracing stays off unless enabled there."""
+    tracer.enabled = config.enabled
+    if tracer.spans.maxlen != config.max_spans:
+        tracer.spans = deque(tracer.spans, maxlen=config.max_spans)
+    cycle_profiler.directory = config.profile_dir
+    cycle_profiler.keep = config.profile_slowest
+    cycle_profiler.sample_rate = config.profile_sample_rate
+
+
+def span(name: str, **args):
+    return tracer.span(name, **args)
+
+
+@contextmanager
+def news_item(news_id: str):
+    """Attribute spans in this block (and threads it starts) to a news item."""
+    token = _news_id.set(news_id)
+    try:
+        yield
+    finally:
+        _news_id.reset(token)
+
+
+def profile_cycle(name: str):
+    if cycle_profiler.keep <= 0:
+        return _NOOP
+    return cycle_profiler.cycle(name)
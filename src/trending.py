@@ -0,0 +1,298 @@
+"""
+Trending tickers: streaming detection of tickers spiking on Reddit.
+
+Every ingested ``NewsItem`` is scanned for cashtags (``$NVDA``) and
+ticker-like tokens (2-5 capital letters that are not common acronyms). Per
+subreddit and overall, a ``TickerSummary`` keeps:
+
+- two sliding-window Count-Min Sketches: a short ``window`` of recent
+  mentions and a long ``baseline``, each a ring of per-bucket sketches plus
+  their running total, so expiring a bucket is one subtraction;
+- per-bucket Space-Saving summaries of the heaviest tickers, whose union over
+  the short window is the candidate set.
+
+A candidate's recent count is compared with what its baseline rate predicts
+for the window; a Poisson z-score above ``burst_z`` (with at least
+``min_mentions`` mentions) flags a burst. Memory is fixed by the sketch
+dimensions, bucket counts and ``top_k``, whatever the vocabulary.
+"""
+
+import hashlib
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src import metrics
+
+ALL = "__all__"
+
+CASHTAG = re.compile(r"\$([A-Za-z]{1,5}(?:\.[A-Za-z])?)\b")
+BARE = re.compile(r"\b[A-Z]{2,5}\b")
+# Capitalized words that are not tickers (or too ambiguous to count)
+STOPWORDS = frozenset(
+    """
+    A I AI AM AN AND ANY ARE AS AT ATH ATM BE BUT BY CEO CFO CPI DD DOJ ECB EDIT
+    EOD EPS ETF EU EV FAQ FDA FED FOMC FOR FTC FY FYI GDP HODL IMO IPO IRS IS IT
+    ITM LLC MOM NEW NO NOT NYSE OF OK ON OP OR OTM PE PM PPI Q QE QOQ REIT SEC
+    SO TA THE TL TLDR TO UK UP US USA USD VS WSB YOLO YOY YTD
+    """.split()
+)
+
+MENTIONS = metrics.counter(
+    "trending_ticker_mentions_total", "Ticker mentions seen by the detector"
+)
+
+
+def extract_tickers(text: str) -> List[str]:
+    """
+    Distinct ticker symbols in ``text``.
+
+    Cashtags always count. Bare capitalized tokens count unless they are
+    common acronyms, or the text is mostly capitals (shouting), where they
+    are noise.
+    """
+    tickers = {m.upper() for m in CASHTAG.findall(text)}
+    rest = CASHTAG.sub(" ", text)
+    words = rest.split()
+    capitals = sum(w.isupper() for w in words)
+    if words and capitals / len(words) <= 0.5:
+        tickers.update(t for t in BARE.findall(rest) if t not in STOPWORDS)
+    return sorted(tickers)
+
+
+class CountMinSketch:
+    """Counts with one-sided error: ``depth`` rows of ``width`` counters."""
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def indexes(self, key: str) -> np.ndarray:
+        # Double hashing from one stable 128-bit digest (Python's hash() is
+        # salted per process)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def add(self, key: str, count: int = 1, indexes: Optional[np.ndarray] = None):
+        idx = self.indexes(key) if indexes is None else indexes
+        self.table[self._rows, idx] += count
+
+    def estimate(self, key: str, indexes: Optional[np.ndarray] = None) -> int:
+        idx = self.indexes(key) if indexes is None else indexes
+        return int(self.table[self._rows, idx].min())
+
+
+class SpaceSaving:
+    """The (at most) ``k`` heaviest keys, with overestimates bounded by ``error``."""
+
+    def __init__(self, k: int = 50):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, key: str, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.k:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            # Replace the minimum; the newcomer inherits its count as error
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+
+    def clear(self):
+        self.counts.clear()
+        self.errors.clear()
+
+
+class WindowedSketch:
+    """
+    Count-Min Sketch over a sliding window of ``buckets`` x ``bucket_seconds``.
+
+    Each bucket has its own sketch; ``total`` is their sum, kept up to date so
+    a query is a single lookup and expiring a bucket a single subtraction.
+    """
+
+    def __init__(
+        self, bucket_seconds: float, buckets: int, width: int, depth: int, top_k=0
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.slots = [CountMinSketch(width, depth) for _ in range(buckets)]
+        self.heavy = [SpaceSaving(top_k) for _ in range(buckets)] if top_k else []
+        self.epochs = [None] * buckets  # absolute bucket number in each slot
+        self.total = CountMinSketch(width, depth)
+        self.head = None  # newest bucket number
+
+    @property
+    def span(self) -> float:
+        return self.bucket_seconds * self.buckets
+
+    def _advance(self, epoch: int):
+        """Expire the buckets that fell out of the window ending at ``epoch``."""
+        if self.head is not None and epoch <= self.head:
+            return
+        self.head = epoch
+        for slot, slot_epoch in enumerate(self.epochs):
+            if slot_epoch is not None and slot_epoch <= epoch - self.buckets:
+                self.total.table -= self.slots[slot].table
+                self.slots[slot].table[:] = 0
+                if self.heavy:
+                    self.heavy[slot].clear()
+                self.epochs[slot] = None
+
+    def add(self, key: str, ts: float, now: float, indexes=None):
+        epoch_now = int(now // self.bucket_seconds)
+        self._advance(epoch_now)
+        epoch = min(int(ts // self.bucket_seconds), epoch_now)
+        if epoch <= epoch_now - self.buckets:
+            return  # older than the window
+        slot = epoch % self.buckets
+        self.epochs[slot] = epoch
+        self.slots[slot].add(key, indexes=indexes)
+        self.total.add(key, indexes=indexes)
+        if self.heavy:
+            self.heavy[slot].add(key)
+
+    def estimate(self, key: str, now: float, indexes=None) -> int:
+        self._advance(int(now // self.bucket_seconds))
+        return self.total.estimate(key, indexes)
+
+    def candidates(self, now: float) -> set:
+        self._advance(int(now // self.bucket_seconds))
+        return {key for summary in self.heavy for key in summary.counts}
+
+
+class TickerSummary:
+    def __init__(self, config, started: float):
+        """
+        Args:
+            config: ``TrendingConfig``
+            started: When observation began; the baseline covers no more
+                than this (or the oldest post added)
+        """
+        self.config = config
+        self.started = started
+        self.window = WindowedSketch(
+            config.window_minutes * 60 / config.window_buckets,
+            config.window_buckets,
+            config.sketch_width,
+            config.sketch_depth,
+            top_k=config.top_k,
+        )
+        self.baseline = WindowedSketch(
+            config.baseline_hours * 3600 / config.baseline_buckets,
+            config.baseline_buckets,
+            config.sketch_width,
+            config.sketch_depth,
+        )
+
+    def add(self, ticker: str, ts: float, now: float):
+        # Backfilled posts (the first fetch reaches back a day) are history
+        self.started = min(self.started, ts)
+        indexes = self.window.total.indexes(ticker)
+        self.window.add(ticker, ts, now, indexes)
+        self.baseline.add(ticker, ts, now, indexes)
+
+    def top(self, now: float, limit: int = 20) -> List[dict]:
+        """Window candidates, bursting first, then by recent mentions."""
+        cfg = self.config
+        window = self.window.span
+        # Only as much baseline as has been observed (at least one window)
+        observed = max(window, min(self.baseline.span, now - self.started))
+        rows = []
+        for ticker in self.window.candidates(now):
+            indexes = self.window.total.indexes(ticker)
+            recent = self.window.estimate(ticker, now, indexes)
+            if recent <= 0:
+                continue
+            baseline = self.baseline.estimate(ticker, now, indexes)
+            # Mentions the baseline predicts for one window, excluding the
+            # window itself when there is baseline beyond it
+            before = max(0, baseline - recent)
+            history = observed - window
+            expected = before * window / history if history > 0 else 0.0
+            score = (recent - expected) / math.sqrt(expected + 1.0)
+            rows.append(
+                {
+                    "ticker": ticker,
+                    "mentions": recent,
+                    "expected": round(expected, 2),
+                    "baseline_mentions": baseline,
+                    "score": round(score, 2),
+                    "burst": recent >= cfg.min_mentions and score >= cfg.burst_z,
+                }
+            )
+        rows.sort(key=lambda r: (not r["burst"], -r["score"], -r["mentions"]))
+        return rows[:limit]
+
+
+class TrendingDetector:
+    def __init__(self, config, clock=time.time):
+        """
+        Args:
+            config: ``TrendingConfig``
+            clock: Epoch seconds (for tests)
+        """
+        self.config = config
+        self._clock = clock
+        self.started = clock()
+        self.summaries: Dict[str, TickerSummary] = {}
+        self._lock = threading.Lock()
+
+    def _summary(self, scope: str) -> TickerSummary:
+        summary = self.summaries.get(scope)
+        if summary is None:
+            summary = self.summaries[scope] = TickerSummary(self.config, self.started)
+        return summary
+
+    def observe(self, items: Iterable) -> int:
+        """Count the tickers of news items; returns the mentions found."""
+        now = self._clock()
+        found = 0
+        with self._lock:
+            for news in items:
+                tickers = extract_tickers(f"{news.title} {news.snippet}")
+                ts = news.timestamp.timestamp()
+                for ticker in tickers:
+                    self._summary(ALL).add(ticker, ts, now)
+                    self._summary(news.source).add(ticker, ts, now)
+                found += len(tickers)
+        MENTIONS.inc(found)
+        return found
+
+    def trending(self, subreddit: Optional[str] = None, limit: int = 20) -> dict:
+        """Top tickers overall (or of one subreddit) in the current window."""
+        now = self._clock()
+        with self._lock:
+            summary = self.summaries.get(subreddit or ALL)
+            tickers = summary.top(now, limit) if summary else []
+        return {
+            "scope": subreddit or "all",
+            "window_minutes": self.config.window_minutes,
+            "baseline_hours": self.config.baseline_hours,
+            "tickers": tickers,
+        }
+
+    def snapshot(self, limit: int = 20) -> dict:
+        """Trending lists of every scope (shared through the engine status)."""
+        with self._lock:
+            scopes = list(self.summaries)
+        return {
+            "all" if scope == ALL else scope: self.trending(
+                None if scope == ALL else scope, limit
+            )
+            for scope in scopes
+        }
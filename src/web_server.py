@@ -1,26 +1,119 @@
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
+from fastapi.responses import (
+    JSONResponse,
+    FileResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-from src.logger import setup_logging
-from src.main import app_repo, main as main_loop
+from src import metrics, tracing
+from src.app_repository import AppRepository
+from src.bootstrap import get_app
+from src.history_log import HistoryLog
+from src.log_tail import LogTail
+from src.portfolio_simulator import simulate_events
+from src.query_index import IndexView, to_ts
+from src.search_index import SearchIndex
+from src.state_reader import StateReader, read_status
+from src.timeseries import TimeSeries, TimeSeriesStore
+import asyncio
+import json
+import os
 import threading
 
 
-# Ensure logging is set up even if main.py is not run
-default_logging_config = type(
-    "LoggingConfig",
-    (),
-    {
-        "file": "logs/app.log",
-        "max_size": "10 MB",
-        "backup_count": "10 days",
-        "level": "DEBUG",
-    },
-)()
-setup_logging(default_logging_config)
+application = get_app()
+config = application.config  # loads .env and the config, sets up logging
+ENGINE_MODE = os.getenv("ENGINE_MODE", config.engine_mode)
+
+if ENGINE_MODE == "external":
+    # The engine is a separate process; serve what it saves. Safe to run
+    # with several uvicorn workers.
+    main_loop = None
+    state_reader = StateReader(
+        application.state_file,
+        history=HistoryLog(config.history_file, readonly=True),
+        max_events=config.max_events,
+    )
+    timeseries = TimeSeriesStore(config.timeseries_dir, readonly=True)
+    search_index = (
+        SearchIndex(config.search.directory, readonly=True)
+        if config.search.enabled
+        else None
+    )
+
+    def current_repo() -> AppRepository:
+        return state_reader.repo()
+
+    def pipeline_metrics() -> dict:
+        status = read_status(config.engine_status_file) or {}
+        return status.get("pipeline", {})
+
+    def engine_metrics() -> str:
+        status = read_status(config.engine_status_file) or {}
+        return status.get("metrics", "")
+
+    def breaker_status() -> dict:
+        status = read_status(config.engine_status_file) or {}
+        return status.get("breakers", {})
+
+    def trending_tickers(subreddit: Optional[str], limit: int) -> Optional[dict]:
+        status = read_status(config.engine_status_file) or {}
+        scope = status.get("trending", {}).get(subreddit or "all")
+        if scope is None:
+            return None
+        return {**scope, "tickers": scope["tickers"][:limit]}
+
+else:
+    from src.main import main as main_loop, pipeline_metrics
+
+    timeseries = application.timeseries
+    search_index = application.search_index
+
+    def current_repo() -> AppRepository:
+        # Built (and state.json loaded) by whichever comes first: the first
+        # request or the engine thread
+        return application.app_repo
+
+    def engine_metrics() -> str:
+        return ""  # same process: already in the registry
+
+    def breaker_status() -> dict:
+        return application.breakers.status()
+
+    def trending_tickers(subreddit: Optional[str], limit: int) -> Optional[dict]:
+        detector = application.trending
+        if subreddit is not None and subreddit not in detector.summaries:
+            return None
+        return detector.trending(subreddit, limit)
+
+
+STATE_SECONDS = metrics.histogram(
+    "api_state_build_seconds", "Time to build the /api/state response"
+)
+
+
+def _repository_sizes():
+    snapshot = current_repo().snapshot()
+    return {
+        ("events",): len(snapshot.events),
+        ("news",): len(snapshot.news_items),
+        ("llm_log",): len(snapshot.llm_log),
+    }
+
+
+metrics.gauge(
+    "repository_items",
+    "Items held in the repository",
+    ["kind"],
+    callback=_repository_sizes,
+)
+
 
 app = FastAPI()
 
@@ -36,6 +129,9 @@ app.add_middleware(
 
 @app.on_event("startup")
 def start_background_thread():
+    if main_loop is None:
+        return
+
     def run_main_loop():
         try:
             main_loop(with_signals=False)
@@ -52,15 +148,15 @@ def start_background_thread():
 @app.get("/api/state")
 def get_state(news_limit: str = Query("10")):
     try:
-        state = app_repo.get_app_data()  # Serve in-memory state directly
-        # Filter news_items if news_limit is set
+        # Lock-free read of the latest snapshot published by the main loop
+        limit = None
         if news_limit != "all":
             try:
                 limit = int(news_limit)
-                state["news_items"] = state["news_items"][:limit]
             except Exception:
                 pass  # fallback to all if invalid
-        print("/api/state: news count:", len(state["news_items"]))
+        with STATE_SECONDS.time():
+            state = current_repo().snapshot().to_dict(news_limit=limit)
         return JSONResponse(content=state)
     except Exception:
         return JSONResponse(
@@ -68,22 +164,323 @@ def get_state(news_limit: str = Query("10")):
         )
 
 
+def _score_filter(min_score: Optional[float], min_relevance: Optional[float]):
+    if min_score is None and min_relevance is None:
+        return None
+
+    def predicate(item):
+        if min_score is not None and (item.get("score") or 0.0) < min_score:
+            return False
+        if min_relevance is not None and (
+            item.get("relevance_score") or 0.0
+        ) < min_relevance:
+            return False
+        return True
+
+    return predicate
+
+
+def _page_response(
+    view: Optional[IndexView],
+    limit: int,
+    cursor: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    min_score: Optional[float] = None,
+    min_relevance: Optional[float] = None,
+):
+    """Serve one keyset page from an index view, newest first."""
+    if view is None:
+        return JSONResponse(content={"items": [], "count": 0, "next_cursor": None})
+
+    predicate = _score_filter(min_score, min_relevance)
+    try:
+        page = view.page(
+            limit=limit,
+            cursor=cursor,
+            since=to_ts(since) if since else None,
+            until=to_ts(until) if until else None,
+            predicate=predicate,
+            # Bound the walk for selective filters; the cursor resumes it
+            max_scan=limit * 50 if predicate else None,
+        )
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    return JSONResponse(content=page.to_dict())
+
+
+@app.get("/api/news")
+def get_news(
+    limit: int = Query(20, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, description="Subreddit"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+):
+    snapshot = current_repo().snapshot()
+    name = f"news:source:{source}" if source else "news"
+    return _page_response(snapshot.index(name), limit, cursor, since, until)
+
+
+@app.get("/api/events/{event_id}/insights")
+def get_event_insights(
+    event_id: str,
+    limit: int = Query(20, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    min_score: Optional[float] = Query(None),
+    min_relevance: Optional[float] = Query(None),
+):
+    snapshot = current_repo().snapshot()
+    if not any(e["id"] == event_id for e in snapshot.events):
+        return JSONResponse(
+            content={"error": f"Unknown event: {event_id}"}, status_code=404
+        )
+    return _page_response(
+        snapshot.index(f"insights:event:{event_id}"),
+        limit,
+        cursor,
+        since,
+        until,
+        min_score=min_score,
+        min_relevance=min_relevance,
+    )
+
+
+@app.get("/api/llm_log")
+def get_llm_log(
+    limit: int = Query(20, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    event_id: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    min_score: Optional[float] = Query(None),
+    min_relevance: Optional[float] = Query(None),
+):
+    snapshot = current_repo().snapshot()
+    name = f"llm_log:event:{event_id}" if event_id else "llm_log"
+    return _page_response(
+        snapshot.index(name),
+        limit,
+        cursor,
+        since,
+        until,
+        min_score=min_score,
+        min_relevance=min_relevance,
+    )
+
+
+def _series_response(
+    series: Optional[TimeSeries],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    resolution: str,
+    max_points: int,
+):
+    """Range query on a time series; empty when the series does not exist."""
+    if series is None:
+        return JSONResponse(content={"resolution": resolution, "t": [], "value": []})
+    return JSONResponse(
+        content=series.query(
+            start=to_ts(since) if since else None,
+            end=to_ts(until) if until else None,
+            resolution=resolution,
+            max_points=max_points,
+        )
+    )
+
+
+@app.get("/api/portfolio/history")
+def get_portfolio_history(
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    resolution: str = Query("auto", pattern="^(auto|raw|1m|1h)$"),
+    max_points: int = Query(500, ge=1, le=10000),
+):
+    return _series_response(
+        timeseries.get("portfolio"), since, until, resolution, max_points
+    )
+
+
+@app.get("/api/portfolio/simulation")
+def get_portfolio_simulation(
+    paths: int = Query(100_000, ge=1000, le=1_000_000),
+    seed: Optional[int] = Query(None),
+):
+    """Monte Carlo distribution of the portfolio once open events settle."""
+    snapshot = current_repo().snapshot()
+    current_value = (snapshot.portfolio or {}).get(
+        "current_value", config.portfolio.initial_value
+    )
+    result = simulate_events(
+        snapshot.events, current_value, config.portfolio, paths=paths, seed=seed
+    )
+    return JSONResponse(content=result.model_dump())
+
+
+@app.get("/api/events/{event_id}/sentiment")
+def get_event_sentiment(
+    event_id: str,
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    resolution: str = Query("auto", pattern="^(auto|raw|1m|1h)$"),
+    max_points: int = Query(500, ge=1, le=10000),
+):
+    series = timeseries.get(f"sentiment/{event_id}")
+    snapshot = current_repo().snapshot()
+    if series is None and not any(e["id"] == event_id for e in snapshot.events):
+        return JSONResponse(
+            content={"error": f"Unknown event: {event_id}"}, status_code=404
+        )
+    return _series_response(series, since, until, resolution, max_points)
+
+
+@app.get("/api/search")
+def get_search(
+    q: str = Query(..., min_length=1, description="Words to look for"),
+    kind: Optional[str] = Query(None, pattern="^(news|insight)$"),
+    source: Optional[str] = Query(None, description="Subreddit of news items"),
+    event_id: Optional[str] = Query(None, description="Event of insights"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """BM25-ranked news items and insights, over all history."""
+    if search_index is None:
+        return JSONResponse(content={"error": "Search is disabled"}, status_code=503)
+    result = search_index.search(
+        q,
+        kind=kind,
+        source=source,
+        event_id=event_id,
+        since=to_ts(since) if since else None,
+        until=to_ts(until) if until else None,
+        limit=limit,
+    )
+    return JSONResponse(content=result)
+
+
+@app.get("/api/pipeline")
+def get_pipeline():
+    """Queue depth, throughput and latency of each pipeline stage."""
+    return JSONResponse(content=pipeline_metrics())
+
+
+@app.get("/api/breakers")
+def get_breakers():
+    """State of each upstream's circuit breaker (the engine's, in external mode)."""
+    return JSONResponse(content=breaker_status())
+
+
+@app.get("/api/trending")
+def get_trending(
+    subreddit: Optional[str] = Query(None, description="One subreddit; default all"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Tickers most mentioned in the recent window; bursts against baseline first."""
+    result = trending_tickers(subreddit, limit)
+    if result is None:
+        if subreddit is None:
+            return JSONResponse(content={"scope": "all", "tickers": []})
+        return JSONResponse(
+            content={"error": f"No tickers seen in r/{subreddit}"}, status_code=404
+        )
+    return JSONResponse(content=result)
+
+
+@app.get("/api/budget")
+def get_budget():
+    """LLM spend this budget period, the degradation mode and usage breakdown."""
+    return JSONResponse(content=application.budget.status())
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of this process (and the engine's)."""
+    engine = engine_metrics()
+    # In external mode the engine's values win for metrics both processes have
+    text = metrics.REGISTRY.render(exclude=metrics.family_names(engine)) + engine
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/trace")
+def get_trace(news_id: Optional[str] = Query(None)):
+    """Chrome trace JSON of recorded spans, optionally of one news item."""
+    if main_loop is not None:
+        events = tracing.tracer.events(news_id)
+    else:
+        # The engine's spans, as last exported to the trace file
+        try:
+            with open(config.tracing.trace_file, "r") as f:
+                events = json.load(f).get("traceEvents", [])
+        except (FileNotFoundError, ValueError):
+            events = []
+        if news_id is not None:
+            events = [e for e in events if e["ph"] == "M" or _traces(e, news_id)]
+    return JSONResponse(content={"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+def _traces(event: dict, news_id: str) -> bool:
+    args = event.get("args", {})
+    return args.get("news_id") == news_id or news_id in args.get("news_ids", ())
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
+log_tail = LogTail(config.logging.file)
+
+
 @app.get("/api/logs")
-def get_logs():
-    log_path = "logs/app.log"
+def get_logs(
+    lines: int = Query(100, ge=1, le=2000),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Last ``lines`` log lines, or only the lines appended since ``cursor``.
+    The cursor for the next call is returned in the ``X-Log-Cursor`` header.
+    """
     try:
-        with open(log_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()[-100:]
-        return PlainTextResponse("".join(lines))
+        chunk = log_tail.read_since(cursor, lines=lines)
+        return PlainTextResponse(
+            chunk.text,
+            headers={
+                "X-Log-Cursor": chunk.cursor,
+                "X-Log-Rotated": "1" if chunk.rotated else "0",
+            },
+        )
     except Exception as e:
         return PlainTextResponse(f"Error reading log: {e}", status_code=500)
 
 
+@app.get("/api/logs/stream")
+async def stream_logs(
+    lines: int = Query(100, ge=0, le=2000),
+    poll_interval: float = Query(1.0, ge=0.2, le=30.0),
+):
+    """Server-sent events: the last ``lines`` lines, then new lines as written."""
+
+    async def events():
+        chunk = await asyncio.to_thread(log_tail.tail, lines)
+        idle = 0.0
+        while True:
+            if chunk.lines:
+                payload = "".join(f"data: {ln.rstrip()}\n" for ln in chunk.lines)
+                yield f"id: {chunk.cursor}\n{payload}\n"
+                idle = 0.0
+            elif idle >= 15.0:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+            chunk = await asyncio.to_thread(log_tail.read_since, chunk.cursor, lines)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # Serve static files
 static_dir = Path(__file__).parent.parent / "static"
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
@@ -96,5 +493,7 @@ def root():
 
 @app.on_event("shutdown")
 def shutdown_event():
+    if main_loop is None:
+        return
     print("Shutting down, saving state...")
-    app_repo.save()
+    current_repo().save()
@@ -0,0 +1,263 @@
+"""
+WorkQueue: Durable SQLite queue of news items for analyzer worker processes.
+
+Producers ``enqueue`` ``NewsItem``s (idempotent by news ID). Workers ``lease``
+items for a visibility timeout; an item whose lease runs out (e.g. the worker
+crashed) becomes available again. A lease carries a random token, and
+``complete`` only succeeds for the current token, so each item's result is
+committed exactly once even if a slow worker finishes after its lease was
+taken over. The engine then reads ``completed`` results, applies them and
+marks them ``applied``.
+
+Item lifecycle: pending -> leased -> done -> applied, or -> failed after
+``max_attempts`` errors or expired leases (an item that kills its worker
+every time is not handed out forever). ``purge`` deletes applied and failed
+items after a retention period.
+
+The database runs in WAL mode, so readers never block the single writer and
+any number of processes can share the file.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from src.models import Insight, NewsItem, TrackedEvent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    available_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS items_ready ON items (status, available_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+Results = List[Tuple[str, Insight]]
+
+
+@dataclass
+class Lease:
+    news: NewsItem
+    token: str
+    attempts: int
+
+
+class WorkQueue:
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        """Run ``fn(conn)`` in an IMMEDIATE transaction (takes the write lock)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def enqueue(self, items: Iterable[NewsItem]) -> int:
+        """Add items not seen before; returns how many were new."""
+        now = time.time()
+        rows = [(n.id, n.model_dump_json(), now, now, now) for n in items]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO items "
+                "(id, payload, available_at, enqueued_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+        return self._write(insert)
+
+    def lease(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        visibility_timeout: float = 120.0,
+        max_attempts: int = 3,
+    ) -> List[Lease]:
+        """
+        Take up to ``limit`` ready items, oldest first.
+
+        Args:
+            worker_id: Recorded as the lease owner
+            visibility_timeout: Seconds before an unfinished item is handed out
+                again
+            max_attempts: Items whose lease expired after this many attempts
+                are marked failed instead of handed out again
+        """
+
+        def take(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE items SET status = 'failed', lease_token = NULL, "
+                "error = 'lease expired after the last attempt', updated_at = ? "
+                "WHERE status = 'leased' AND available_at <= ? AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM items "
+                "WHERE status IN ('pending', 'leased') AND available_at <= ? "
+                "ORDER BY available_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            leases = []
+            for item_id, payload, attempts in rows:
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE items SET status = 'leased', lease_owner = ?, "
+                    "lease_token = ?, attempts = attempts + 1, "
+                    "available_at = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, token, now + visibility_timeout, now, item_id),
+                )
+                leases.append(
+                    Lease(NewsItem.model_validate_json(payload), token, attempts + 1)
+                )
+            return leases
+
+        return self._write(take)
+
+    def complete(self, lease: Lease, results: Results) -> bool:
+        """Commit a leased item's results; False if the lease was lost."""
+        payload = json.dumps(
+            [[eid, insight.model_dump(mode="json")] for eid, insight in results]
+        )
+        cur = self._conn().execute(
+            "UPDATE items SET status = 'done', result = ?, lease_token = NULL, "
+            "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            (payload, time.time(), lease.news.id, lease.token),
+        )
+        return cur.rowcount == 1
+
+    def fail(
+        self, lease: Lease, error: str, max_attempts: int = 3, retry_after: float = 30.0
+    ) -> bool:
+        """Release a leased item for retry, or mark it failed after
+        ``max_attempts``; False if the lease was lost."""
+        status = "failed" if lease.attempts >= max_attempts else "pending"
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE items SET status = ?, error = ?, lease_token = NULL, "
+            "available_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            (status, error, now + retry_after, now, lease.news.id, lease.token),
+        )
+        return cur.rowcount == 1
+
+    def completed(
+        self, limit: int = 100, exclude: Iterable[str] = ()
+    ) -> List[Tuple[NewsItem, Results]]:
+        """Results committed by workers but not yet applied, oldest first."""
+        exclude = set(exclude)
+        rows = self._conn().execute(
+            "SELECT payload, result FROM items WHERE status = 'done' "
+            "ORDER BY updated_at LIMIT ?",
+            (limit + len(exclude),),
+        ).fetchall()
+        out = []
+        for payload, result in rows:
+            news = NewsItem.model_validate_json(payload)
+            if news.id in exclude:
+                continue
+            insights = [
+                (event_id, Insight(**data)) for event_id, data in json.loads(result)
+            ]
+            out.append((news, insights))
+        return out[:limit]
+
+    def mark_applied(self, ids: Iterable[str]) -> int:
+        now = time.time()
+        rows = [(now, item_id) for item_id in ids]
+
+        def update(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE items SET status = 'applied', result = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'done'",
+                rows,
+            )
+            return conn.total_changes - before
+
+        return self._write(update)
+
+    def purge(self, older_than: float) -> int:
+        """Delete applied/failed items last touched before ``older_than``."""
+        cur = self._conn().execute(
+            "DELETE FROM items WHERE status IN ('applied', 'failed') "
+            "AND updated_at < ?",
+            (older_than,),
+        )
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) FROM items GROUP BY status"
+        ).fetchall()
+        return dict(rows)
+
+    def publish_events(self, events: List[TrackedEvent]):
+        """Share the tracked events with workers (they need them for prompts)."""
+        value = json.dumps(
+            [e.model_dump(mode="json", exclude={"insights"}) for e in events]
+        )
+        self._conn().execute(
+            "INSERT INTO meta (key, value) VALUES ('events', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (value,),
+        )
+
+    def events(self) -> List[TrackedEvent]:
+        row = self._conn().execute(
+            "SELECT value FROM meta WHERE key = 'events'"
+        ).fetchone()
+        return [TrackedEvent(**data) for data in json.loads(row[0])] if row else []
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
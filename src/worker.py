@@ -1,22 +1,27 @@
 import os
 
 from threading import Thread, Event
+from typing import Optional
 
 from loguru import logger
 from dotenv import load_dotenv
 
+from src.circuit_breaker import CircuitOpen
 from src.reddit_scraper import RedditScraper
 from src.config import RedditConfig
+from src.work_queue import WorkQueue
 
 
 class RedditWorker:
-    def __init__(self, config: RedditConfig):
+    def __init__(self, config: RedditConfig, queue: Optional[WorkQueue] = None):
         """
         Initialize the Reddit worker.
 
         Args:
             config: Reddit configuration object containing subreddits, fetch interval,
                    and other settings
+            queue: Work queue that fetched posts are pushed into for analyzer
+                   workers (optional)
         """
         load_dotenv()
 
@@ -27,6 +32,7 @@ class RedditWorker:
         )
 
         self.config = config
+        self.queue = queue
         self._stop_event = Event()
         self._worker_thread: Thread = None
 
@@ -44,6 +50,12 @@ class RedditWorker:
                             subreddit, limit=self.config.max_posts_per_fetch
                         )
                         logger.info(f"Fetched {len(posts)} posts from r/{subreddit}")
+                        if self.queue is not None and posts:
+                            added = self.queue.enqueue(posts)
+                            logger.info(f"Queued {added} new posts for analysis")
+                    except CircuitOpen as e:
+                        logger.debug(f"Skipping r/{subreddit}: {e}")
+                        continue
                     except Exception as e:
                         logger.error(f"Error fetching from r/{subreddit}: {str(e)}")
                         continue
@@ -107,7 +107,7 @@ function updatePanels(data) {
                 Time: ${new Date(ev.event_time).toLocaleString()}<br>
                 Bias: <span style="color:${biasColor(ev.predicted_action)}">${ev.predicted_action ?? "N/A"}</span><br>
                 Thinking: <span class="thinking-text">${ev.thinking_text ?? ""}</span><br>
-                <details style="margin-top:8px;"><summary>Insights (${ev.insights.length})</summary>
+                <details style="margin-top:8px;"><summary>Insights (${ev.stats ? ev.stats.count : ev.insights.length})</summary>
                   <ul style="margin:0 0 0 16px;padding:0;list-style:disc;">
                     ${ev.insights
                       .map(
@@ -196,19 +196,52 @@ function scoreColor(score) {
   return "#ffb300";
 }
 
+const MAX_LOG_LINES = 100;
+let logLines = [];
+let logCursor = null;
+let logPollTimer = null;
+
+function appendLogLines(lines) {
+  if (!lines.length) return;
+  logLines = logLines.concat(lines).slice(-MAX_LOG_LINES);
+  const panel = document.getElementById("server-logs-panel");
+  if (panel) panel.textContent = logLines.join("\n");
+}
+
+// Fallback: poll only the lines appended since the last cursor
 async function fetchLogs() {
   try {
-    const res = await fetch("/api/logs");
+    const url = logCursor
+      ? `/api/logs?cursor=${encodeURIComponent(logCursor)}`
+      : `/api/logs?lines=${MAX_LOG_LINES}`;
+    const res = await fetch(url);
     const text = await res.text();
-    const panel = document.getElementById("server-logs-panel");
-    if (panel) panel.textContent = text;
+    logCursor = res.headers.get("X-Log-Cursor") || logCursor;
+    appendLogLines(text.split("\n").filter((l) => l.length > 0));
   } catch (e) {
     const panel = document.getElementById("server-logs-panel");
     if (panel) panel.textContent = "Error loading logs";
   }
 }
 
+function startLogStream() {
+  if (!window.EventSource) {
+    logPollTimer = setInterval(fetchLogs, 3000);
+    fetchLogs();
+    return;
+  }
+  const source = new EventSource(`/api/logs/stream?lines=${MAX_LOG_LINES}`);
+  source.onmessage = (e) => {
+    if (e.lastEventId) logCursor = e.lastEventId;
+    appendLogLines(e.data.split("\n"));
+  };
+  source.onerror = () => {
+    // Fall back to cursor polling if the stream cannot be kept open
+    source.close();
+    if (!logPollTimer) logPollTimer = setInterval(fetchLogs, 3000);
+  };
+}
+
 setInterval(fetchState, 5000);
-setInterval(fetchLogs, 3000);
 fetchState();
-fetchLogs();
+startLogStream();
@@ -0,0 +1,352 @@
+"""
+Microbenchmarks of the repository, serialization, parsing and prediction hot
+paths, at scales from 1e2 to 1e5 items.
+
+Usage:
+    python -m tests.benchmarks run -o bench.json [--filter save] [--max-scale 10000]
+    python -m tests.benchmarks compare base.json bench.json [--threshold 0.25]
+
+``run`` writes machine-readable JSON (one entry per benchmark and scale).
+``compare`` prints the ratio of the fastest times of two runs and exits with
+status 1 if any benchmark got slower by more than ``threshold``. Compare runs
+made on the same machine; absolute times are not portable.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from tests.benchmarks import data
+
+SCALES = (100, 1_000, 10_000, 100_000)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    scales: Tuple[int, ...] = SCALES
+    # Mutating benchmarks get a fresh setup for every (single) timed call
+    mutating: bool = False
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, scales: Tuple[int, ...] = SCALES, mutating: bool = False):
+    """Register ``setup(n) -> fn``; only ``fn()`` is timed."""
+
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, scales, mutating)
+        return setup
+
+    return register
+
+
+def _repo(n_news: int, n_events: int = 10, insights_per_event: int = 20):
+    from src.app_repository import AppRepository
+
+    repo = AppRepository(max_events=n_events, max_history=max(n_news, 10_000))
+    repo.news.max_news = n_news
+    with repo.writer():
+        for event in data.events(n_events):
+            repo.events.add(event)
+        repo.add_news_bulk(data.news_items(n_news))
+        for i, insight in enumerate(data.insights(n_events * insights_per_event)):
+            repo.add_insight(f"e{i % n_events}", insight)
+    return repo
+
+
+# --- Repository ---
+
+
+@benchmark("news_repository.add", mutating=True)
+def news_repository_add(n):
+    from src.app_repository import NewsRepository
+
+    items = data.news_items(n)
+    repo = NewsRepository(max_news=n)
+    return lambda: [repo.add(item) for item in items]
+
+
+@benchmark("event_repository.get_all")
+def event_repository_get_all(n):
+    from src.app_repository import EventRepository
+
+    repo = EventRepository(max_events=n)
+    for event in data.events(n):
+        repo.add(event)
+    return repo.get_all
+
+
+@benchmark("app_repository.get_app_data", scales=SCALES[:3])
+def app_repository_get_app_data(n):
+    return _repo(n).get_app_data
+
+
+@benchmark("app_repository.small_write", scales=SCALES[:3])
+def app_repository_small_write(n):
+    repo = _repo(n)
+    with repo.writer():
+        for i in range(n):
+            repo.processed_news_ids.add(f"seen{i}")
+    counter = iter(range(10**9))
+
+    def write():
+        with repo.writer():
+            repo.processed_news_ids.add(f"new{next(counter)}")
+
+    return write
+
+
+@benchmark("app_repository.save", scales=SCALES[:3])
+def app_repository_save(n):
+    repo = _repo(n)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "state.json")
+    return lambda: repo.save(path)
+
+
+@benchmark("app_repository.load", scales=SCALES[:3], mutating=True)
+def app_repository_load(n):
+    from src.app_repository import AppRepository
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "state.json")
+    _repo(n).save(path)
+    repo = AppRepository(max_events=10, max_history=max(n, 10_000))
+    return lambda: repo.load(path)
+
+
+# --- Parsing and prediction ---
+
+
+@benchmark("news_analyzer.parse_response", scales=SCALES[:3])
+def news_analyzer_parse(n):
+    from src.news_analyzer import NewsAnalyzer
+
+    news = data.news_items(1)[0]
+    response = data.llm_response(n)
+    return lambda: NewsAnalyzer._parse_response(news, response)
+
+
+@benchmark("predictor.predict_all")
+def predictor_predict_all(n):
+    from src.event_predictor import Predictor
+
+    events = data.events(10)
+    predictor = Predictor()
+    for i, insight in enumerate(data.insights(n)):
+        predictor.observe(f"e{i % 10}", insight)
+    now = data.T0.timestamp() + 31 * 24 * 3600
+    return lambda: predictor.predict_all(events, now=now)
+
+
+@benchmark("trending.observe", scales=SCALES[:3])
+def trending_observe(n):
+    from src.config import TrendingConfig
+    from src.trending import TrendingDetector
+
+    items = data.news_items(n)
+    detector = TrendingDetector(TrendingConfig(), clock=lambda: data.T0.timestamp())
+    return lambda: detector.observe(items)
+
+
+@benchmark("search.query", scales=SCALES)
+def search_query(n):
+    from src.search_index import SearchIndex
+
+    index = SearchIndex(tempfile.mkdtemp(prefix="bench-"), checkpoint_every=10**9)
+    for news in data.news_items(n):
+        index.add_news(news)
+    return lambda: index.search("fed inflation", source=data.SUBREDDITS[0])
+
+
+# --- API ---
+
+
+@benchmark("api.state", scales=SCALES[:3])
+def api_state(n):
+    from fastapi.testclient import TestClient
+
+    import src.web_server as web_server
+
+    # Components are cached on the application; swap in the synthetic state
+    web_server.application.__dict__["app_repo"] = _repo(n)
+    client = TestClient(web_server.app)  # no context manager: no engine thread
+    return lambda: client.get("/api/state", params={"news_limit": "all"})
+
+
+# --- Runner ---
+
+
+def _autorange(fn, min_time: float) -> int:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time or number >= 1_000_000:
+            return number
+        number *= 2
+
+
+def measure(bench: Benchmark, n: int, repeat: int = 5, min_time: float = 0.05):
+    """Time one benchmark at scale ``n``; seconds are per call of ``fn``."""
+    times = []
+    if bench.mutating:
+        number = 1
+        for _ in range(repeat):
+            fn = bench.setup(n)
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    else:
+        fn = bench.setup(n)
+        number = _autorange(fn, min_time)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append((time.perf_counter() - start) / number)
+    median = statistics.median(times)
+    return {
+        "name": bench.name,
+        "scale": n,
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(times),
+        "median_s": median,
+        "mean_s": statistics.fmean(times),
+        "per_item_ns": median / n * 1e9,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    names: Optional[Iterable[str]] = None,
+    max_scale: Optional[int] = None,
+    repeat: int = 5,
+    min_time: float = 0.05,
+    progress: Callable[[str], None] = lambda line: None,
+) -> dict:
+    """Run the selected benchmarks; returns the JSON-ready result document."""
+    import numpy
+
+    selected = [BENCHMARKS[name] for name in names] if names else BENCHMARKS.values()
+    results = {}
+    for bench in selected:
+        for n in bench.scales:
+            if max_scale is not None and n > max_scale:
+                continue
+            result = measure(bench, n, repeat=repeat, min_time=min_time)
+            results[f"{bench.name}[{n}]"] = result
+            progress(
+                f"{bench.name:<32} n={n:<7} {result['min_s'] * 1e3:10.3f} ms "
+                f"{result['per_item_ns']:10.0f} ns/item"
+            )
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.25) -> List[dict]:
+    """
+    Compare the fastest time of every benchmark present in both runs.
+
+    Returns one row per benchmark with ``status`` ``regression`` (slower by
+    more than ``threshold``), ``improvement`` (faster by as much) or ``same``.
+    """
+    rows = []
+    for key, before in base["results"].items():
+        after = new["results"].get(key)
+        if after is None:
+            continue
+        ratio = after["min_s"] / before["min_s"] if before["min_s"] else 1.0
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append(
+            {
+                "benchmark": key,
+                "base_s": before["min_s"],
+                "new_s": after["min_s"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run benchmarks and write JSON")
+    run_parser.add_argument("-o", "--output", default="bench.json")
+    run_parser.add_argument("--filter", help="Only benchmarks containing this")
+    run_parser.add_argument("--max-scale", type=int)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    compare_parser = commands.add_parser("compare", help="Flag regressions")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        # Measure the code, not loguru writing DEBUG lines to the terminal
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+        doc = run(names, args.max_scale, args.repeat, progress=print)
+        with open(args.output, "w") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Wrote {len(doc['results'])} results to {args.output}")
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold)
+    for row in rows:
+        print(
+            f"{row['benchmark']:<44} {row['base_s'] * 1e3:10.3f} ms "
+            f"{row['new_s'] * 1e3:10.3f} ms {row['ratio']:6.2f}x  {row['status']}"
+        )
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Deterministic synthetic data for the benchmarks."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from src.models import Insight, NewsItem, TrackedEvent
+
+T0 = datetime(2024, 3, 1, tzinfo=timezone.utc)
+SUBREDDITS = ["stocks", "investing", "wallstreetbets", "economics", "options"]
+WORDS = (
+    "fed rate cut inflation cpi earnings beat miss guidance revenue jobs report "
+    "yield curve recession rally selloff tariff chip demand oil supply outlook"
+).split()
+TRENDS = ["improving", "worsening", "stable"]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def news_items(n: int, seed: int = 0) -> List[NewsItem]:
+    """``n`` news items with distinct IDs and shuffled timestamps."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        when = T0 + timedelta(seconds=rng.randrange(30 * 24 * 3600))
+        items.append(
+            NewsItem(
+                id=f"n{i}",
+                source=rng.choice(SUBREDDITS),
+                title=_text(rng, 8),
+                snippet=_text(rng, 40),
+                timestamp=when,
+                added_at=when,
+            )
+        )
+    return items
+
+
+def events(n: int, seed: int = 0) -> List[TrackedEvent]:
+    rng = random.Random(seed)
+    return [
+        TrackedEvent(
+            id=f"e{i}",
+            name=f"Event {i} {_text(rng, 2)}",
+            event_time=T0 + timedelta(days=30, minutes=rng.randrange(60 * 24 * 30)),
+            keywords=[rng.choice(WORDS) for _ in range(3)],
+            stock=rng.choice(["SPY", "QQQ", "NVDA", "TLT", None]),
+        )
+        for i in range(n)
+    ]
+
+
+def insights(n: int, seed: int = 0) -> List[Insight]:
+    rng = random.Random(seed)
+    return [
+        Insight(
+            text=_text(rng, 12),
+            score=rng.uniform(-1, 1),
+            trend=rng.choice(TRENDS),
+            timestamp=T0 + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+            relevance_score=rng.uniform(0, 1),
+            news_id=f"n{i}",
+        )
+        for i in range(n)
+    ]
+
+
+def llm_response(n_events: int, seed: int = 0):
+    """An object shaped like an Anthropic message answering for n events."""
+    rng = random.Random(seed)
+    blocks = [
+        f"EVENT_ID: e{i}\n"
+        f"RELEVANCE: {_text(rng, 15)}\n"
+        f"RELEVANCE_SCORE: {rng.uniform(0, 1):.2f}\n"
+        f"SCORE: {rng.uniform(-1, 1):.2f}\n"
+        f"TREND: {rng.choice(TRENDS)}\n"
+        for i in range(n_events)
+    ]
+    return SimpleNamespace(content=[SimpleNamespace(text="\n".join(blocks))])
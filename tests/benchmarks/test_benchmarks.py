@@ -0,0 +1,33 @@
+import json
+
+from tests.benchmarks import bench
+
+
+def test_every_benchmark_runs_at_the_smallest_scale():
+    names = [name for name in bench.BENCHMARKS if name != "api.state"]
+    doc = bench.run(names, max_scale=100, repeat=1, min_time=0.0)
+
+    assert set(doc["results"]) == {f"{name}[100]" for name in names}
+    for result in doc["results"].values():
+        assert result["min_s"] > 0 and result["per_item_ns"] > 0
+    json.dumps(doc)  # machine-readable as is
+
+
+def test_compare_flags_regressions_and_improvements(tmp_path):
+    def doc(**times):
+        return {
+            "results": {
+                key: {"min_s": seconds} for key, seconds in times.items()
+            }
+        }
+
+    base = doc(a=1.0, b=1.0, c=1.0, gone=1.0)
+    new = doc(a=1.1, b=1.5, c=0.5, added=1.0)
+    rows = {row["benchmark"]: row["status"] for row in bench.compare(base, new, 0.25)}
+    assert rows == {"a": "same", "b": "regression", "c": "improvement"}
+
+    (tmp_path / "base.json").write_text(json.dumps(base))
+    (tmp_path / "new.json").write_text(json.dumps(new))
+    args = ["compare", str(tmp_path / "base.json"), str(tmp_path / "new.json")]
+    assert bench.main(args) == 1
+    assert bench.main(args + ["--threshold", "1.0"]) == 0
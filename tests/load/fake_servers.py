@@ -0,0 +1,265 @@
+"""
+Local stand-ins for the Reddit listing API and the Anthropic messages API.
+
+Both are aiohttp apps with configurable latency, error rate and 429 rate
+(``Faults``). The real clients are pointed at them without code changes:
+PRAW through ``oauth_url``/``reddit_url`` in a ``praw.ini``, and the Anthropic
+SDK through ``ANTHROPIC_BASE_URL``.
+
+``FakeReddit`` publishes posts at ``post_rate`` per second, spread over its
+subreddits, and records when each post appeared so the harness can measure
+post-to-insight latency. ``FakeLLM`` answers analysis prompts with canned
+text or generates an answer for the event IDs found in the prompt.
+"""
+
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+WORDS = (
+    "fed rate cut inflation cpi earnings beat miss guidance revenue jobs report "
+    "yield curve recession rally selloff tariff chip demand oil supply outlook"
+).split()
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0  # mean seconds added to every response
+    jitter: float = 0.0  # +/- uniform seconds around latency
+    error_rate: float = 0.0  # fraction of 500 responses
+    rate_limited: float = 0.0  # fraction of 429 responses
+    retry_after: float = 1.0  # Retry-After sent with 429s
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    by_status: Dict[int, int] = field(default_factory=dict)
+
+    def count(self, status: int):
+        self.requests += 1
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+
+
+class _FakeServer:
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        self.faults = faults or Faults()
+        self.stats = ServerStats()
+        self.rng = random.Random(seed)
+        self.runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _fault(self) -> Optional[web.Response]:
+        """Sleep for the configured latency; maybe return an injected failure."""
+        f = self.faults
+        delay = f.latency + self.rng.uniform(-f.jitter, f.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = self.rng.random()
+        if roll < f.rate_limited:
+            self.stats.rate_limited += 1
+            self.stats.count(429)
+            return web.json_response(
+                {"error": "rate_limited"},
+                status=429,
+                headers={"Retry-After": str(f.retry_after)},
+            )
+        if roll < f.rate_limited + f.error_rate:
+            self.stats.errors += 1
+            self.stats.count(500)
+            return web.json_response({"error": "injected"}, status=500)
+        return None
+
+    def app(self) -> web.Application:
+        raise NotImplementedError
+
+    async def start(self, port: int = 0):
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+
+class FakeReddit(_FakeServer):
+    def __init__(
+        self,
+        subreddits: List[str],
+        post_rate: float = 1.0,
+        faults: Optional[Faults] = None,
+        seed: int = 0,
+        keywords: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            subreddits: Subreddits that receive posts
+            post_rate: New posts per second, over all subreddits
+            keywords: Words mixed into titles (e.g. the event keywords)
+        """
+        super().__init__(faults, seed)
+        self.subreddits = subreddits
+        self.post_rate = post_rate
+        self.keywords = keywords or []
+        self.posts: Dict[str, deque] = {s: deque(maxlen=1000) for s in subreddits}
+        self.published: Dict[str, float] = {}  # post ID -> time.time()
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, subreddit: Optional[str] = None) -> dict:
+        subreddit = subreddit or self.rng.choice(self.subreddits)
+        self._seq += 1
+        post_id = f"p{self._seq:07d}"
+        words = [self.rng.choice(WORDS) for _ in range(8)]
+        if self.keywords:
+            words[self.rng.randrange(len(words))] = self.rng.choice(self.keywords)
+        now = time.time()
+        post = {
+            "id": post_id,
+            "name": f"t3_{post_id}",
+            "subreddit": subreddit,
+            "title": " ".join(words),
+            "selftext": " ".join(self.rng.choice(WORDS) for _ in range(60)),
+            "created_utc": now,
+            "author": "loadtest",
+            "permalink": f"/r/{subreddit}/comments/{post_id}/",
+        }
+        self.posts[subreddit].appendleft(post)
+        self.published[post_id] = now
+        return post
+
+    async def _publisher(self):
+        while True:
+            # Poisson arrivals at post_rate
+            await asyncio.sleep(self.rng.expovariate(self.post_rate))
+            self.publish()
+
+    async def token(self, request):
+        if (failure := await self._fault()) is not None:
+            return failure
+        self.stats.count(200)
+        return web.json_response(
+            {
+                "access_token": "fake-token",
+                "token_type": "bearer",
+                "expires_in": 3600,
+                "scope": "*",
+            }
+        )
+
+    async def listing(self, request):
+        if (failure := await self._fault()) is not None:
+            return failure
+        subreddit = request.match_info["subreddit"]
+        limit = int(request.query.get("limit", 25))
+        posts = list(self.posts.get(subreddit, ()))[:limit]
+        self.stats.count(200)
+        return web.json_response(
+            {
+                "kind": "Listing",
+                "data": {
+                    "after": None,
+                    "before": None,
+                    "dist": len(posts),
+                    "children": [{"kind": "t3", "data": post} for post in posts],
+                },
+            }
+        )
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/v1/access_token", self.token)
+        app.router.add_get("/r/{subreddit}/new", self.listing)
+        return app
+
+    async def start(self, port: int = 0):
+        await super().start(port)
+        if self.post_rate > 0:
+            self._task = asyncio.create_task(self._publisher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        await super().stop()
+
+
+class FakeLLM(_FakeServer):
+    def __init__(
+        self,
+        faults: Optional[Faults] = None,
+        seed: int = 0,
+        canned: Optional[str] = None,
+        relevance: float = 0.8,
+    ):
+        """
+        Args:
+            canned: Fixed answer text; otherwise one is generated per prompt
+            relevance: Chance that each event in a prompt is reported relevant
+        """
+        super().__init__(faults, seed)
+        self.canned = canned
+        self.relevance = relevance
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def answer(self, prompt: str) -> str:
+        if self.canned is not None:
+            return self.canned
+        event_ids = re.findall(r"\(ID: ([^)]+)\)", prompt)
+        blocks = [
+            f"EVENT_ID: {event_id}\n"
+            f"RELEVANCE: {' '.join(self.rng.choice(WORDS) for _ in range(12))}\n"
+            f"RELEVANCE_SCORE: {self.rng.uniform(0.5, 1.0):.2f}\n"
+            f"SCORE: {self.rng.uniform(-1.0, 1.0):.2f}\n"
+            f"TREND: {self.rng.choice(['improving', 'worsening', 'stable'])}\n"
+            for event_id in event_ids
+            if self.rng.random() < self.relevance
+        ]
+        return "\n".join(blocks) or "NOT RELEVANT: no event is mentioned."
+
+    async def messages(self, request):
+        body = await request.json()
+        if (failure := await self._fault()) is not None:
+            return failure
+        prompt = " ".join(
+            m["content"] if isinstance(m["content"], str) else str(m["content"])
+            for m in body.get("messages", [])
+        )
+        text = self.answer(prompt)
+        # Roughly four characters per token
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4}
+        self.input_tokens += usage["input_tokens"]
+        self.output_tokens += usage["output_tokens"]
+        self.stats.count(200)
+        return web.json_response(
+            {
+                "id": f"msg_{self.stats.requests}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": usage,
+            }
+        )
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/messages", self.messages)
+        return app
@@ -0,0 +1,349 @@
+"""
+End-to-end load harness: the real web server and engine against local fake
+Reddit and Anthropic servers.
+
+Usage:
+    python -m tests.load --duration 120 --post-rate 5 --ui-clients 20 \\
+        --llm-latency 1.5 --llm-429-rate 0.05 --output load.json
+
+The harness works in a scratch directory (``--workdir``, a temp dir by
+default). There it writes a config derived from ``config/config.yaml``, with
+the fake subreddits and seeded events, and a ``praw.ini`` that points PRAW at
+the fake Reddit. It sets ``ANTHROPIC_BASE_URL`` to the fake LLM, then serves
+``src.web_server:app`` with uvicorn in a thread; the app's startup hook runs
+the engine. ``--ui-clients`` clients poll ``/api/state`` like the UI.
+
+Every ``--sample-interval`` seconds it records processed items, items/sec,
+RSS and the state file size. At the end it reports throughput, percentiles
+of post-to-insight latency (post published by the fake Reddit until the item
+is in the repository's processed set, measured to the polling interval) and
+of UI request latency, and the fake servers' request and fault counts.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import yaml
+
+from tests.load.fake_servers import Faults, FakeLLM, FakeReddit
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS; kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+        for p in points
+    }
+
+
+def write_config(workdir: Path, args, subreddits: List[str], keywords: List[str]):
+    with open(REPO_ROOT / "config" / "config.yaml") as f:
+        config = yaml.safe_load(f)
+    soon = datetime.now(timezone.utc) + timedelta(days=7)
+    events = [
+        {
+            "id": f"load-{i}",
+            "name": f"Load test event {i}",
+            "event_time": (soon + timedelta(hours=i)).isoformat(),
+            "keywords": keywords[i::3],
+        }
+        for i in range(3)
+    ]
+    config["reddit"].update(
+        subreddits=subreddits,
+        fetch_interval=args.fetch_interval,
+        max_posts_per_fetch=args.posts_per_fetch,
+    )
+    config["events"] = events
+    config["discovery"] = {"target_events": len(events)}  # never ask OpenAI
+    config["pipeline"]["analyze_concurrency"] = args.analyze_concurrency
+    config["logging"].update(
+        level=args.log_level, console=False, file="logs/app.log", json_file=None
+    )
+    config["tracing"] = {"enabled": False}
+    (workdir / "config").mkdir(parents=True, exist_ok=True)
+    with open(workdir / "config" / "config.yaml", "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def write_praw_ini(workdir: Path, reddit: FakeReddit):
+    # PRAW reads praw.ini from the working directory; no code changes needed
+    warnings.filterwarnings("ignore", message="The praw.ini in the current")
+    (workdir / "praw.ini").write_text(
+        "[DEFAULT]\n"
+        f"oauth_url={reddit.url}\n"
+        f"reddit_url={reddit.url}\n"
+        "check_for_updates=False\n"
+    )
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.samples: List[dict] = []
+        self.latencies: List[float] = []  # post-to-insight seconds
+        self.ui_latencies: List[float] = []
+        self.ui_errors = 0
+        self.seen = set()
+
+    def start_server(self, port: int):
+        import uvicorn
+
+        config = uvicorn.Config(
+            "src.web_server:app", host="127.0.0.1", port=port, log_level="warning"
+        )
+        self.server = uvicorn.Server(config)
+        thread = threading.Thread(target=self.server.run, daemon=True)
+        thread.start()
+        return thread
+
+    async def wait_ready(self, url: str, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while time.monotonic() < deadline:
+                try:
+                    async with session.get(f"{url}/health") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError("Web server did not start")
+
+    async def ui_client(self, url: str, stop: asyncio.Event):
+        async with aiohttp.ClientSession() as session:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    async with session.get(
+                        f"{url}/api/state", params={"news_limit": "10"}
+                    ) as response:
+                        await response.read()
+                        if response.status != 200:
+                            self.ui_errors += 1
+                except aiohttp.ClientError:
+                    self.ui_errors += 1
+                self.ui_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(self.args.ui_interval)
+
+    def poll_processed(self, reddit: FakeReddit):
+        from src.bootstrap import get_app
+
+        now = time.time()
+        snapshot = get_app().app_repo.snapshot()
+        for news_id in snapshot.processed_news_ids:
+            if news_id not in self.seen:
+                self.seen.add(news_id)
+                published = reddit.published.get(news_id)
+                if published is not None:
+                    self.latencies.append(now - published)
+
+    async def sample(self, started: float, state_file: Path):
+        processed = len(self.seen)
+        elapsed = time.monotonic() - started
+        previous = self.samples[-1] if self.samples else None
+        rate = None
+        if previous:
+            rate = (processed - previous["processed"]) / (
+                elapsed - previous["elapsed_s"]
+            )
+        self.samples.append(
+            {
+                "elapsed_s": round(elapsed, 2),
+                "processed": processed,
+                "items_per_sec": rate,
+                "rss_mb": rss_bytes() / 2**20,
+                "state_bytes": state_file.stat().st_size if state_file.exists() else 0,
+                "ui_requests": len(self.ui_latencies),
+            }
+        )
+        s = self.samples[-1]
+        print(
+            f"[{s['elapsed_s']:7.1f}s] processed={processed:<6} "
+            f"rate={(rate or 0.0):6.2f}/s rss={s['rss_mb']:7.1f}MB "
+            f"state={s['state_bytes'] / 1024:8.1f}KB ui={s['ui_requests']}"
+        )
+
+    async def run(self) -> dict:
+        args = self.args
+        workdir = Path(args.workdir or tempfile.mkdtemp(prefix="loadtest-"))
+        workdir.mkdir(parents=True, exist_ok=True)
+        subreddits = [f"loadtest{i}" for i in range(args.subreddits)]
+        keywords = ["fed", "cpi", "earnings", "jobs", "tariff", "oil"]
+
+        reddit = FakeReddit(
+            subreddits,
+            post_rate=args.post_rate,
+            keywords=keywords,
+            faults=Faults(
+                latency=args.reddit_latency,
+                jitter=args.reddit_latency / 2,
+                error_rate=args.reddit_error_rate,
+                rate_limited=args.reddit_429_rate,
+            ),
+        )
+        canned = Path(args.llm_canned).read_text() if args.llm_canned else None
+        llm = FakeLLM(
+            canned=canned,
+            faults=Faults(
+                latency=args.llm_latency,
+                jitter=args.llm_latency / 2,
+                error_rate=args.llm_error_rate,
+                rate_limited=args.llm_429_rate,
+            ),
+        )
+        await reddit.start()
+        await llm.start()
+
+        write_config(workdir, args, subreddits, keywords)
+        write_praw_ini(workdir, reddit)
+        os.environ.update(
+            ANTHROPIC_API_KEY="fake-key",
+            ANTHROPIC_BASE_URL=llm.url,
+            REDDIT_CLIENT_ID="fake-id",
+            REDDIT_CLIENT_SECRET="fake-secret",
+            REDDIT_USER_AGENT="loadtest/1.0",
+            ENGINE_MODE="embedded",
+        )
+        os.chdir(workdir)
+        sys.path.insert(0, str(REPO_ROOT))
+        print(f"Load test in {workdir}: reddit={reddit.url} llm={llm.url}")
+
+        url = f"http://127.0.0.1:{args.port}"
+        self.start_server(args.port)
+        await self.wait_ready(url)
+        rss_start = rss_bytes()
+
+        stop = asyncio.Event()
+        clients = [
+            asyncio.create_task(self.ui_client(url, stop))
+            for _ in range(args.ui_clients)
+        ]
+        started = time.monotonic()
+        next_sample = started
+        while time.monotonic() - started < args.duration:
+            self.poll_processed(reddit)
+            if time.monotonic() >= next_sample:
+                await self.sample(started, workdir / "state.json")
+                next_sample += args.sample_interval
+            await asyncio.sleep(args.poll_interval)
+        self.poll_processed(reddit)
+        await self.sample(started, workdir / "state.json")
+
+        stop.set()
+        await asyncio.gather(*clients, return_exceptions=True)
+        self.server.should_exit = True
+        await reddit.stop()
+        await llm.stop()
+
+        elapsed = time.monotonic() - started
+        report = {
+            "config": vars(args),
+            "workdir": str(workdir),
+            "duration_s": elapsed,
+            "posts_published": len(reddit.published),
+            "items_processed": len(self.seen),
+            "items_per_sec": len(self.seen) / elapsed,
+            "post_to_insight_s": percentiles(self.latencies),
+            "ui": {
+                "requests": len(self.ui_latencies),
+                "errors": self.ui_errors,
+                "latency_s": percentiles(self.ui_latencies),
+                "mean_s": statistics.fmean(self.ui_latencies)
+                if self.ui_latencies
+                else None,
+            },
+            "rss_growth_mb": (rss_bytes() - rss_start) / 2**20,
+            "state_bytes": self.samples[-1]["state_bytes"],
+            "reddit": asdict(reddit.stats),
+            "llm": {
+                **asdict(llm.stats),
+                "input_tokens": llm.input_tokens,
+                "output_tokens": llm.output_tokens,
+            },
+            "samples": self.samples,
+        }
+        return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.load")
+    add = parser.add_argument
+    add("--duration", type=float, default=60.0, help="Seconds to run")
+    add("--post-rate", type=float, default=2.0, help="New posts per second")
+    add("--subreddits", type=int, default=3)
+    add("--posts-per-fetch", type=int, default=25)
+    add("--fetch-interval", type=int, default=5)
+    add("--analyze-concurrency", type=int, default=2)
+    add("--ui-clients", type=int, default=5)
+    add("--ui-interval", type=float, default=1.0)
+    add("--reddit-latency", type=float, default=0.2)
+    add("--reddit-error-rate", type=float, default=0.0)
+    add("--reddit-429-rate", type=float, default=0.0)
+    add("--llm-latency", type=float, default=1.0)
+    add("--llm-error-rate", type=float, default=0.0)
+    add("--llm-429-rate", type=float, default=0.0)
+    add("--llm-canned", help="File with a fixed LLM answer")
+    add("--port", type=int, default=8765, help="Port of the web server")
+    add("--sample-interval", type=float, default=5.0)
+    add("--poll-interval", type=float, default=0.1)
+    add("--log-level", default="WARNING")
+    add("--workdir", help="Scratch directory (default: a new temp dir)")
+    add("--output", help="Write the JSON report here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    output: Optional[Path] = Path(args.output).resolve() if args.output else None
+    report = asyncio.run(Harness(args).run())
+    latency = report["post_to_insight_s"]
+    ui = report["ui"]["latency_s"]
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.2f}s"
+
+    print(
+        f"\n{report['items_processed']} of {report['posts_published']} posts "
+        f"processed in {report['duration_s']:.0f}s "
+        f"({report['items_per_sec']:.2f} items/s)\n"
+        f"post-to-insight p50={fmt(latency['p50'])} p90={fmt(latency['p90'])} "
+        f"p99={fmt(latency['p99'])}\n"
+        f"UI /api/state p50={fmt(ui['p50'])} p99={fmt(ui['p99'])} "
+        f"({report['ui']['requests']} requests, {report['ui']['errors']} errors)\n"
+        f"RSS growth {report['rss_growth_mb']:.1f}MB, "
+        f"state file {report['state_bytes'] / 1024:.1f}KB\n"
+        f"reddit {report['reddit']['by_status']}, llm {report['llm']['by_status']}"
+    )
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Report written to {output}")
+    return 0
@@ -0,0 +1,72 @@
+import asyncio
+
+import praw
+from anthropic import Anthropic
+
+from tests.load.fake_servers import Faults, FakeLLM, FakeReddit
+
+
+def test_praw_reads_posts_from_fake_reddit():
+    async def run():
+        reddit = FakeReddit(["stocks"], post_rate=0)
+        await reddit.start()
+        try:
+            for _ in range(3):
+                reddit.publish("stocks")
+
+            def fetch():
+                client = praw.Reddit(
+                    client_id="id",
+                    client_secret="secret",
+                    user_agent="test",
+                    oauth_url=reddit.url,
+                    reddit_url=reddit.url,
+                    check_for_updates=False,
+                )
+                return list(client.subreddit("stocks").new(limit=2))
+
+            posts = await asyncio.to_thread(fetch)
+        finally:
+            await reddit.stop()
+        return reddit, posts
+
+    reddit, posts = asyncio.run(run())
+    assert [p.id for p in posts] == ["p0000003", "p0000002"]
+    assert set(reddit.published) == {"p0000001", "p0000002", "p0000003"}
+    assert posts[0].created_utc == reddit.published["p0000003"]
+
+
+def test_anthropic_client_talks_to_fake_llm_and_retries_429():
+    async def run():
+        llm = FakeLLM(faults=Faults(rate_limited=1.0, retry_after=0.01), seed=1)
+        await llm.start()
+        try:
+
+            def call():
+                client = Anthropic(api_key="fake", base_url=llm.url, max_retries=0)
+                try:
+                    client.messages.create(
+                        model="m",
+                        max_tokens=10,
+                        messages=[{"role": "user", "content": "x"}],
+                    )
+                except Exception as e:
+                    rejected = type(e).__name__
+                llm.faults.rate_limited = 0.0
+                response = client.messages.create(
+                    model="m",
+                    max_tokens=10,
+                    messages=[{"role": "user", "content": "Event: A (ID: e1)"}],
+                )
+                return rejected, response
+
+            return llm, await asyncio.to_thread(call)
+        finally:
+            await llm.stop()
+
+    llm, (rejected, response) = asyncio.run(run())
+    assert rejected == "RateLimitError"
+    assert llm.stats.by_status == {429: 1, 200: 1}
+    assert response.usage.input_tokens > 0
+    text = response.content[0].text
+    assert text.startswith("EVENT_ID: e1") or text.startswith("NOT RELEVANT")
@@ -0,0 +1,288 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.app_repository import AppRepository, EventRepository
+from src.insight_archive import InsightArchive
+from src.models import Insight, NewsItem, TrackedEvent
+
+
+def make_news(i):
+    return NewsItem(
+        id=f"n{i}",
+        source="stocks",
+        title=f"Headline {i}",
+        snippet="Body",
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i),
+    )
+
+
+def make_event(event_id="e1"):
+    return TrackedEvent(
+        id=event_id,
+        name="Event",
+        event_time=datetime.now(timezone.utc) + timedelta(days=1),
+        keywords=["fed"],
+    )
+
+
+def test_snapshot_is_isolated_from_later_writes():
+    repo = AppRepository()
+    with repo.writer():
+        repo.events.add(make_event())
+        repo.news.add(make_news(0))
+    before = repo.snapshot()
+
+    with repo.writer():
+        repo.news.add(make_news(1))
+        repo.events.get("e1").insights.append(
+            Insight(text="t", score=0.5, trend="stable")
+        )
+
+    assert len(before.news_items) == 1
+    assert before.events[0]["insights"] == []
+    after = repo.snapshot()
+    assert after.version > before.version
+    assert len(after.news_items) == 2
+    assert len(after.events[0]["insights"]) == 1
+
+
+def test_publish_reuses_what_a_write_did_not_change():
+    repo = AppRepository()
+    with repo.writer():
+        repo.events.add(make_event("e1"))
+        repo.events.add(make_event("e2"))
+        repo.news.add(make_news(0))
+        repo.processed_news_ids.add("n0")
+    before = repo.snapshot()
+
+    with repo.writer():
+        repo.processed_news_ids.add("n1")
+    after = repo.snapshot()
+    assert after.news_items is before.news_items
+    assert all(a is b for a, b in zip(after.events, before.events))
+    assert list(before.processed_news_ids) == ["n0"]
+    assert list(after.processed_news_ids) == ["n0", "n1"]
+
+    # Only the event changed in place (handed out inside the writer) is
+    # serialized again
+    with repo.writer():
+        repo.events.get("e2").is_locked = True
+    latest = repo.snapshot()
+    assert latest.events[0] is after.events[0]
+    assert latest.events[1]["is_locked"] and not after.events[1]["is_locked"]
+
+
+def test_failed_write_is_not_published():
+    repo = AppRepository()
+    published = repo.snapshot()
+    try:
+        with repo.writer():
+            repo.news.add(make_news(0))
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert repo.snapshot() is published
+
+
+def test_nested_writers_publish_once():
+    repo = AppRepository()
+    version = repo.snapshot().version
+    with repo.writer():
+        with repo.writer():
+            repo.news.add(make_news(0))
+        assert repo.snapshot().version == version
+    assert repo.snapshot().version == version + 1
+
+
+def test_concurrent_readers_never_see_torn_state():
+    """One writer mutating news and insights in lockstep while many readers
+    serialize snapshots. Every snapshot must be internally consistent."""
+    repo = AppRepository()
+    with repo.writer():
+        repo.events.add(make_event())
+
+    n_writes = 100
+    n_readers = 8
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        try:
+            for i in range(n_writes):
+                with repo.writer():
+                    repo.news.add(make_news(i))
+                    repo.events.get("e1").insights.append(
+                        Insight(text=str(i), score=0.1, trend="stable")
+                    )
+                    repo.processed_news_ids.add(f"n{i}")
+        finally:
+            stop.set()
+
+    def reader():
+        last_version = -1
+        try:
+            while not stop.is_set():
+                snap = repo.snapshot()
+                assert snap.version >= last_version
+                if snap.version == last_version:
+                    continue
+                last_version = snap.version
+                state = snap.to_dict(news_limit=None)
+                json.dumps(state)
+                if not state["events"]:
+                    continue
+                insights = state["events"][0]["insights"]
+                # News and insights are written in the same writer block
+                assert len(state["processed_news_ids"]) == len(insights)
+                assert len(state["news_items"]) == min(
+                    len(insights), repo.news.max_news
+                )
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(n_readers)]
+    for t in readers:
+        t.start()
+    w = threading.Thread(target=writer)
+    w.start()
+    w.join()
+    for t in readers:
+        t.join()
+
+    assert errors == []
+    final = repo.snapshot()
+    assert len(final.events[0]["insights"]) == n_writes
+
+
+def test_news_pagination_by_source_and_cursor():
+    repo = AppRepository()
+    with repo.writer():
+        for i in range(30):
+            news = make_news(i)
+            news.source = "stocks" if i % 2 else "options"
+            news.added_at = news.timestamp
+            repo.add_news(news)
+    view = repo.snapshot().index("news:source:stocks")
+
+    first = view.page(limit=10)
+    assert [n["id"] for n in first.items] == [f"n{i}" for i in range(29, 9, -2)]
+    second = view.page(limit=10, cursor=first.next_cursor)
+    assert [n["id"] for n in second.items] == [f"n{i}" for i in range(9, 0, -2)]
+    assert second.next_cursor is None
+
+
+def test_insight_index_filters_and_time_range():
+    repo = AppRepository()
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with repo.writer():
+        repo.events.add(make_event())
+        for i in range(10):
+            repo.add_insight(
+                "e1",
+                Insight(
+                    text=str(i),
+                    score=i / 10,
+                    trend="stable",
+                    timestamp=base + timedelta(minutes=i),
+                    relevance_score=0.9 if i % 3 == 0 else 0.5,
+                ),
+            )
+    assert not repo.add_insight("missing", Insight(text="x", score=0, trend="n/a"))
+    view = repo.snapshot().index("insights:event:e1")
+
+    ranged = view.page(
+        since=(base + timedelta(minutes=2)).timestamp(),
+        until=(base + timedelta(minutes=5)).timestamp(),
+    )
+    assert [i["text"] for i in ranged.items] == ["5", "4", "3", "2"]
+    relevant = view.page(predicate=lambda i: i["relevance_score"] >= 0.8)
+    assert [i["text"] for i in relevant.items] == ["9", "6", "3", "0"]
+
+
+def test_llm_log_survives_save_and_load(tmp_path):
+    repo = AppRepository()
+    with repo.writer():
+        for i in range(3):
+            repo.add_llm_log(
+                {
+                    "text": f"t{i}",
+                    "score": 0.0,
+                    "trend": "n/a",
+                    "timestamp": f"2024-01-01T00:00:0{i}+00:00",
+                    "event_id": "e1",
+                }
+            )
+    path = str(tmp_path / "state.json")
+    repo.save(path)
+
+    loaded = AppRepository()
+    loaded.load(path)
+
+    items = loaded.snapshot().index("llm_log:event:e1").page().items
+    assert [e["text"] for e in items] == ["t2", "t1", "t0"]
+
+
+def test_event_repository_time_and_ticker_indexes():
+    repo = EventRepository()
+    now = datetime.now(timezone.utc)
+    for i, stock in enumerate(["SPY", "$spy", "QQQ"]):
+        event = make_event(f"e{i}")
+        event.event_time = now + timedelta(hours=i)
+        event.stock = stock
+        repo.add(event)
+
+    assert [e.id for e in repo.due_before(now + timedelta(minutes=90))] == [
+        "e0",
+        "e1",
+    ]
+    assert sorted(e.id for e in repo.by_stock("spy")) == ["e0", "e1"]
+
+    # In-place mutation followed by update() moves the index entries
+    moved = repo.get("e0")
+    moved.event_time = now + timedelta(hours=5)
+    moved.stock = "QQQ"
+    repo.update("e0", moved)
+    assert [e.id for e in repo.due_before(now + timedelta(hours=3))] == ["e1", "e2"]
+    assert sorted(e.id for e in repo.by_stock("QQQ")) == ["e0", "e2"]
+
+    repo.remove("e2")
+    assert "e2" not in repo
+    assert [e.id for e in repo.by_stock("QQQ")] == ["e0"]
+    assert len(repo) == 2
+
+
+def test_event_repository_validates_on_insert():
+    repo = EventRepository()
+    repo.add(make_event().model_dump())
+    assert isinstance(repo.get("e1"), TrackedEvent)
+    with pytest.raises(TypeError):
+        repo.add(object())
+
+
+def test_insights_are_bounded_and_aggregated(tmp_path):
+    archive = InsightArchive(str(tmp_path / "archive"))
+    repo = AppRepository(max_inline_insights=5, ewma_alpha=0.5, archive=archive)
+    trends = ["improving", "worsening", "stable", "sideways"]
+    with repo.writer():
+        repo.events.add(make_event())
+        for i in range(12):
+            score = 1.0 if i % 2 else -1.0
+            repo.add_insight(
+                "e1", Insight(text=str(i), score=score, trend=trends[i % 4])
+            )
+    event = repo.events.get("e1")
+
+    assert [i.text for i in event.insights] == [str(i) for i in range(7, 12)]
+    assert [i.text for i in archive.read("e1")] == [str(i) for i in range(7)]
+    assert event.stats.count == 12
+    assert event.stats.score_sum == 0.0
+    assert event.stats.trend_counts == {
+        "improving": 3,
+        "worsening": 3,
+        "stable": 3,
+        "other": 3,
+    }
+    assert 0 < event.stats.ewma_score < 1.0
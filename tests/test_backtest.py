@@ -0,0 +1,146 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from src.app_repository import AppRepository
+from src.backtest import load_replay_data, run_sweep
+from src.insight_archive import InsightArchive
+from src.models import Insight, TrackedEvent
+
+EVENT_TIME = datetime(2024, 3, 1, 18, tzinfo=timezone.utc)
+
+
+def write_fixture(tmp_path):
+    archive = InsightArchive(str(tmp_path / "archive"))
+    # "up" turns bullish late; "down" is bearish throughout
+    archive.append(
+        "up",
+        [
+            Insight(
+                text="early",
+                score=-0.8,
+                trend="worsening",
+                timestamp=EVENT_TIME - timedelta(hours=30),
+            ),
+            Insight(
+                text="late",
+                score=0.9,
+                trend="improving",
+                timestamp=EVENT_TIME - timedelta(hours=2),
+            ),
+        ],
+    )
+    archive.append(
+        "down",
+        [
+            Insight(
+                text=str(h),
+                score=-0.7,
+                trend="worsening",
+                timestamp=EVENT_TIME - timedelta(hours=h),
+                relevance_score=0.9,
+            )
+            for h in (3, 5, 8)
+        ],
+    )
+    outcomes = tmp_path / "outcomes.json"
+    outcomes.write_text(
+        json.dumps(
+            [
+                {"event_id": e, "event_time": EVENT_TIME.isoformat(), "outcome": o}
+                for e, o in (("up", "Call"), ("down", "Put"), ("none", "Call"))
+            ]
+        )
+    )
+    return load_replay_data(str(outcomes), str(tmp_path / "archive"))
+
+
+def by_config(results, **params):
+    return next(r for r in results if all(r[k] == v for k, v in params.items()))
+
+
+def test_sweep_scores_each_configuration(tmp_path):
+    data = write_fixture(tmp_path)
+    grid = {
+        "threshold": [0.3],
+        "min_confidence": [0.0, 0.99],
+        "half_life_hours": [1.0],
+        "window": [0, 1],
+        "lock_hours_before": [1.0, 6.0],
+    }
+
+    results = run_sweep(data, grid, workers=1)
+
+    assert len(results) == 8
+    # Locked 1h before, the late bullish insight dominates "up"
+    best = by_config(results, window=0, lock_hours_before=1.0, min_confidence=0.0)
+    assert best["pnl"] == 200.0
+    assert best["trades"] == 2
+    assert best["hit_rate"] == 1.0
+    # Locked 6h before, "up" only has its early bearish insight -> wrong call
+    early = by_config(results, window=1, lock_hours_before=6.0, min_confidence=0.0)
+    assert early["pnl"] == 50.0
+    # A confidence cut-off nobody reaches means no trades at all
+    idle = by_config(results, window=0, lock_hours_before=1.0, min_confidence=0.99)
+    assert idle["trades"] == 0
+    assert idle["hit_rate"] is None
+
+
+def test_sweep_uses_the_evidence_weight(tmp_path):
+    data = write_fixture(tmp_path)
+    grid = {
+        "threshold": [0.3],
+        "min_confidence": [0.1],
+        "half_life_hours": [1.0],
+        "window": [0],
+        "lock_hours_before": [1.0],
+        "evidence_weight": [1.0, 100.0],
+    }
+
+    results = run_sweep(data, grid, workers=1)
+
+    assert by_config(results, evidence_weight=1.0)["trades"] == 2
+    # Far more evidence needed: no event reaches the confidence cut-off
+    assert by_config(results, evidence_weight=100.0)["trades"] == 0
+
+
+def test_parallel_sweep_matches_serial(tmp_path):
+    data = write_fixture(tmp_path)
+
+    serial = run_sweep(data, {}, workers=1)
+    parallel = run_sweep(data, {}, workers=2)
+
+    def key(r):
+        return json.dumps({k: v for k, v in r.items() if k != "elapsed_ms"})
+
+    assert sorted(map(key, serial)) == sorted(map(key, parallel))
+
+
+def test_replay_includes_the_inline_insights_of_expired_events(tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    repo = AppRepository(max_inline_insights=3, archive=InsightArchive(archive_dir))
+    with repo.writer():
+        repo.events.add(
+            TrackedEvent(id="e1", name="Fed", event_time=EVENT_TIME, keywords=["fed"])
+        )
+        for h in range(10, 0, -1):
+            repo.add_insight(
+                "e1",
+                Insight(
+                    text=str(h),
+                    score=h / 10,
+                    trend="stable",
+                    timestamp=EVENT_TIME - timedelta(hours=h),
+                ),
+            )
+        assert repo.remove_event("e1")
+    outcomes = tmp_path / "outcomes.json"
+    outcomes.write_text(
+        json.dumps(
+            [{"event_id": "e1", "event_time": EVENT_TIME.isoformat(), "outcome": "Put"}]
+        )
+    )
+
+    data = load_replay_data(str(outcomes), archive_dir)
+    # The newest three were still inline when the event expired
+    assert len(data.ts) == 10
+    assert data.score[-3:].tolist() == [0.3, 0.2, 0.1]
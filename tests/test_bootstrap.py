@@ -0,0 +1,80 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+import yaml
+from loguru import logger
+
+from src import logger as app_logger
+from src.app_repository import NewsRepository
+from src.bootstrap import Application, profiler
+from src.models import NewsItem
+
+CONFIG = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+
+def test_importing_entry_points_has_no_side_effects():
+    code = (
+        "import sys, src.main, src.analyzer_worker\n"
+        "heavy = {'anthropic', 'praw', 'openai', 'dotenv'} & set(sys.modules)\n"
+        "assert not heavy, heavy\n"
+        "assert 'config' not in vars(src.main.app)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """The repo's config with logs (and relative data paths) under tmp_path."""
+    config = yaml.safe_load(CONFIG.read_text())
+    config["logging"].update(
+        file=str(tmp_path / "logs" / "app.log"),
+        json_file=str(tmp_path / "logs" / "app.jsonl"),
+        console=False,
+    )
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_logger, "_configured", False)
+    yield str(path)
+    logger.remove()
+    logger.add(sys.stderr)  # loguru's default sink, for the other tests
+
+
+def test_components_are_built_once_and_profiled(tmp_path, config_path):
+    app = Application(config_path, state_file=str(tmp_path / "state.json"))
+    assert "predictor" not in vars(app)
+
+    predictor = app.predictor
+    assert app.predictor is predictor
+    built = [name for name, kind, _ in profiler.records if kind == "init"]
+    # The predictor pulled in its dependencies on demand
+    assert {"config", "app_repo", "predictor"} <= set(built)
+    assert "predictor" in profiler.report()
+
+
+def test_bulk_news_load_matches_incremental_adds():
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    items = [
+        NewsItem(
+            id=f"n{i}",
+            source="stocks",
+            title="t",
+            snippet="s",
+            timestamp=base + timedelta(minutes=(i * 37) % 101),
+        )
+        for i in range(120)
+    ]
+    incremental, bulk = NewsRepository(max_news=50), NewsRepository(max_news=50)
+    for item in items:
+        incremental.add(item)
+    bulk.extend(items + items[:10])
+
+    assert [n.id for n in bulk.get_all()] == [n.id for n in incremental.get_all()]
+    assert len(bulk.get_all()) == 50
+    assert bulk.news_ids == {n.id for n in bulk.get_all()}
@@ -0,0 +1,98 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.circuit_breaker import (
+    Backoff,
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpen,
+    upstream_failure,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_backoff_grows_exponentially_with_bounded_jitter():
+    backoff = Backoff(base=1.0, cap=8.0, rng=random.Random(0))
+    for attempt, ceiling in [(1, 1), (2, 2), (3, 4), (4, 8), (10, 8)]:
+        delays = [backoff.delay(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= d <= ceiling for d in delays)
+        assert len(set(delays)) > 1
+
+
+def test_upstream_failures_are_transport_errors_429_and_5xx():
+    assert upstream_failure(ConnectionError("reset"))
+    assert upstream_failure(HTTPError(429)) and upstream_failure(HTTPError(529))
+    assert not upstream_failure(HTTPError(400))
+    # prawcore style: the status is on the attached response
+    prawcore_404 = Exception("not found")
+    prawcore_404.response = SimpleNamespace(status_code=404)
+    assert not upstream_failure(prawcore_404)
+
+
+def test_breaker_opens_probes_once_and_backs_off_longer():
+    clock = FakeClock()
+    backoff = Backoff(base=10.0, cap=100.0, rng=random.Random(1))
+    breaker = CircuitBreaker("up", failure_threshold=2, backoff=backoff, clock=clock)
+
+    def fail():
+        with pytest.raises(HTTPError):
+            with breaker.guard():
+                raise HTTPError(503)
+
+    fail()
+    assert breaker.state == "closed"
+    fail()
+    assert breaker.state == "open"
+    first_open = breaker.retry_in()
+    assert 5.0 <= first_open <= 10.0
+    with pytest.raises(CircuitOpen) as rejected:
+        with breaker.guard():
+            pass
+    assert rejected.value.retry_in == pytest.approx(first_open)
+
+    clock.now += first_open
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()  # a single probe
+    breaker.record_failure(HTTPError(503))
+    assert breaker.state == "open"
+    assert 10.0 <= breaker.retry_in() <= 20.0
+
+    clock.now += 20.0
+    with breaker.guard():
+        pass
+    assert breaker.status()["state"] == "closed"
+    assert breaker.status()["trips"] == 0
+
+
+def test_client_errors_do_not_trip_and_registry_reports_all():
+    registry = BreakerRegistry()
+    registry.configure(
+        SimpleNamespace(failure_threshold=1, base_delay=1.0, max_delay=2.0)
+    )
+    breaker = registry.get("anthropic")
+    assert registry.get("anthropic") is breaker
+    with pytest.raises(HTTPError):
+        with breaker.guard():
+            raise HTTPError(400)
+    assert breaker.state == "closed"
+
+    registry.get("reddit/stocks").record_failure(ConnectionError("down"))
+    status = registry.status()
+    assert status["anthropic"]["state"] == "closed"
+    assert status["reddit/stocks"]["state"] == "open"
+    assert "ConnectionError" in status["reddit/stocks"]["last_error"]
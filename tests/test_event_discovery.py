@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.app_repository import AppRepository
+from src.event_discovery import EventCache, EventDiscovery, dedupe, name_tokens
+from src.models import TrackedEvent
+
+SOON = datetime.now(timezone.utc).replace(hour=14, minute=0) + timedelta(days=3)
+
+
+def event(id, name, when=SOON):
+    return TrackedEvent(id=id, name=name, event_time=when, keywords=[name.lower()])
+
+
+class FakeFinder:
+    def __init__(self, events):
+        self.events = events
+        self.calls = 0
+
+    def __call__(self, n):
+        self.calls += 1
+        return list(self.events)
+
+
+def test_dedupe_matches_by_normalized_name_and_date():
+    assert name_tokens("FOMC Meeting – Décision 2025") == {"fomc", "decision"}
+
+    candidates = [
+        event("cpi", "US CPI Report"),
+        event("cpi-may", "CPI report (US)"),  # same event, different ID
+        event("cpi-next", "US CPI Report", SOON + timedelta(days=30)),
+        event("nvda", "NVIDIA Earnings"),
+    ]
+    kept = dedupe(candidates, existing=[event("nvidia", "Nvidia earnings call")])
+
+    assert [e.id for e in kept] == ["cpi", "cpi-next"]
+
+
+def test_cache_persists_and_expires(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = EventCache(path, ttl_seconds=60)
+    assert not cache.is_fresh()
+
+    past = event("old", "Old Event", datetime.now(timezone.utc) - timedelta(days=1))
+    cache.store([event("a", "Alpha"), event("a2", "alpha"), past])
+
+    reloaded = EventCache(path, ttl_seconds=60)
+    assert reloaded.is_fresh()
+    assert [e.id for e in reloaded.events()] == ["a"]
+    assert not reloaded.is_fresh(now=reloaded.fetched_at + 61)
+
+
+def test_refresh_uses_cache_before_finder(tmp_path):
+    path = str(tmp_path / "cache.json")
+    EventCache(path, 3600).store([event("a", "Alpha"), event("b", "Beta")])
+
+    repo = AppRepository()
+    finder = FakeFinder([event("c", "Gamma")])
+    added = []
+    discovery = EventDiscovery(
+        repo, finder, EventCache(path, 3600), added.append, target=2
+    )
+
+    discovery.refresh()
+
+    assert finder.calls == 0
+    assert sorted(e.id for e in added) == ["a", "b"]
+    assert len(repo.events) == 2
+
+
+def test_refresh_calls_finder_when_cache_is_stale(tmp_path):
+    repo = AppRepository()
+    with repo.writer():
+        repo.events.add(event("cpi", "US CPI Report"))
+    finder = FakeFinder([event("cpi-llm", "CPI Report"), event("fomc", "FOMC")])
+    added = []
+    discovery = EventDiscovery(
+        repo, finder, EventCache(str(tmp_path / "c.json"), 3600), added.append
+    )
+
+    discovery.refresh()
+    discovery.refresh()  # cache is fresh now: no second LLM call
+
+    assert finder.calls == 1
+    assert [e.id for e in added] == ["fomc"]
+
+
+def test_background_start_does_not_block_on_slow_finder(tmp_path):
+    release = threading.Event()
+
+    def slow(n):
+        release.wait(5)
+        return [event("x", "Xylophone Summit")]
+
+    repo = AppRepository()
+    discovery = EventDiscovery(
+        repo, slow, EventCache(str(tmp_path / "c.json"), 3600), lambda e: None
+    )
+    start = time.perf_counter()
+    discovery.start()
+    assert time.perf_counter() - start < 0.5
+    assert len(repo.events) == 0
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(repo.events) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    discovery.stop()
+    assert repo.events.get("x") is not None
@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.config import SentimentConfig
+from src.event_predictor import Predictor
+from src.models import Insight, TrackedEvent
+
+NOW = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def make_event(event_id):
+    return TrackedEvent(
+        id=event_id,
+        name=event_id,
+        event_time=NOW + timedelta(days=1),
+        keywords=["fed"],
+    )
+
+
+def insight(score, hours_ago=0.0, relevance=1.0):
+    return Insight(
+        text=f"score {score}",
+        score=score,
+        trend="stable",
+        timestamp=NOW - timedelta(hours=hours_ago),
+        relevance_score=relevance,
+    )
+
+
+def make_predictor(**overrides):
+    return Predictor(SentimentConfig(half_life_hours=1.0, **overrides))
+
+
+def test_recent_insights_outweigh_old_ones():
+    predictor = make_predictor(min_confidence=0.0)
+    event = make_event("e1")
+    for _ in range(3):
+        predictor.observe("e1", insight(-0.9, hours_ago=10))
+    predictor.observe("e1", insight(0.8, hours_ago=0))
+
+    predictor.predict_all([event], now=NOW.timestamp())
+
+    assert event.current_sentiment_score > 0.7
+    assert event.predicted_action == "Call"
+
+
+def test_low_confidence_holds():
+    predictor = make_predictor(min_confidence=0.6)
+    mixed, weak = make_event("mixed"), make_event("weak")
+    predictor.observe("mixed", insight(0.9))
+    predictor.observe("mixed", insight(0.9))
+    predictor.observe("mixed", insight(-0.6))
+    predictor.observe("weak", insight(0.9, relevance=0.2))
+
+    predictor.predict_all([mixed, weak], now=NOW.timestamp())
+
+    assert mixed.current_sentiment_score > 0.3
+    assert mixed.predicted_action == "Hold"
+    assert weak.prediction_confidence < 0.6
+    assert weak.predicted_action == "Hold"
+
+
+def test_batched_matches_single_event_evaluation():
+    rng = np.random.default_rng(0)
+    batched = make_predictor()
+    for e in range(20):
+        single = make_predictor()
+        for score, age, rel in rng.random((30, 3)):
+            item = insight(score * 2 - 1, hours_ago=age * 5, relevance=rel)
+            batched.observe(f"e{e}", item)
+            single.observe(f"e{e}", item)
+        expected = single.evaluate(NOW.timestamp())[f"e{e}"]
+        assert np.allclose(batched.evaluate(NOW.timestamp())[f"e{e}"], expected)
+
+
+def test_forget_and_compaction_keep_other_events_intact():
+    predictor = make_predictor()
+    for i in range(15):
+        predictor.observe("gone", insight(-1.0))
+    for i in range(5):
+        predictor.observe("kept", insight(0.5))
+    before = predictor.evaluate(NOW.timestamp())["kept"]
+
+    predictor.forget("gone")
+    predictor.observe("new", insight(-0.5))
+    after = predictor.evaluate(NOW.timestamp())
+
+    assert len(predictor) == 6
+    assert set(after) == {"kept", "new"}
+    assert np.allclose(after["kept"], before)
+    assert after["new"][0] == -0.5
+
+
+def test_locked_events_are_not_updated():
+    predictor = make_predictor(min_confidence=0.0)
+    event = make_event("e1")
+    event.is_locked = True
+    event.predicted_action = "Put"
+    predictor.observe("e1", insight(0.9))
+
+    predictor.predict_all([event], now=NOW.timestamp())
+
+    assert event.predicted_action == "Put"
+
+
+def test_prediction_is_fast_with_thousands_of_insights():
+    predictor = make_predictor()
+    events = [make_event(f"e{i}") for i in range(10)]
+    for i in range(5000):
+        predictor.observe(f"e{i % 10}", insight(0.5, hours_ago=(i % 50) / 10))
+    predictor.predict_all(events, now=NOW.timestamp())  # warm up
+
+    start = time.perf_counter()
+    for _ in range(20):
+        predictor.evaluate(NOW.timestamp())
+    elapsed = (time.perf_counter() - start) / 20
+
+    # Sub-millisecond on a dev machine; generous bound to avoid CI flakes
+    assert elapsed < 0.01
@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.lifecycle_scheduler import EXPIRE, LOCK, SETTLE, LifecycleScheduler
+from src.models import TrackedEvent
+
+BASE = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def make_event(event_id, event_time):
+    return TrackedEvent(
+        id=event_id, name=event_id, event_time=event_time, keywords=["fed"]
+    )
+
+
+def recording_scheduler(fired, **kwargs):
+    handlers = {
+        action: (lambda a: lambda event_id: fired.append((a, event_id)))(action)
+        for action in (LOCK, SETTLE, EXPIRE)
+    }
+    return LifecycleScheduler(
+        handlers,
+        lock_lead=timedelta(hours=1),
+        expire_after=timedelta(hours=2),
+        **kwargs,
+    )
+
+
+def test_actions_fire_in_deadline_order():
+    fired = []
+    scheduler = recording_scheduler(fired)
+    scheduler.schedule_event(make_event("late", BASE + timedelta(hours=3)))
+    scheduler.schedule_event(make_event("early", BASE))
+
+    scheduler.run_due(now=(BASE - timedelta(minutes=61)).timestamp())
+    assert fired == []
+    scheduler.run_due(now=(BASE - timedelta(hours=1)).timestamp())
+    assert fired == [(LOCK, "early")]
+    scheduler.run_due(now=(BASE + timedelta(hours=10)).timestamp())
+    assert fired == [
+        (LOCK, "early"),
+        (SETTLE, "early"),
+        (LOCK, "late"),
+        (EXPIRE, "early"),
+        (SETTLE, "late"),
+        (EXPIRE, "late"),
+    ]
+    assert scheduler.next_deadline() is None
+
+
+def test_overdue_actions_fire_in_lifecycle_order_and_skip_done_steps():
+    fired = []
+    scheduler = recording_scheduler(fired)
+    event = make_event("e1", BASE)
+    event.is_locked = True
+    scheduler.schedule_event(event)
+
+    scheduler.run_due(now=(BASE + timedelta(days=1)).timestamp())
+
+    assert fired == [(SETTLE, "e1"), (EXPIRE, "e1")]
+
+
+def test_reschedule_and_cancel_drop_stale_deadlines():
+    fired = []
+    scheduler = recording_scheduler(fired)
+    event = make_event("e1", BASE)
+    scheduler.schedule_event(event)
+    event.event_time = BASE + timedelta(days=1)
+    scheduler.schedule_event(event)
+    scheduler.schedule_event(make_event("e2", BASE))
+    scheduler.cancel("e2")
+
+    scheduler.run_due(now=(BASE + timedelta(hours=5)).timestamp())
+
+    assert fired == []
+    lock_at = event.event_time - timedelta(hours=1)
+    assert scheduler.next_deadline() == lock_at.timestamp()
+
+
+def test_thread_fires_when_due_without_polling():
+    fired = []
+    done = threading.Event()
+    scheduler = LifecycleScheduler(
+        {LOCK: lambda event_id: (fired.append(time.time()), done.set())},
+        lock_lead=timedelta(0),
+    )
+    scheduler.start()
+    try:
+        due = time.time() + 0.3
+        scheduler.schedule_event(
+            make_event("e1", datetime.fromtimestamp(due, tz=timezone.utc))
+        )
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+
+    assert abs(fired[0] - due) < 0.25
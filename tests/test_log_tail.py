@@ -0,0 +1,85 @@
+import os
+
+from src.log_tail import LogTail
+
+
+def write(path, text, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_tail_reads_last_lines_across_blocks(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "".join(f"line {i}\n" for i in range(1000)), mode="w")
+    tail = LogTail(str(path), block_size=64)
+
+    chunk = tail.tail(5)
+
+    assert chunk.lines == [f"line {i}\n" for i in range(995, 1000)]
+    assert chunk.cursor.endswith(f":{os.path.getsize(path)}")
+
+
+def test_tail_skips_partial_last_line(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\nhalf", mode="w")
+
+    chunk = LogTail(str(path)).tail(10)
+
+    assert chunk.lines == ["a\n", "b\n"]
+    assert chunk.cursor.endswith(":4")
+
+
+def test_cursor_returns_only_new_lines(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\n", mode="w")
+    tail = LogTail(str(path))
+    cursor = tail.tail(10).cursor
+
+    assert tail.read_since(cursor).lines == []
+    write(path, "c\nd")
+    chunk = tail.read_since(cursor)
+    assert chunk.lines == ["c\n"]
+    write(path, "\n")
+    assert tail.read_since(chunk.cursor).lines == ["d\n"]
+
+
+def test_cursor_advances_past_a_line_longer_than_max_read(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\n", mode="w")
+    tail = LogTail(str(path), max_read=16)
+    cursor = tail.tail(10).cursor
+    write(path, "x" * 40 + "\nb\n")
+
+    pieces = []
+    for _ in range(5):
+        chunk = tail.read_since(cursor)
+        pieces += chunk.lines
+        cursor = chunk.cursor
+
+    assert "".join(pieces) == "x" * 40 + "\nb\n"
+    assert cursor.endswith(f":{os.path.getsize(path)}")
+
+
+def test_cursor_follows_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "old 1\n", mode="w")
+    tail = LogTail(str(path))
+    cursor = tail.tail(10).cursor
+    write(path, "old 2\n")
+    # Rotate the way loguru does: rename, then start a fresh file
+    os.rename(path, tmp_path / "app.2024-01-01_00-00-00_000000.log")
+    write(path, "new 1\n", mode="w")
+
+    chunk = tail.read_since(cursor)
+
+    assert chunk.rotated
+    assert chunk.lines == ["old 2\n", "new 1\n"]
+    write(path, "new 2\n")
+    assert tail.read_since(chunk.cursor).lines == ["new 2\n"]
+
+
+def test_invalid_cursor_falls_back_to_tail(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\n", mode="w")
+
+    assert LogTail(str(path)).read_since("garbage", lines=1).lines == ["b\n"]
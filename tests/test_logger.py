@@ -0,0 +1,58 @@
+import json
+import sys
+
+from loguru import logger
+
+from src.config import LoggingConfig
+from src.logger import RateLimitFilter, setup_logging
+
+
+def hot(i):
+    logger.info(f"hot {i}")
+
+
+def test_rate_limit_per_call_site_reports_suppressed():
+    messages = []
+    limiter = RateLimitFilter(limit=2, interval=60.0)
+    sink = logger.add(messages.append, filter=limiter, format="{message}")
+    sink2 = logger.add(lambda m: None, filter=limiter)  # shared across sinks
+    try:
+        for i in range(5):
+            hot(i)
+        logger.warning("always shown")
+        limiter.interval = 0.0  # next record starts a new window
+        hot(5)
+    finally:
+        logger.remove(sink)
+        logger.remove(sink2)
+
+    lines = [m.strip() for m in messages]
+    assert lines == [
+        "hot 0",
+        "hot 1",
+        "always shown",
+        "hot 5 [3 similar messages suppressed]",
+    ]
+
+
+def test_setup_logging_applies_config(tmp_path):
+    config = LoggingConfig(
+        level="WARNING",
+        file=str(tmp_path / "app.log"),
+        json_file=str(tmp_path / "app.jsonl"),
+        console=False,
+    )
+    try:
+        setup_logging(config, force=True)
+        logger.info("below the configured level")
+        logger.warning("kept")
+        logger.complete()
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)  # loguru's default sink, for the other tests
+
+    text = (tmp_path / "app.log").read_text()
+    assert "kept" in text and "below the configured level" not in text
+    record = json.loads((tmp_path / "app.jsonl").read_text().splitlines()[-1])
+    assert record["record"]["message"] == "kept"
+    assert record["record"]["level"]["name"] == "WARNING"
@@ -0,0 +1,193 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from src import main
+from src.app_repository import AppRepository
+from src.bootstrap import Application
+from src.config import load_config
+from src.event_predictor import Predictor
+from src.models import Insight, NewsItem, TrackedEvent
+from src.timeseries import TimeSeriesStore, to_datetime_pairs
+from src.trending import TrendingDetector
+
+CONFIG = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+
+class Budget:
+    """Never degrades unless ``paused`` is set."""
+
+    paused = False
+
+    def __init__(self):
+        self.resets_at = time.time()
+
+    def fetch_interval(self, base):
+        return base
+
+    def min_keyword_hits(self, required):
+        return 0
+
+    def period_end(self):
+        return self.resets_at
+
+
+class Scraper:
+    """Returns each post once, like ``RedditScraper``."""
+
+    def __init__(self, posts):
+        self.posts = list(posts)
+
+    def fetch_subreddit_posts(self, subreddit, limit=10):
+        posts, self.posts = self.posts, []
+        return posts
+
+
+class Analyzer:
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.failures = {news_id: n for news_id, n in fail}
+        self.calls = []
+
+    async def analyze(self, news, events):
+        self.calls.append(news.id)
+        await asyncio.sleep(self.delay)
+        if self.failures.get(news.id, 0) > 0:
+            self.failures[news.id] -= 1
+            raise RuntimeError("upstream error")
+        return []
+
+
+class BullishAnalyzer:
+    """An insight on ``e1`` for every post mentioning "Fed 0"."""
+
+    async def analyze(self, news, events):
+        if news.title != "Fed 0":
+            return []
+        return [("e1", Insight(text="hawkish", score=0.8, trend="up"))]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    application = Application(str(CONFIG), str(tmp_path / "state.json"))
+    config = load_config(CONFIG)
+    config.reddit.subreddits = ["stocks"]
+    config.pipeline.analyze_concurrency = 1
+    config.pipeline.max_attempts = 2
+    config.breakers.retry_base_seconds = 0.01
+    config.breakers.retry_max_seconds = 0.2
+    config.tracing.enabled = False
+    repo = AppRepository()
+    repo.events.add(
+        TrackedEvent(
+            id="e1",
+            name="Fed",
+            event_time=datetime.now(timezone.utc) + timedelta(days=1),
+            keywords=["fed"],
+        )
+    )
+    application.__dict__.update(
+        config=config,
+        app_repo=repo,
+        budget=Budget(),
+        trending=TrendingDetector(config.trending),
+        predictor=Predictor(config.sentiment),
+        timeseries=TimeSeriesStore(),
+    )
+    monkeypatch.setattr(main, "app", application)
+    return application
+
+
+def posts(n):
+    now = datetime.now(timezone.utc)
+    return [
+        NewsItem(
+            id=f"n{i}", source="stocks", title=f"Fed {i}", snippet="", timestamp=now
+        )
+        for i in range(n)
+    ]
+
+
+def run_until_processed(app, analyzer, items, timeout=10.0):
+    pipeline = main.build_pipeline(Scraper(items), analyzer, fetch_interval=0.1)
+    wanted = {news.id for news in items}
+    deadline = time.monotonic() + timeout
+
+    def stop():
+        done = wanted <= app.app_repo.processed_news_ids
+        return done or time.monotonic() > deadline
+
+    asyncio.run(pipeline.run(stop=stop))
+    return pipeline
+
+
+def test_shed_and_failed_items_are_analyzed_later(engine):
+    engine.config.pipeline.analyze_queue_size = 1
+    analyzer = Analyzer(delay=0.02, fail=[("n3", 3)])  # n3 outlasts max_attempts
+    items = posts(8)
+    pipeline = run_until_processed(engine, analyzer, items)
+
+    assert pipeline.metrics()["analyze"]["dropped"] > 0
+    assert {n.id for n in items} <= engine.app_repo.processed_news_ids
+    assert analyzer.calls.count("n3") == 4
+
+
+def test_items_arriving_while_paused_are_analyzed_after_the_reset(engine):
+    engine.budget.paused = True
+    engine.budget.resets_at = time.time() + 0.5
+    analyzer = Analyzer()
+    items = posts(3)
+    started = time.time()
+
+    async def resume():
+        await asyncio.sleep(0.3)
+        engine.budget.paused = False
+
+    pipeline = main.build_pipeline(Scraper(items), analyzer, fetch_interval=0.1)
+
+    async def run():
+        task = asyncio.create_task(resume())
+        deadline = time.monotonic() + 10
+
+        def stop():
+            return (
+                len(engine.app_repo.processed_news_ids) == 3
+                or time.monotonic() > deadline
+            )
+
+        await pipeline.run(stop=stop)
+        await task
+
+    asyncio.run(run())
+    assert engine.app_repo.processed_news_ids == {"n0", "n1", "n2"}
+    assert time.time() - started >= 0.5  # not before the period reset
+
+
+def test_expiring_an_event_closes_its_sentiment_series(engine):
+    engine.timeseries.series("sentiment/e1").append(time.time(), 0.5)
+
+    main._expire_event("e1")
+
+    assert engine.app_repo.events.get("e1") is None
+    assert engine.timeseries.get("sentiment/e1") is None
+
+
+def test_sentiment_is_recorded_only_for_events_with_new_insights(engine):
+    with engine.app_repo.writer():
+        engine.app_repo.events.add(
+            TrackedEvent(
+                id="e2",
+                name="CPI",
+                event_time=datetime.now(timezone.utc) + timedelta(days=1),
+                keywords=["cpi"],
+            )
+        )
+    run_until_processed(engine, BullishAnalyzer(), posts(5))
+
+    (t, value), = to_datetime_pairs(engine.timeseries.get("sentiment/e1"))
+    assert value > 0
+    assert engine.timeseries.get("sentiment/e2") is None
@@ -0,0 +1,70 @@
+import time
+
+from src.metrics import Counter, Gauge, Histogram, Registry, family_names
+
+
+def test_counter_and_labels_render():
+    registry = Registry()
+    fetches = registry.register(
+        Counter("fetch_total", "Fetches", ["subreddit", "outcome"])
+    )
+    fetches.labels("stocks", "ok").inc()
+    fetches.labels("stocks", "ok").inc(2)
+    fetches.labels('we"ird', "error").inc()
+
+    text = registry.render()
+
+    assert "# TYPE fetch_total counter" in text
+    assert 'fetch_total{subreddit="stocks",outcome="ok"} 3' in text
+    assert 'fetch_total{subreddit="we\\"ird",outcome="error"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("op_seconds", "Latency", buckets=(0.1, 1)))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'op_seconds_bucket{le="0.1"} 1' in lines
+    assert 'op_seconds_bucket{le="1"} 3' in lines
+    assert 'op_seconds_bucket{le="+Inf"} 4' in lines
+    assert "op_seconds_count 4" in lines
+    assert "op_seconds_sum 4.05" in lines
+
+
+def test_callback_gauge_and_exclude():
+    registry = Registry()
+    registry.register(
+        Gauge("queue_depth", "Depth", ["stage"], callback=lambda: {("a",): 4})
+    )
+    registry.register(Gauge("broken", "Fails", callback=lambda: 1 / 0))
+    text = registry.render()
+
+    assert 'queue_depth{stage="a"} 4' in text
+    assert "# broken unavailable" in text
+    assert family_names(text) == ["queue_depth"]
+    assert "queue_depth" not in registry.render(exclude=["queue_depth"])
+
+
+def test_reregistering_returns_the_same_metric():
+    registry = Registry()
+    first = registry.register(Counter("c_total", "C"))
+    assert registry.register(Counter("c_total", "C")) is first
+
+
+def test_recording_overhead_is_small():
+    registry = Registry()
+    counter = registry.register(Counter("hot_total", "Hot", ["k"]))
+    histogram = registry.register(Histogram("hot_seconds", "Hot"))
+    n = 100_000
+
+    start = time.perf_counter()
+    for _ in range(n):
+        counter.labels("x").inc()
+        histogram.observe(0.02)
+    per_call = (time.perf_counter() - start) / n
+
+    # A few microseconds, against LLM calls and fetches of ~1s
+    assert per_call < 20e-6
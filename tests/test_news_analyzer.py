@@ -53,8 +53,12 @@ def analyzer():
 async def test_analyze_simple(
     analyzer, sample_event, sample_news_item, mock_llm_response
 ):
-    with patch.object(analyzer.client.messages, "create") as mock_create:
-        mock_create.return_value.content = [Mock(text=mock_llm_response)]
+    raw_messages = analyzer.client.messages.with_raw_response
+    with patch.object(raw_messages, "create") as mock_create:
+        mock_create.return_value.headers = {}
+        mock_create.return_value.parse.return_value.content = [
+            Mock(text=mock_llm_response)
+        ]
         results = await analyzer.analyze(sample_news_item, [sample_event])
         for event_id, insight in results:
             if event_id == sample_event.id:
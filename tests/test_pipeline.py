@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+from src.pipeline import Deferred, Pipeline, Stage
+
+
+def source_of(items, delay=0.0):
+    async def source(emit):
+        for item in items:
+            await emit(item)
+            if delay:
+                await asyncio.sleep(delay)
+
+    return source
+
+
+def test_items_flow_through_stages_in_batches():
+    seen = []
+
+    async def double(batch):
+        return [x * 2 for x in batch]
+
+    async def collect(batch):
+        seen.extend(batch)
+
+    pipeline = Pipeline(
+        source_of(range(10)),
+        [Stage("double", double, batch_size=4), Stage("collect", collect)],
+    )
+    asyncio.run(pipeline.run())
+
+    assert sorted(seen) == [x * 2 for x in range(10)]
+    metrics = pipeline.metrics()
+    assert metrics["double"]["processed"] == 10
+    assert metrics["collect"]["queue_depth"] == 0
+
+
+def test_errors_are_counted_and_do_not_stop_the_stage():
+    async def flaky(batch):
+        if batch[0] == 2:
+            raise RuntimeError("boom")
+        return batch
+
+    pipeline = Pipeline(source_of(range(5)), [Stage("flaky", flaky)])
+    asyncio.run(pipeline.run())
+
+    assert pipeline.metrics()["flaky"]["errors"] == 1
+    assert pipeline.metrics()["flaky"]["processed"] == 5
+
+
+def test_concurrency_bounds_throughput_by_slowest_stage():
+    async def slow(batch):
+        await asyncio.sleep(0.1)
+        return batch
+
+    async def fast(batch):
+        return batch
+
+    pipeline = Pipeline(
+        source_of(range(8)),
+        [Stage("fast", fast), Stage("slow", slow, concurrency=4, maxsize=2)],
+    )
+    start = time.perf_counter()
+    asyncio.run(pipeline.run())
+    elapsed = time.perf_counter() - start
+
+    # 8 items / 4 workers * 0.1s, rather than 0.8s serially
+    assert elapsed < 0.5
+
+
+def test_saturated_stage_sheds_load_without_blocking_ingest():
+    dropped, analyzed = [], []
+
+    async def analyze(batch):
+        await asyncio.sleep(0.05)
+        analyzed.extend(batch)
+
+    stage = Stage(
+        "analyze", analyze, maxsize=3, overflow="drop_oldest", on_drop=dropped.append
+    )
+    ingested = []
+
+    async def source(emit):
+        for item in range(50):
+            ingested.append(item)
+            await emit(item)
+            await asyncio.sleep(0.001)
+
+    start = time.perf_counter()
+    asyncio.run(Pipeline(source, [stage]).run())
+
+    assert len(ingested) == 50
+    assert stage.metrics.dropped == len(dropped) > 0
+    assert sorted(analyzed + dropped) == list(range(50))
+    assert 49 in analyzed  # newest items survive
+    assert time.perf_counter() - start < 2.0
+
+
+def test_blocking_stage_applies_backpressure():
+    depths = []
+    stage = None
+
+    async def slow(batch):
+        depths.append(stage.queue.qsize())
+        await asyncio.sleep(0.01)
+
+    stage = Stage("slow", slow, maxsize=2)
+    asyncio.run(Pipeline(source_of(range(20)), [stage]).run())
+
+    assert max(depths) <= 2
+    assert stage.metrics.processed == 20
+
+
+def test_retry_later_requeues_without_holding_a_worker():
+    attempts = {}
+    done = []
+
+    async def flaky(batch):
+        (item,) = batch
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == 0 and attempts[item] < 3:
+            stage.retry_later(item, 0.05)
+            return []
+        done.append(item)
+
+    async def source(emit):
+        for item in range(4):
+            await emit(item)
+        await asyncio.sleep(0.3)  # keep running while the retries are pending
+
+    stage = Stage("flaky", flaky)
+    pipeline = Pipeline(source, [stage])
+    asyncio.run(pipeline.run())
+
+    # The items behind the failing one were not held up by its backoff
+    assert done == [1, 2, 3, 0]
+    assert attempts[0] == 3
+    metrics = pipeline.metrics()["flaky"]
+    assert metrics["retried"] == 2 and metrics["retry_pending"] == 0
+
+
+def test_deferred_releases_items_when_due_and_bounds_what_it_holds():
+    dropped = []
+    deferred = Deferred(capacity=2, on_drop=dropped.append)
+    deferred.hold("a", "A", until=10)
+    deferred.hold("b", "B", until=5)
+    deferred.hold("a", "A", until=20)  # same key: only the due time moves
+    assert deferred.due(now=5) == ["B"]
+    deferred.hold("c", "C", until=1)
+    deferred.hold("d", "D", until=1)
+    assert dropped == ["A"]  # held longest
+    assert sorted(deferred.due(now=30)) == ["C", "D"] and len(deferred) == 0
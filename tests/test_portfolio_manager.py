@@ -61,3 +61,9 @@ def test_history_tracking():
     assert history[0][1] == 1000
     assert history[1][1] == 1100
     assert history[2][1] == 1050
+
+
+def test_configured_points():
+    pm = PortfolioManager(1000, points_per_correct=10, points_per_incorrect=-20)
+    assert pm.update_on_event(make_event("Call"), actual_outcome="Call") == 1010
+    assert pm.update_on_event(make_event("Put"), actual_outcome="Call") == 990
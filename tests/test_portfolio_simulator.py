@@ -0,0 +1,59 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.config import PortfolioConfig
+from src.portfolio_simulator import simulate, simulate_events
+
+BASE = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def test_expected_value_matches_closed_form():
+    win_prob = [0.5, 0.7, 0.9]
+    result = simulate(1000.0, win_prob, 100.0, -50.0, paths=200_000, seed=0)
+
+    expected = 1000.0 + sum(p * 100 + (1 - p) * -50 for p in win_prob)
+    assert abs(result.expected_value - expected) < 2.0
+    assert result.quantiles["0.05"] <= result.quantiles["0.5"]
+    assert result.quantiles["0.95"] <= 1300.0
+
+
+def test_drawdown_of_certain_losses():
+    result = simulate(1000.0, [0.0, 0.0], 100.0, -50.0, paths=1000, seed=0)
+
+    assert result.expected_value == 900.0
+    assert result.prob_loss == 1.0
+    assert result.expected_max_drawdown == 100.0
+
+
+def test_simulate_events_skips_holds_and_settled_events():
+    events = [
+        {
+            "event_time": (BASE + timedelta(hours=i)).isoformat(),
+            "predicted_action": action,
+            "prediction_confidence": 1.0,
+            "settled_at": settled,
+        }
+        for i, (action, settled) in enumerate(
+            [("Call", None), ("Hold", None), ("Put", BASE.isoformat())]
+        )
+    ]
+    config = PortfolioConfig(points_per_correct=10, points_per_incorrect=-5)
+
+    result = simulate_events(events, 500.0, config, paths=1000, seed=0)
+
+    assert result.events == 1
+    assert result.expected_value == 510.0
+
+
+def test_million_paths_under_a_second():
+    win_prob = np.linspace(0.5, 0.9, 10)
+    simulate(1000.0, win_prob, paths=1000)  # warm up
+
+    start = time.perf_counter()
+    result = simulate(1000.0, win_prob, paths=1_000_000, seed=1)
+    elapsed = time.perf_counter() - start
+
+    assert result.paths == 1_000_000
+    assert elapsed < 1.0
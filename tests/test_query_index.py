@@ -0,0 +1,48 @@
+import pytest
+
+from src.query_index import KeysetIndex, decode_cursor, encode_cursor
+
+
+def test_out_of_order_insert_keeps_old_views_intact():
+    index = KeysetIndex()
+    for ts in (1.0, 2.0, 4.0):
+        index.add(ts, str(ts), ts)
+    before = index.view()
+    index.add(3.0, "3.0", 3.0)
+
+    assert before.page().items == [4.0, 2.0, 1.0]
+    assert index.view().page().items == [4.0, 3.0, 2.0, 1.0]
+
+
+def test_eviction_keeps_newest_entries():
+    index = KeysetIndex(max_items=8)
+    for i in range(100):
+        index.add(float(i), f"{i:03d}", i)
+
+    items = index.view().page(limit=1000).items
+    assert items[0] == 99
+    assert len(items) <= 10
+
+
+def test_max_scan_returns_resumable_cursor():
+    index = KeysetIndex()
+    for i in range(100):
+        index.add(float(i), f"{i:03d}", i)
+    view = index.view()
+
+    page = view.page(limit=5, predicate=lambda x: x < 10, max_scan=20)
+    assert page.items == []
+    found = []
+    while page.next_cursor:
+        found.extend(page.items)
+        page = view.page(
+            limit=5, cursor=page.next_cursor, predicate=lambda x: x < 10, max_scan=20
+        )
+    found.extend(page.items)
+    assert found == list(range(9, -1, -1))
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor((1.5, "abc"))) == (1.5, "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
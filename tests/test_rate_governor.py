@@ -0,0 +1,167 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.rate_governor import RateGovernor, Throttled, parse_headers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parses_anthropic_and_openai_headers():
+    now = 1_700_000_000.0
+    anthropic = parse_headers(
+        {
+            "anthropic-ratelimit-requests-limit": "50",
+            "anthropic-ratelimit-requests-remaining": "0",
+            "anthropic-ratelimit-requests-reset": "2023-11-14T22:13:30Z",
+            "anthropic-ratelimit-tokens-remaining": "1200",
+            "retry-after": "7",
+        },
+        now=now,
+    )
+    assert anthropic == {
+        "requests_limit": 50,
+        "requests_remaining": 0,
+        "requests_reset": 10.0,
+        "tokens_remaining": 1200,
+        "retry_after": 7.0,
+    }
+    openai = parse_headers(
+        {
+            "X-RateLimit-Limit-Tokens": "30000",
+            "X-RateLimit-Reset-Tokens": "6m0s",
+            "x-ratelimit-reset-requests": "20ms",
+            "retry-after-ms": "1500",
+        }
+    )
+    assert openai == {
+        "tokens_limit": 30000,
+        "tokens_reset": 360.0,
+        "requests_reset": 0.02,
+        "retry_after": 1.5,
+    }
+
+
+def test_aimd_halves_on_throttle_and_recovers_additively():
+    clock = FakeClock()
+    governor = RateGovernor("test", max_concurrency=8, clock=clock)
+    governor.on_throttle(429, {"retry-after": "5"})
+    assert governor.limit == 4
+    assert governor.paused_until == 5.0
+    # A burst of failures from calls already in flight is one decrease
+    governor.on_throttle(529)
+    assert governor.limit == 4
+    clock.now = 2.0
+    governor.on_throttle(529)
+    assert governor.limit == 2
+
+    for _ in range(10):
+        governor.on_success()
+    assert 4 < governor.limit < 6
+    for _ in range(100):
+        governor.on_success()
+    assert governor.limit == 8
+
+
+def test_headers_correct_the_buckets():
+    governor = RateGovernor("test", requests_per_minute=100, clock=FakeClock())
+    governor.observe(
+        {
+            "anthropic-ratelimit-requests-limit": "60",
+            "anthropic-ratelimit-requests-remaining": "0",
+            "anthropic-ratelimit-requests-reset": "3",
+        }
+    )
+    assert governor.requests.capacity == 60 and governor.requests.rate == 1.0
+    assert governor.requests.level == 0
+    assert governor.paused_until == 3.0
+
+
+def test_headers_do_not_undo_a_throttle_cut():
+    clock = FakeClock()
+    governor = RateGovernor("test", requests_per_minute=60, clock=clock)
+    governor.on_throttle(429)
+    assert governor.requests.rate == 0.5
+
+    headers = {"anthropic-ratelimit-requests-limit": "1000"}
+    governor.observe(headers)
+    governor.on_success()
+    # Recovery is the additive step toward the configured pace, not the quota
+    assert governor.requests.capacity == 60
+    assert governor.requests.rate == pytest.approx(0.55)
+    for _ in range(100):
+        governor.observe(headers)
+        governor.on_success()
+    assert governor.requests.rate == 1.0
+
+
+def test_call_retries_throttled_requests_and_settles_tokens():
+    governor = RateGovernor("test", tokens_per_minute=6000, backoff_seconds=0.01)
+    attempts = []
+
+    def send():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise Throttled(429, {"retry-after-ms": "50"})
+        return SimpleNamespace(headers={}, used=100)
+
+    result = governor.call(send, tokens=1000, usage=lambda r: r.used)
+    assert result.used == 100
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.045  # honored retry-after
+    # Charged 3 x 1000 estimated, refunded 900 for the successful call
+    assert governor.tokens.level == pytest.approx(6000 - 2100, abs=50)
+
+
+def test_call_reraises_other_errors_and_gives_up_after_max_attempts():
+    governor = RateGovernor("test", max_attempts=2, backoff_seconds=0.0)
+
+    def fail():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        governor.call(fail)
+    assert governor.limit == governor.max_concurrency
+
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise Throttled(529)
+
+    with pytest.raises(Throttled):
+        governor.call(throttled)
+    assert len(calls) == 2
+    assert governor.in_flight == 0
+
+
+def test_concurrency_never_exceeds_the_limit():
+    governor = RateGovernor("test", requests_per_minute=10_000, max_concurrency=2)
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def send():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    threads = [
+        threading.Thread(target=governor.call, args=(send,)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
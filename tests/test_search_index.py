@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+from src.app_repository import AppRepository
+from src.models import Insight, NewsItem, TrackedEvent
+from src.search_index import SearchIndex, tokenize
+
+T0 = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def news(i, title, snippet="", source="stocks"):
+    return NewsItem(
+        id=f"n{i}",
+        source=source,
+        title=title,
+        snippet=snippet,
+        timestamp=T0 + timedelta(hours=i),
+    )
+
+
+def ids(result):
+    return [r.get("id") or r.get("news_id") for r in result["results"]]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Fed's rate-cut, and $NVDA's 10% jump!") == [
+        "fed's",
+        "rate",
+        "cut",
+        "nvda's",
+        "10",
+        "jump",
+    ]
+
+
+def test_ranks_by_bm25_and_filters(tmp_path):
+    index = SearchIndex(str(tmp_path))
+    index.add_news(news(1, "Fed holds rates", "Powell says rates stay high"))
+    index.add_news(news(2, "Nvidia earnings beat", "Data center revenue up"))
+    index.add_news(news(3, "Rates and earnings", "A long post " + "filler " * 50))
+    index.add_news(news(4, "Fed minutes", "rates", source="wallstreetbets"))
+    index.add_insight(
+        "fomc",
+        Insight(
+            text="Hawkish rates outlook",
+            score=-0.4,
+            trend="worsening",
+            timestamp=T0 + timedelta(hours=5),
+            news_id="n1",
+        ),
+    )
+    assert not index.add_news(news(1, "Fed holds rates"))  # already indexed
+
+    result = index.search("rates")
+    assert result["total"] == 4
+    # Two mentions in a short document beat one in a long one
+    assert ids(result)[0] == "n1" and ids(result)[-1] == "n3"
+    assert result["results"][0]["title"] == "Fed holds rates"
+
+    assert ids(index.search("rates", source="wallstreetbets")) == ["n4"]
+    insights = index.search("rates", kind="insight")["results"]
+    assert [(r["event_id"], r["trend"]) for r in insights] == [("fomc", "worsening")]
+    assert index.search("rates", event_id="other")["total"] == 0
+    window = index.search(
+        "rates OR earnings",
+        since=(T0 + timedelta(hours=2)).timestamp(),
+        until=(T0 + timedelta(hours=4)).timestamp(),
+    )
+    assert sorted(ids(window)) == ["n2", "n3"]
+    assert index.search("rates", limit=2)["total"] == 4
+    assert len(index.search("rates", limit=2)["results"]) == 2
+    assert index.search("the")["results"] == []
+
+
+def test_persists_and_readers_follow_the_writer(tmp_path):
+    writer = SearchIndex(str(tmp_path), checkpoint_every=3)
+    for i in range(5):
+        writer.add_news(news(i, f"Story {i * 11} about tariffs"))
+    writer.flush()
+    assert writer.checkpointed == 3  # two documents only in the log
+
+    reader = SearchIndex(str(tmp_path), readonly=True)
+    assert len(reader) == 5
+    writer.add_news(news(9, "Tariffs again"))
+    writer.flush()
+    assert reader.search("tariffs")["total"] == 6  # tails the log
+
+    writer.close()
+    reopened = SearchIndex(str(tmp_path))
+    assert reopened.checkpointed == 6
+    assert reopened.search("story 44")["results"][0]["id"] == "n4"
+    assert [r["id"] for r in reopened.search("tariffs")["results"]] == [
+        r["id"] for r in reader.search("tariffs")["results"]
+    ]
+
+
+def test_repository_indexes_news_and_insights_beyond_its_windows(tmp_path):
+    index = SearchIndex(str(tmp_path / "search"))
+    repo = AppRepository(max_inline_insights=1, search=index)
+    with repo.writer():
+        repo.events.add(
+            TrackedEvent(
+                id="e1",
+                name="Fed",
+                event_time=T0 + timedelta(days=1),
+                keywords=["fed"],
+            )
+        )
+        repo.add_news(news(1, "Fed preview"))
+        for i in range(3):
+            repo.add_insight(
+                "e1", Insight(text=f"Take {i} on the fed", score=0, trend="stable")
+            )
+    repo.save(str(tmp_path / "state.json"))
+
+    assert index.search("fed", kind="insight")["total"] == 3
+    reloaded = AppRepository(search=index)
+    reloaded.load(str(tmp_path / "state.json"))  # already indexed: no duplicates
+    assert index.search("fed")["total"] == 4
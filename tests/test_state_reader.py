@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+
+from src.app_repository import AppRepository
+from src.history_log import HistoryLog
+from src.models import Insight, NewsItem, TrackedEvent
+from src.state_reader import StateReader, read_status, write_status
+from src.timeseries import TimeSeriesStore
+
+T0 = 1_699_999_200.0
+
+
+def news(i):
+    return NewsItem(
+        id=f"n{i}",
+        source="stocks",
+        title=f"title {i}",
+        snippet="s",
+        timestamp=datetime(2024, 3, 1, 12, i, tzinfo=timezone.utc),
+    )
+
+
+def test_reader_reloads_when_engine_saves(tmp_path):
+    path = str(tmp_path / "state.json")
+    engine = AppRepository()
+    reader = StateReader(path, min_interval=0)
+    assert reader.repo().snapshot().news_items == ()
+
+    with engine.writer():
+        engine.add_news(news(1))
+    engine.save(path)
+    first = reader.repo()
+    assert [n["id"] for n in first.snapshot().news_items] == ["n1"]
+    assert reader.repo() is first  # unchanged file, no reload
+
+    with engine.writer():
+        engine.add_news(news(2))
+    engine.save(path)
+    assert reader.repo().snapshot().index("news").page(limit=10).to_dict()[
+        "count"
+    ] == 2
+
+
+def test_readonly_series_sees_engine_appends(tmp_path):
+    engine = TimeSeriesStore(str(tmp_path)).series("sentiment/e1")
+    web = TimeSeriesStore(str(tmp_path), readonly=True)
+    assert len(web.get("sentiment/e1")) == 0
+
+    for i in range(90):
+        engine.append(T0 + i, float(i))
+    series = web.get("sentiment/e1")
+
+    assert len(series) == 90
+    assert series.query(resolution="1m") == engine.query(resolution="1m")
+    engine.append(T0 + 95, 100.0)
+    assert series.query(resolution="1m")["count"] == [60, 31]
+
+
+def test_status_file_round_trip(tmp_path):
+    path = str(tmp_path / "status.json")
+    assert read_status(path) is None
+    write_status(path, {"pipeline": {"analyze": {"queue_depth": 3}}})
+    assert read_status(path)["pipeline"]["analyze"]["queue_depth"] == 3
+
+
+def test_reader_pages_the_same_history_as_the_engine(tmp_path):
+    path = str(tmp_path / "state.json")
+    log = str(tmp_path / "history.jsonl")
+    engine = AppRepository(history=HistoryLog(log))
+    reader = StateReader(path, min_interval=0, history=HistoryLog(log, readonly=True))
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+    def add(start, n):
+        with engine.writer():
+            for i in range(start, start + n):
+                when = base + timedelta(minutes=i)
+                engine.add_news(
+                    NewsItem(
+                        id=f"n{i}",
+                        source="stocks",
+                        title=f"title {i}",
+                        snippet="s",
+                        timestamp=when,
+                        added_at=when,
+                    )
+                )
+                engine.add_llm_log({"text": str(i), "timestamp": when.isoformat()})
+        engine.save(path)
+
+    def pages(repo, name):
+        view = repo.snapshot().index(name)
+        first = view.page(limit=20)
+        return first.to_dict(), view.page(20, first.next_cursor).to_dict()
+
+    # Far more than the state file's windows (50 news, 10 LLM log entries)
+    add(0, 120)
+    for name in ("news", "news:source:stocks", "llm_log"):
+        embedded = pages(engine, name)
+        assert pages(reader.repo(), name) == embedded
+        assert embedded[1]["count"] == 20
+
+    add(120, 5)  # the reader only reads what was appended
+    assert pages(reader.repo(), "llm_log") == pages(engine, "llm_log")
+
+    restarted = AppRepository(history=HistoryLog(log))
+    restarted.load(path)
+    assert pages(restarted, "news") == pages(engine, "news")
+    assert pages(restarted, "llm_log") == pages(engine, "llm_log")
+
+
+def test_removed_event_indexes_are_dropped_everywhere(tmp_path):
+    path = str(tmp_path / "state.json")
+    log = str(tmp_path / "history.jsonl")
+    engine = AppRepository(history=HistoryLog(log))
+    reader = StateReader(path, min_interval=0, history=HistoryLog(log, readonly=True))
+    with engine.writer():
+        for event_id in ("e1", "e2"):
+            engine.events.add(
+                TrackedEvent(
+                    id=event_id,
+                    name="Fed",
+                    event_time=datetime.now(timezone.utc) + timedelta(days=1),
+                    keywords=["fed"],
+                )
+            )
+            engine.add_insight(event_id, Insight(text="x", score=0.1, trend="up"))
+            engine.add_llm_log(
+                {
+                    "text": "x",
+                    "timestamp": "2024-03-01T12:00:00+00:00",
+                    "event_id": event_id,
+                }
+            )
+    engine.save(path)
+    assert "e1" in reader.repo().insights_by_event
+
+    with engine.writer():
+        assert engine.remove_event("e1")
+    engine.save(path)
+
+    restarted = AppRepository(history=HistoryLog(log))
+    restarted.load(path)
+    for repo in (engine, reader.repo(), restarted):
+        assert set(repo.insights_by_event) == {"e2"}
+        assert set(repo.llm_log_by_event) == {"e2"}
@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+from src.portfolio_manager import PortfolioManager
+from src.timeseries import TimeSeries, TimeSeriesStore
+
+T0 = 1_699_999_200.0  # on an hour boundary
+
+
+def fill(series, n, step=1.0, start=T0):
+    for i in range(n):
+        series.append(start + i * step, float(i))
+
+
+def test_downsampled_tiers_aggregate_buckets():
+    series = TimeSeries()
+    fill(series, 150)  # 2.5 minutes at 1 Hz
+
+    minute = series.query(resolution="1m")
+    assert minute["t"] == [T0, T0 + 60, T0 + 120]
+    assert minute["count"] == [60, 60, 30]
+    assert minute["value"] == [29.5, 89.5, 134.5]
+    assert minute["min"] == [0.0, 60.0, 120.0]
+    assert minute["max"] == [59.0, 119.0, 149.0]
+    assert minute["last"] == [59.0, 119.0, 149.0]
+
+    hour = series.query(resolution="1h")
+    assert hour["count"] == [150]
+
+
+def test_range_query_and_auto_resolution():
+    series = TimeSeries()
+    fill(series, 7200)
+
+    raw = series.query(T0 + 10, T0 + 19, resolution="raw")
+    assert raw["value"] == [float(i) for i in range(10, 20)]
+
+    assert series.query(T0, T0 + 99, max_points=100)["resolution"] == "raw"
+    assert series.query(max_points=500)["resolution"] == "1m"
+    coarse = series.query(max_points=1)
+    assert coarse["resolution"] == "1h" and len(coarse["t"]) == 1
+
+
+def test_disk_series_survives_reopen(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    fill(store.series("sentiment/ev 1"), 90)
+    before = store.series("sentiment/ev 1").query(resolution="1m")
+
+    reopened = TimeSeriesStore(str(tmp_path)).series("sentiment/ev 1")
+    assert len(reopened) == 90
+    assert reopened.query(resolution="1m") == before
+    assert TimeSeriesStore(str(tmp_path)).get("sentiment/missing") is None
+
+    # The open bucket was rebuilt from raw samples and keeps aggregating
+    reopened.append(T0 + 100, 1000.0)
+    assert reopened.query(resolution="1m")["count"] == [60, 31]
+
+
+def test_query_over_months_is_fast(tmp_path):
+    series = TimeSeries(str(tmp_path / "big"))
+    n = 90 * 24 * 60  # three months at one sample per minute
+    t = T0 + np.arange(n) * 60.0
+    raw = np.column_stack([t, np.sin(np.arange(n))])
+    with open(series.raw.path, "ab") as f:
+        f.write(raw.tobytes())
+    series.query(resolution="raw")  # map the file
+
+    start = time.perf_counter()
+    result = series.query(
+        T0 + 30 * 86400, T0 + 31 * 86400, resolution="raw", max_points=2000
+    )
+    elapsed = time.perf_counter() - start
+
+    assert len(result["t"]) == 1441
+    assert elapsed < 0.05
+
+
+def test_explicit_resolution_respects_max_points():
+    series = TimeSeries()
+    fill(series, 7200)
+
+    raw = series.query(resolution="raw", max_points=1000)
+    assert raw["resolution"] == "raw" and len(raw["t"]) == 900
+    assert raw["t"][0] == T0 and raw["value"][1] == 8.0
+    assert len(series.query(resolution="1m", max_points=10)["t"]) == 10
+
+
+def test_store_close_evicts_series(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    fill(store.series("sentiment/e1"), 10)
+    store.close("sentiment/e1")
+
+    assert "sentiment/e1" not in store._series
+    # Still on disk and readable, without reopening it for appends
+    closed = store.get("sentiment/e1")
+    assert len(closed) == 10 and closed.readonly
+    assert closed.query(resolution="1m") == {
+        "resolution": "1m",
+        "t": [T0],
+        "count": [10],
+        "value": [4.5],
+        "min": [0.0],
+        "max": [9.0],
+        "last": [9.0],
+    }
+    assert "sentiment/e1" not in store._series
+    store.close("sentiment/missing")
+
+
+def test_portfolio_history_is_backed_by_series(tmp_path):
+    history = TimeSeries(str(tmp_path / "portfolio"))
+    PortfolioManager(history=history)
+    manager = PortfolioManager(initial_value=1000.0, history=history)
+
+    # The initial value is only recorded for an empty series
+    assert len(manager.get_history()) == 1
+    assert manager.get_history()[0][1] == 1000.0
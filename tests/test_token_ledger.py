@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from src.analyzer_worker import AnalyzerWorker
+from src.config import BudgetConfig
+from src.models import NewsItem
+from src.token_ledger import Budget, TokenLedger
+from src.work_queue import WorkQueue
+
+NOW = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc).timestamp()
+
+
+def ledger(tmp_path):
+    return TokenLedger(str(tmp_path / "ledger.db"), BudgetConfig().prices)
+
+
+def test_records_usage_per_caller_subreddit_and_event(tmp_path):
+    book = ledger(tmp_path)
+    # claude-3-7-sonnet: $3 / $15 per million tokens, matched by prefix
+    cost = book.record(
+        "news_analyzer",
+        "claude-3-7-sonnet-20250219",
+        1_000_000,
+        100_000,
+        news_id="n1",
+        subreddit="stocks",
+        event_ids=["e1", "e2"],
+        ts=NOW,
+    )
+    assert cost == pytest.approx(4.5)
+    book.record("event_discovery", "gpt-4o", 2000, 1000, ts=NOW)
+    book.record("news_analyzer", "unknown-model", 1000, 0, subreddit="stocks", ts=0)
+
+    assert book.spent(NOW - 1) == pytest.approx(4.5 + 0.015)
+    assert book.totals("caller", NOW - 1)["event_discovery"]["calls"] == 1
+    assert book.totals("subreddit")["stocks"]["calls"] == 2
+    by_event = book.totals("event", NOW - 1)
+    assert by_event["e1"]["input_tokens"] == 500_000
+    assert by_event["e2"]["cost_usd"] == pytest.approx(2.25)
+    with pytest.raises(ValueError):
+        book.totals("news_id")
+
+
+def test_budget_steps_down_and_resets_with_the_period(tmp_path):
+    book = ledger(tmp_path)
+    clock = [NOW]
+    budget = Budget(
+        book,
+        BudgetConfig(limit_usd=10.0, period="hour", refresh_seconds=0),
+        clock=lambda: clock[0],
+    )
+    assert budget.mode == "normal"
+    assert budget.fetch_interval(60) == 60
+    assert budget.min_keyword_hits(required=False) == 0
+
+    def spend(usd):
+        # $15 per million output tokens
+        book.record("news_analyzer", "default", 0, int(usd / 15 * 1e6), ts=clock[0])
+
+    spend(5.5)
+    assert budget.mode == "larger_batches"
+    assert budget.fetch_interval(60) == 180
+    spend(2.0)
+    assert budget.mode == "strict_prefilter"
+    assert budget.min_keyword_hits(required=False) == 2
+    spend(1.5)
+    assert budget.model("claude-3-7-sonnet") == "claude-3-5-haiku-20241022"
+    spend(1.5)
+    assert budget.paused
+
+    status = budget.status()
+    assert status["mode"] == "paused"
+    assert status["spent_usd"] == pytest.approx(10.5, abs=1e-3)
+    assert status["resets_at"] == "2024-03-01T13:00:00+00:00"
+    assert status["usage"]["caller"]["news_analyzer"]["calls"] == 4
+
+    clock[0] += 3600  # next hour
+    assert budget.mode == "normal"
+
+
+def test_unlimited_budget_never_degrades(tmp_path):
+    book = ledger(tmp_path)
+    book.record("news_analyzer", "default", 10**9, 10**9)
+    assert Budget(book, BudgetConfig(limit_usd=0)).mode == "normal"
+
+
+def test_worker_leases_nothing_while_paused(tmp_path):
+    class Paused:
+        paused = True
+
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    queue.enqueue(
+        [NewsItem(id="n1", source="s", title="t", snippet="s", timestamp=NOW)]
+    )
+    worker = AnalyzerWorker(queue, analyzer=None, worker_id="w", budget=Paused())
+    assert asyncio.run(worker.process_one()) is False
+    assert [lease.news.id for lease in queue.lease("other")] == ["n1"]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+
+from src import tracing
+from src.pipeline import Pipeline, Stage
+from src.tracing import SlowCycleProfiler, Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("work", n=1):
+        pass
+    assert len(tracer.spans) == 0
+
+
+def test_spans_nest_and_carry_news_id_into_threads(tmp_path):
+    tracer = Tracer(enabled=True)
+
+    def blocking():
+        with tracer.span("inner"):
+            time.sleep(0.01)
+
+    async def handle(news_id):
+        with tracing.news_item(news_id), tracer.span("outer"):
+            await asyncio.to_thread(blocking)
+
+    async def run():
+        await asyncio.gather(handle("a"), handle("b"))
+
+    asyncio.run(run())
+
+    path = str(tmp_path / "trace.json")
+    assert tracer.export(path) == 4
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {(e["name"], e["args"]["news_id"]) for e in spans} == {
+        ("outer", "a"), ("inner", "a"), ("outer", "b"), ("inner", "b")
+    }
+    outer = next(e for e in spans if e["name"] == "outer")
+    assert outer["dur"] >= 10_000  # microseconds
+
+    only_a = tracer.events(news_id="a")
+    assert {e["args"]["news_id"] for e in only_a if e["ph"] == "X"} == {"a"}
+
+
+def test_pipeline_stages_are_traced():
+    tracing.tracer.enabled = True
+    tracing.tracer.spans.clear()
+    try:
+
+        async def source(emit):
+            for item in ("n1", "n2"):
+                await emit(item)
+
+        async def passthrough(batch):
+            return batch
+
+        async def sink(batch):
+            return None
+
+        pipeline = Pipeline(
+            source,
+            [Stage("first", passthrough, batch_size=10), Stage("last", sink)],
+        )
+        asyncio.run(pipeline.run())
+
+        names = {name for name, *_ in tracing.tracer.spans}
+        assert {"stage.first", "stage.last"} <= names
+        traced = tracing.tracer.events(news_id="n2")
+        assert any(e.get("name") == "stage.last" for e in traced)
+    finally:
+        tracing.tracer.enabled = False
+        tracing.tracer.spans.clear()
+
+
+def test_profiler_keeps_only_the_slowest_cycles(tmp_path):
+    profiler = SlowCycleProfiler(str(tmp_path), keep=2, sample_rate=1.0)
+    for delay in (0.001, 0.03, 0.002, 0.02):
+        with profiler.cycle("stage"):
+            time.sleep(delay)
+
+    kept = profiler.slowest()
+    assert len(kept) == 2
+    assert kept[0][0] >= 0.03 and kept[1][0] >= 0.02
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        p.split("/")[-1] for _, p in kept
+    )
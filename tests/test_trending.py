@@ -0,0 +1,95 @@
+import random
+from collections import Counter
+from datetime import datetime, timezone
+
+from src.config import TrendingConfig
+from src.models import NewsItem
+from src.trending import (
+    CountMinSketch,
+    SpaceSaving,
+    TrendingDetector,
+    WindowedSketch,
+    extract_tickers,
+)
+
+T0 = datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp()
+
+
+def post(i, title, source="stocks", ts=None):
+    return NewsItem(
+        id=f"n{i}",
+        source=source,
+        title=title,
+        snippet="",
+        timestamp=datetime.fromtimestamp(ts, timezone.utc),
+    )
+
+
+def test_extracts_cashtags_and_ticker_like_tokens():
+    assert extract_tickers("Why $nvda and AMD beat, says CEO of TSM") == [
+        "AMD",
+        "NVDA",
+        "TSM",
+    ]
+    assert extract_tickers("$BRK.B vs the SPY in the USA") == ["BRK.B", "SPY"]
+    # Shouting: only cashtags count
+    assert extract_tickers("THIS IS HUGE BUY $GME NOW") == ["GME"]
+
+
+def test_sketches_never_underestimate_and_find_heavy_hitters():
+    rng = random.Random(0)
+    stream = [f"T{rng.randrange(2000)}" for _ in range(20_000)]
+    # Space-Saving keeps every key above N / k = 22700 / 20 mentions
+    stream += ["HOT"] * 1500 + ["WARM"] * 1200
+    rng.shuffle(stream)
+    exact = Counter(stream)
+    sketch = CountMinSketch(width=512, depth=4)
+    heavy = SpaceSaving(k=20)
+    for key in stream:
+        sketch.add(key)
+        heavy.add(key)
+    assert all(sketch.estimate(key) >= n for key, n in exact.items())
+    assert sketch.estimate("HOT") - 1500 < 0.02 * len(stream)
+    assert {"HOT", "WARM"} <= set(heavy.counts)
+
+
+def test_window_expires_old_buckets_with_fixed_memory():
+    window = WindowedSketch(bucket_seconds=60, buckets=5, width=64, depth=3, top_k=5)
+    window.add("AMD", ts=T0, now=T0)
+    window.add("AMD", ts=T0 + 120, now=T0 + 120)
+    assert window.estimate("AMD", now=T0 + 120) == 2
+    assert window.estimate("AMD", now=T0 + 300) == 1  # first bucket expired
+    assert window.estimate("AMD", now=T0 + 500) == 0
+    window.add("OLD", ts=T0, now=T0 + 500)  # older than the window: ignored
+    assert window.estimate("OLD", now=T0 + 500) == 0
+
+    for i in range(10_000):
+        window.add(f"X{i}", ts=T0 + 500, now=T0 + 500)
+    assert window.total.table.shape == (3, 64)
+    assert max(len(summary.counts) for summary in window.heavy) == 5
+
+
+def test_flags_a_burst_against_the_baseline():
+    clock = [T0]
+    detector = TrendingDetector(
+        TrendingConfig(window_minutes=60, baseline_hours=24), clock=lambda: clock[0]
+    )
+    i = 0
+    # A steady background of AAPL, about one mention an hour, for 12 hours
+    for hour in range(12):
+        clock[0] = T0 + hour * 3600
+        i += 1
+        detector.observe([post(i, "AAPL earnings preview", ts=clock[0])])
+    # Then a spike of GME in one subreddit, alongside the usual AAPL
+    clock[0] = T0 + 12 * 3600
+    spike = [post(i + k, "$GME squeeze again", "wsb", clock[0]) for k in range(1, 9)]
+    detector.observe(spike + [post(i + 20, "AAPL update", ts=clock[0])])
+
+    overall = detector.trending()["tickers"]
+    assert overall[0]["ticker"] == "GME" and overall[0]["burst"]
+    assert overall[0]["mentions"] == 8
+    aapl = next(row for row in overall if row["ticker"] == "AAPL")
+    assert not aapl["burst"] and aapl["expected"] > 0.5
+
+    assert [row["ticker"] for row in detector.trending("wsb")["tickers"]] == ["GME"]
+    assert set(detector.snapshot()) == {"all", "stocks", "wsb"}
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.analyzer_worker import AnalyzerWorker
+from src.models import Insight, NewsItem
+from src.work_queue import WorkQueue
+
+NOW = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def news(i):
+    return NewsItem(
+        id=f"n{i}", source="stocks", title=f"title {i}", snippet="s", timestamp=NOW
+    )
+
+
+def insight(news_id):
+    return Insight(
+        text="relevant", score=0.5, trend="stable", timestamp=NOW, news_id=news_id
+    )
+
+
+class SlowAnalyzer:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def analyze(self, item, events):
+        self.calls.append(item.id)
+        await asyncio.sleep(self.delay)
+        return [("e1", insight(item.id))]
+
+
+def test_enqueue_is_idempotent_and_lease_is_exclusive(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    assert queue.enqueue([news(1), news(2)]) == 2
+    assert queue.enqueue([news(1)]) == 0
+
+    first = queue.lease("a", limit=1)
+    second = queue.lease("b", limit=5)
+
+    assert [lease.news.id for lease in first] == ["n1"]
+    assert [lease.news.id for lease in second] == ["n2"]
+    assert queue.lease("c") == []
+
+
+def test_expired_lease_is_redelivered_and_stale_result_rejected(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    queue.enqueue([news(1)])
+    crashed = queue.lease("a", visibility_timeout=0.05)[0]
+    time.sleep(0.1)
+
+    retry = queue.lease("b")[0]
+    assert retry.news.id == "n1" and retry.attempts == 2
+
+    # The first worker wakes up late: its result must not be committed
+    assert not queue.complete(crashed, [("e1", insight("n1"))])
+    assert queue.complete(retry, [("e1", insight("n1"))])
+    assert not queue.complete(retry, [("e1", insight("n1"))])
+
+    (item, results), = queue.completed()
+    assert item.id == "n1" and results[0][1].news_id == "n1"
+    assert queue.completed(exclude={"n1"}) == []
+    assert queue.mark_applied(["n1"]) == 1
+    assert queue.completed() == []
+    assert queue.stats() == {"applied": 1}
+
+
+def test_failures_retry_then_give_up(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    queue.enqueue([news(1)])
+    for attempt in range(1, 3):
+        lease = queue.lease("a")[0]
+        assert lease.attempts == attempt
+        queue.fail(lease, "boom", max_attempts=2, retry_after=0)
+
+    assert queue.lease("a") == []
+    assert queue.stats() == {"failed": 1}
+
+
+def test_throughput_scales_with_workers(tmp_path):
+    path = str(tmp_path / "q.db")
+
+    def drain(n_workers, n_items=16, delay=0.05):
+        queue = WorkQueue(path)
+        queue.enqueue([news(f"{n_workers}-{i}") for i in range(n_items)])
+        analyzer = SlowAnalyzer(delay)
+
+        def run(worker_id):
+            worker = AnalyzerWorker(WorkQueue(path), analyzer, worker_id)
+
+            async def loop():
+                while await worker.process_one():
+                    pass
+
+            asyncio.run(loop())
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=run, args=(f"w{i}",)) for i in range(n_workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        # Every item analyzed exactly once
+        assert sorted(analyzer.calls) == sorted(
+            f"n{n_workers}-{i}" for i in range(n_items)
+        )
+        return elapsed
+
+    single = drain(1)
+    quad = drain(4)
+
+    assert quad < single / 2.5
+
+
+def test_item_whose_leases_keep_expiring_is_failed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    queue.enqueue([news(1)])
+    for attempt in range(1, 3):
+        lease = queue.lease("a", visibility_timeout=0.01, max_attempts=2)[0]
+        assert lease.attempts == attempt
+        time.sleep(0.02)  # the worker dies without completing or failing
+
+    assert queue.lease("a", max_attempts=2) == []
+    assert queue.stats() == {"failed": 1}
+
+
+def test_purge_deletes_finished_items_older_than_retention(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    queue.enqueue([news(1), news(2)])
+    lease = queue.lease("a")[0]
+    queue.complete(lease, [])
+    queue.mark_applied([lease.news.id])
+
+    assert queue.purge(time.time() - 60) == 0
+    assert queue.purge(time.time() + 1) == 1
+    assert queue.stats() == {"pending": 1}